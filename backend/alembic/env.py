@@ -19,7 +19,7 @@ if db_url:
 
 # add your model's MetaData object here for 'autogenerate' support
 from app.db.database import Base  # noqa: E402
-from app.models import user, legal, agent, crm, intake  # noqa: F401,E402
+from app.models import user, legal, agent, crm, intake, ingestion, rate_limit  # noqa: F401,E402
 target_metadata = Base.metadata
 
 def run_migrations_offline():
@@ -0,0 +1,84 @@
+"""
+Store document_chunks.embedding as packed float bytes instead of JSON text
+
+Revision ID: 0002_binary_chunk_embeddings
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+import json
+import os
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+revision = '0002_binary_chunk_embeddings'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+STORAGE_DTYPE = os.getenv("EMBEDDING_STORAGE_DTYPE", "float32")
+
+
+def _convert_in_batches(conn, select_sql, update_sql, convert):
+    while True:
+        rows = conn.execute(sa.text(select_sql), {"limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        conn.execute(update_sql, [convert(r) for r in rows])
+
+
+def upgrade():
+    op.add_column('document_chunks', sa.Column('embedding_blob', sa.LargeBinary(), nullable=True))
+    op.add_column('document_chunks', sa.Column('embedding_dim', sa.Integer(), nullable=True))
+    op.add_column('document_chunks', sa.Column('embedding_dtype', sa.String(length=16), nullable=True))
+
+    conn = op.get_bind()
+    dtype = np.dtype(STORAGE_DTYPE).newbyteorder("<")
+    update_sql = sa.text(
+        "UPDATE document_chunks SET embedding_blob = :blob, embedding_dim = :dim, embedding_dtype = :dtype WHERE id = :id"
+    ).bindparams(sa.bindparam("blob", type_=sa.LargeBinary()))
+
+    def convert(row):
+        values = json.loads(row.embedding) if row.embedding else []
+        return {
+            "id": row.id,
+            "blob": np.asarray(values, dtype=dtype).tobytes() if values else None,
+            "dim": len(values) or None,
+            "dtype": STORAGE_DTYPE,
+        }
+
+    # Rows with an empty/NULL embedding get embedding_dtype set so they are not reselected
+    _convert_in_batches(
+        conn,
+        "SELECT id, embedding FROM document_chunks WHERE embedding IS NOT NULL AND embedding_dtype IS NULL LIMIT :limit",
+        update_sql,
+        convert,
+    )
+
+    op.drop_column('document_chunks', 'embedding')
+    op.alter_column('document_chunks', 'embedding_blob', new_column_name='embedding')
+
+
+def downgrade():
+    op.add_column('document_chunks', sa.Column('embedding_json', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    update_sql = sa.text("UPDATE document_chunks SET embedding_json = :emb WHERE id = :id")
+
+    def convert(row):
+        dtype = np.dtype(row.embedding_dtype or "float32").newbyteorder("<")
+        values = np.frombuffer(row.embedding, dtype=dtype).astype(float).tolist()
+        return {"id": row.id, "emb": json.dumps(values)}
+
+    _convert_in_batches(
+        conn,
+        "SELECT id, embedding, embedding_dtype FROM document_chunks WHERE embedding IS NOT NULL AND embedding_json IS NULL LIMIT :limit",
+        update_sql,
+        convert,
+    )
+
+    op.drop_column('document_chunks', 'embedding')
+    op.drop_column('document_chunks', 'embedding_dtype')
+    op.drop_column('document_chunks', 'embedding_dim')
+    op.alter_column('document_chunks', 'embedding_json', new_column_name='embedding')
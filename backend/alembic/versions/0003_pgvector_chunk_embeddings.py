@@ -0,0 +1,44 @@
+"""
+Add pgvector embedding column and ANN index to document_chunks
+
+Only needed when VECTOR_BACKEND=pgvector; skipped when the vector extension
+is not available on the server.
+
+Revision ID: 0003_pgvector_chunk_embeddings
+Revises: 0002_binary_chunk_embeddings
+Create Date: 2026-10-18
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003_pgvector_chunk_embeddings'
+down_revision = '0002_binary_chunk_embeddings'
+branch_labels = None
+depends_on = None
+
+DIMENSION = int(os.getenv("PINECONE_DIMENSION", "1536"))
+INDEX_TYPE = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw").lower()
+
+
+def _vector_available(conn) -> bool:
+    return conn.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'")
+    ).first() is not None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if not _vector_available(conn):
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(f"ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_vector vector({DIMENSION})")
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_vector ON document_chunks "
+        f"USING {INDEX_TYPE} (embedding_vector vector_cosine_ops)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_document_chunks_embedding_vector")
+    op.execute("ALTER TABLE document_chunks DROP COLUMN IF EXISTS embedding_vector")
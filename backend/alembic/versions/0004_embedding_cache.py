@@ -0,0 +1,29 @@
+"""
+Add embedding_cache table for the persistent embedding cache tier
+
+Revision ID: 0004_embedding_cache
+Revises: 0003_pgvector_chunk_embeddings
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004_embedding_cache'
+down_revision = '0003_pgvector_chunk_embeddings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'embedding_cache',
+        sa.Column('key', sa.String(length=64), primary_key=True),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('embedding', sa.LargeBinary(), nullable=False),
+        sa.Column('embedding_dim', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('embedding_cache')
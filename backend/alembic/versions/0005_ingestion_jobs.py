@@ -0,0 +1,46 @@
+"""
+Add ingestion_jobs table for the DB-backed document indexing queue
+
+Revision ID: 0005_ingestion_jobs
+Revises: 0004_embedding_cache
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005_ingestion_jobs'
+down_revision = '0004_embedding_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ingestion_jobs',
+        sa.Column('id', sa.String(length=36), primary_key=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('stage', sa.String(), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('document_id', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.String(), nullable=True),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('document_type', sa.String(), nullable=True),
+        sa.Column('chunks_total', sa.Integer(), nullable=True),
+        sa.Column('chunks_done', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_ingestion_jobs_status', 'ingestion_jobs', ['status'])
+    op.create_index('ix_ingestion_jobs_document_id', 'ingestion_jobs', ['document_id'])
+    op.create_index('ix_ingestion_jobs_user_id', 'ingestion_jobs', ['user_id'])
+    op.create_index('ix_ingestion_jobs_created_at', 'ingestion_jobs', ['created_at'])
+
+
+def downgrade():
+    op.drop_table('ingestion_jobs')
@@ -0,0 +1,24 @@
+"""
+Add content_hash to document_chunks for incremental re-indexing
+
+Revision ID: 0006_chunk_content_hash
+Revises: 0005_ingestion_jobs
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006_chunk_content_hash'
+down_revision = '0005_ingestion_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('document_chunks', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_document_chunks_content_hash', 'document_chunks', ['content_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_document_chunks_content_hash', table_name='document_chunks')
+    op.drop_column('document_chunks', 'content_hash')
@@ -0,0 +1,27 @@
+"""
+Add index_versions table used to invalidate cached retrieval results
+
+Revision ID: 0007_index_versions
+Revises: 0006_chunk_content_hash
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007_index_versions'
+down_revision = '0006_chunk_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'index_versions',
+        sa.Column('scope', sa.String(), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('index_versions')
@@ -0,0 +1,39 @@
+"""
+Add document_insights table for precomputed per-entity insight summaries
+
+Revision ID: 0008_document_insights
+Revises: 0007_index_versions
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008_document_insights'
+down_revision = '0007_index_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'document_insights',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entity_id', sa.String(), nullable=False),
+        sa.Column('document_type', sa.String(), nullable=False, server_default=''),
+        sa.Column('insights', sa.Text(), nullable=True),
+        sa.Column('documents_analyzed', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+        sa.Column('stale', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('entity_id', 'document_type', name='uq_document_insights_entity_type'),
+    )
+    op.create_index('ix_document_insights_id', 'document_insights', ['id'])
+    op.create_index('ix_document_insights_entity_id', 'document_insights', ['entity_id'])
+
+
+def downgrade():
+    op.drop_index('ix_document_insights_entity_id', table_name='document_insights')
+    op.drop_index('ix_document_insights_id', table_name='document_insights')
+    op.drop_table('document_insights')
@@ -0,0 +1,30 @@
+"""
+Add a generated tsvector column and GIN index on document_chunks.chunk_text
+
+The column is computed by Postgres on every insert/update, so the full-text
+index is maintained incrementally as documents are ingested. Adding a stored
+generated column rewrites document_chunks once.
+
+Revision ID: 0009_chunk_fulltext_index
+Revises: 0008_document_insights
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0009_chunk_fulltext_index'
+down_revision = '0008_document_insights'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS chunk_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(chunk_text, ''))) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_document_chunks_chunk_tsv ON document_chunks USING gin (chunk_tsv)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_document_chunks_chunk_tsv")
+    op.execute("ALTER TABLE document_chunks DROP COLUMN IF EXISTS chunk_tsv")
@@ -0,0 +1,30 @@
+"""
+Add rate_limit_counters table backing the shared (cross-worker) rate limiter
+
+Revision ID: 0010_rate_limit_counters
+Revises: 0009_chunk_fulltext_index
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010_rate_limit_counters'
+down_revision = '0009_chunk_fulltext_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'rate_limit_counters',
+        sa.Column('key', sa.String(length=255), primary_key=True),
+        sa.Column('window_start', sa.BigInteger(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.BigInteger(), nullable=False),
+    )
+    op.create_index('ix_rate_limit_counters_expires_at', 'rate_limit_counters', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_rate_limit_counters_expires_at', table_name='rate_limit_counters')
+    op.drop_table('rate_limit_counters')
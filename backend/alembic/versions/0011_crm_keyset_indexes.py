@@ -0,0 +1,30 @@
+"""
+Add composite indexes for keyset pagination of the CRM list endpoints
+
+Each index leads with a list filter and ends with id, so a filtered page
+(WHERE ... AND id > cursor ORDER BY id LIMIT n) is a single index range scan.
+
+Revision ID: 0011_crm_keyset_indexes
+Revises: 0010_rate_limit_counters
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = '0011_crm_keyset_indexes'
+down_revision = '0010_rate_limit_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_matters_pipeline_stage_id', 'matters', ['pipeline', 'stage', 'id'])
+    op.create_index('ix_matters_advisor_id_id', 'matters', ['advisor_id', 'id'])
+    op.create_index('ix_matters_contact_id_id', 'matters', ['contact_id', 'id'])
+    op.create_index('ix_intakes_matter_id_id', 'intakes', ['matter_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_intakes_matter_id_id', table_name='intakes')
+    op.drop_index('ix_matters_contact_id_id', table_name='matters')
+    op.drop_index('ix_matters_advisor_id_id', table_name='matters')
+    op.drop_index('ix_matters_pipeline_stage_id', table_name='matters')
@@ -0,0 +1,41 @@
+"""
+Add pipeline stats indexes and the matter_stage_daily rollup table
+
+The rollup holds one row per advisor, creation day and current stage, kept in
+step with matter inserts/updates/deletes by ORM events. It is backfilled here
+from existing matters.
+
+Revision ID: 0012_matter_stage_daily
+Revises: 0011_crm_keyset_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0012_matter_stage_daily'
+down_revision = '0011_crm_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_matters_advisor_id_created_at_stage', 'matters', ['advisor_id', 'created_at', 'stage'])
+    op.create_index('ix_matters_created_at_stage', 'matters', ['created_at', 'stage'])
+    op.create_table(
+        'matter_stage_daily',
+        sa.Column('advisor_id', sa.Integer(), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('stage', sa.String(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO matter_stage_daily (advisor_id, day, stage, count) "
+        "SELECT coalesce(advisor_id, 0), coalesce(created_at::date, DATE '1970-01-01'), coalesce(stage, ''), count(*) "
+        "FROM matters GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade():
+    op.drop_table('matter_stage_daily')
+    op.drop_index('ix_matters_created_at_stage', table_name='matters')
+    op.drop_index('ix_matters_advisor_id_created_at_stage', table_name='matters')
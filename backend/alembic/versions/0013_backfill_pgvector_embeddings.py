@@ -0,0 +1,61 @@
+"""
+Backfill document_chunks.embedding_vector from the packed embedding column
+
+0003 added embedding_vector empty, so chunks indexed by the postgres backend
+were invisible to pgvector search after switching VECTOR_BACKEND=pgvector.
+Copies every packed embedding of the configured dimension into the vector
+column; skipped when the column does not exist (no vector extension).
+
+Revision ID: 0013_backfill_pgvector_embeddings
+Revises: 0012_matter_stage_daily
+Create Date: 2026-10-18
+"""
+import os
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+revision = '0013_backfill_pgvector_embeddings'
+down_revision = '0012_matter_stage_daily'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+DIMENSION = int(os.getenv("PINECONE_DIMENSION", "1536"))
+
+
+def _has_vector_column(conn) -> bool:
+    return conn.execute(sa.text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = 'document_chunks' AND column_name = 'embedding_vector'"
+    )).first() is not None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if not _has_vector_column(conn):
+        return
+    select_sql = sa.text(
+        "SELECT id, embedding, embedding_dtype FROM document_chunks "
+        "WHERE embedding_vector IS NULL AND embedding IS NOT NULL AND embedding_dim = :dim LIMIT :limit"
+    )
+    update_sql = sa.text("UPDATE document_chunks SET embedding_vector = CAST(:vec AS vector) WHERE id = :id")
+    while True:
+        rows = conn.execute(select_sql, {"dim": DIMENSION, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        conn.execute(update_sql, [
+            {
+                "id": row.id,
+                "vec": "[" + ",".join(
+                    repr(float(x))
+                    for x in np.frombuffer(row.embedding, dtype=np.dtype(row.embedding_dtype or "float32").newbyteorder("<"))
+                ) + "]",
+            }
+            for row in rows
+        ])
+
+
+def downgrade():
+    # The packed embeddings are untouched, so there is nothing to undo
+    pass
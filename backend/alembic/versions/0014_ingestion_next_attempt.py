@@ -0,0 +1,22 @@
+"""
+Add next_attempt_at to ingestion_jobs so failed attempts back off before retrying
+
+Revision ID: 0014_ingestion_next_attempt
+Revises: 0013_backfill_pgvector_embeddings
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0014_ingestion_next_attempt'
+down_revision = '0013_backfill_pgvector_embeddings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ingestion_jobs', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ingestion_jobs', 'next_attempt_at')
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Form, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from app.db import crud
 from app.schemas.user import User, UserCreate, UserUpdate, Entity, EntityCreate, Contact, ContactCreate, Matter, MatterCreate, Intake, IntakeCreate, FieldMapping, PublicLead
 from app.db.database import get_db
-from app.core.security import create_access_token, ALGORITHM, verify_password, decrypt_secret
+from app.db.pagination import parse_fields, filter_created, keyset_page, page_headers
+from app.core.security import create_access_token, ALGORITHM, verify_login_password, hash_password_async, decrypt_secret
+from app.core.concurrency import run_blocking
 import pyotp
 from app.core.config import settings
+from app.services.user_cache import get_user_cache
+from app.services.rate_limit import RateLimitResult, get_rate_limiter
+from app.services import pipeline_stats
 from datetime import timedelta, datetime
 from app.models.user import User as UserModel
 from app.models.crm import Contact as ContactModel, Matter as MatterModel
@@ -18,23 +25,6 @@ from typing import List, Optional
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token", auto_error=False)
 
-# Simple in-memory rate limiting state (per-process best effort)
-from collections import defaultdict, deque
-from time import time
-_ip_attempts = defaultdict(lambda: deque(maxlen=100))
-_user_attempts = defaultdict(lambda: deque(maxlen=100))
-
-def _allow_attempt(key: str, bucket: defaultdict, limit: int = 10, window_seconds: int = 900) -> bool:
-    now = time()
-    dq = bucket[key]
-    # drop old
-    while dq and now - dq[0] > window_seconds:
-        dq.popleft()
-    if len(dq) >= limit:
-        return False
-    dq.append(now)
-    return True
-
 # Dependency
 def get_current_user(request: Request, db: Session = Depends(get_db), token: Optional[str] = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
@@ -54,32 +44,93 @@ def get_current_user(request: Request, db: Session = Depends(get_db), token: Opt
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_email(db, email=email)
+    user_cache = get_user_cache()
+    user = user_cache.get(db, email)
     if user is None:
-        raise credentials_exception
+        user = crud.get_user_by_email(db, email=email)
+        if user is None:
+            raise credentials_exception
+        user_cache.put(email, user)
     return user
 
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def _too_many_requests(result: RateLimitResult, detail: str = "Too many requests. Try again later.") -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(result.retry_after)})
+
+def rate_limit(scope: str, limit: int, window_seconds: int, per_user: bool = False):
+    """
+    Dependency factory enforcing a sliding-window limit per client IP, or per
+    authenticated user with per_user=True. Counters live in the RATE_LIMIT_BACKEND
+    store, so with the postgres backend the limit holds across worker processes.
+
+    Usage: @router.post(..., dependencies=[Depends(rate_limit("chat", 30, 60, per_user=True))])
+    """
+    def enforce(key: str) -> None:
+        result = get_rate_limiter().hit(scope, key, limit, window_seconds)
+        if not result.allowed:
+            raise _too_many_requests(result)
+
+    if per_user:
+        def dependency(current_user: UserModel = Depends(get_current_user)):
+            enforce(f"user:{current_user.id}")
+    else:
+        def dependency(request: Request):
+            enforce(_client_ip(request))
+    return dependency
+
+def _login_limit_exceeded(client_ip: str, username: str, record_failure: bool) -> Optional[RateLimitResult]:
+    """
+    Check (and on a failed attempt record) the brute-force limits for a login.
+
+    Before verification only the IP is checked, so a locked-out client costs no
+    bcrypt work without letting others lock a user out of every IP.
+    """
+    limiter = get_rate_limiter()
+    limit, window = settings.LOGIN_RATE_LIMIT, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+    if not record_failure:
+        result = limiter.check("login-ip", client_ip, limit, window)
+        return None if result.allowed else result
+    for result in (
+        limiter.hit("login-ip", client_ip, limit, window),
+        limiter.hit("login-user", username, limit, window),
+    ):
+        if not result.allowed:
+            return result
+    return None
+
 @router.post("/token")
-def login_for_access_token(
+async def login_for_access_token(
     response: Response,
     request: Request,
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
     otp: Optional[str] = Form(default=None),
 ):
-    # Brute force protection: 10 wrong attempts per 15 minutes per IP and per username
-    client_ip = request.client.host if request.client else "unknown"
+    # Brute force protection: LOGIN_RATE_LIMIT failed attempts per window per IP and per username
+    client_ip = _client_ip(request)
     username = form_data.username or "unknown"
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        # record failed attempt
-        _allow_attempt(client_ip, _ip_attempts)  # push timestamp regardless
-        _allow_attempt(username, _user_attempts)
-        # check limits
-        ip_ok = _allow_attempt(client_ip, _ip_attempts)
-        user_ok = _allow_attempt(username, _user_attempts)
-        if not ip_ok or not user_ok:
-            raise HTTPException(status_code=429, detail="Too many login attempts. Try again later.")
+    exceeded = await run_blocking(_login_limit_exceeded, client_ip, username, False)
+    if exceeded:
+        raise _too_many_requests(exceeded, "Too many login attempts. Try again later.")
+    user = await run_blocking(crud.get_user_by_email, db, email=form_data.username)
+    # bcrypt runs on the password executor, not the event loop or the shared threadpool
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_login_password(user.email, form_data.password, user.hashed_password)
+    if valid and new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it transparently
+        try:
+            user.hashed_password = new_hash
+            await run_blocking(db.commit)
+            get_user_cache().invalidate(user.email)
+        except Exception:
+            await run_blocking(db.rollback)
+    if not valid:
+        exceeded = await run_blocking(_login_limit_exceeded, client_ip, username, True)
+        if exceeded:
+            raise _too_many_requests(exceeded, "Too many login attempts. Try again later.")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -152,17 +203,20 @@ def get_or_create_default_entity(db: Session = Depends(get_db), current_user: Us
 async def read_entities_for_user(current_user: User = Depends(get_current_user)):
     return current_user.entities
 
+def _username_taken(db: Session, username: str) -> bool:
+    return db.query(UserModel).filter(UserModel.username == username).first() is not None
+
 @router.post("/users/", response_model=User)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_blocking(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     # Check if username is taken (for advisors)
-    if user.username:
-        existing_username = db.query(UserModel).filter(UserModel.username == user.username).first()
-        if existing_username:
-            raise HTTPException(status_code=400, detail="Username already taken")
-    return crud.create_user(db=db, user=user)
+    if user.username and await run_blocking(_username_taken, db, user.username):
+        raise HTTPException(status_code=400, detail="Username already taken")
+    # bcrypt runs on the password executor, not the event loop or the shared threadpool
+    hashed_password = await hash_password_async(user.password)
+    return await run_blocking(crud.create_user, db, user, hashed_password)
 
 @router.get("/advisors/", response_model=List[User])
 def get_active_advisors(db: Session = Depends(get_db)):
@@ -189,12 +243,14 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    previous_email = user.email
     update_data = user_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(user, key, value)
     
     db.commit()
     db.refresh(user)
+    get_user_cache().invalidate(previous_email, user.email)
     return user
 
 @router.post("/entities/", response_model=Entity)
@@ -211,10 +267,52 @@ def create_contact(contact: ContactCreate, db: Session = Depends(get_db), curren
     db.refresh(db_obj)
     return db_obj
 
+def _list_page(response: Response, query, model, schema, cursor: Optional[int], limit: Optional[int], order: str, fields: Optional[str]):
+    """
+    Serve one keyset page of a CRM list; the next page's cursor is sent in the
+    X-Next-Cursor header so the body stays a plain list. With fields, only those
+    columns are selected and rows are returned as-is instead of through the schema.
+
+    Without limit and cursor every matching row is returned, as before paging
+    existed; a cursor without a limit gets CRM_PAGE_SIZE rows.
+    """
+    if limit is None and cursor is not None:
+        limit = settings.CRM_PAGE_SIZE
+    try:
+        selected = parse_fields(fields, list(schema.model_fields))
+        rows, next_cursor = keyset_page(query, model, cursor, limit, order, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if selected:
+        return JSONResponse(content=jsonable_encoder(rows), headers=page_headers(next_cursor))
+    response.headers.update(page_headers(next_cursor))
+    return rows
+
 @router.get("/contacts/", response_model=List[Contact])
-def list_contacts(db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+def list_contacts(
+    response: Response,
+    email: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.CRM_MAX_PAGE_SIZE),
+    order: str = "asc",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    List contacts, all at once or one page at a time.
+
+    Send limit to page; pass the X-Next-Cursor response header back as cursor for the next page;
+    fields (e.g. "id,name,email") selects a subset of columns.
+    """
     from app.models.crm import Contact as ContactModel
-    return db.query(ContactModel).all()
+    q = db.query(ContactModel)
+    if email:
+        q = q.filter(ContactModel.email == email)
+    q = filter_created(q, ContactModel, created_after, created_before)
+    return _list_page(response, q, ContactModel, Contact, cursor, limit, order, fields)
 
 @router.post("/matters/", response_model=Matter)
 def create_matter(matter: MatterCreate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
@@ -226,9 +324,39 @@ def create_matter(matter: MatterCreate, db: Session = Depends(get_db), current_u
     return db_obj
 
 @router.get("/matters/", response_model=List[Matter])
-def list_matters(db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+def list_matters(
+    response: Response,
+    pipeline: Optional[str] = None,
+    stage: Optional[str] = None,
+    advisor_id: Optional[int] = None,
+    contact_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.CRM_MAX_PAGE_SIZE),
+    order: str = "asc",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    List matters, all at once or one page at a time, filtered by pipeline, stage, advisor or contact.
+
+    Send limit to page; pass the X-Next-Cursor response header back as cursor for the next page;
+    fields (e.g. "id,title,stage") selects a subset of columns.
+    """
     from app.models.crm import Matter as MatterModel
-    return db.query(MatterModel).all()
+    q = db.query(MatterModel)
+    if pipeline:
+        q = q.filter(MatterModel.pipeline == pipeline)
+    if stage:
+        q = q.filter(MatterModel.stage == stage)
+    if advisor_id is not None:
+        q = q.filter(MatterModel.advisor_id == advisor_id)
+    if contact_id is not None:
+        q = q.filter(MatterModel.contact_id == contact_id)
+    q = filter_created(q, MatterModel, created_after, created_before)
+    return _list_page(response, q, MatterModel, Matter, cursor, limit, order, fields)
 
 @router.get("/clients/me/matters", response_model=List[Matter])
 def list_my_matters(db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
@@ -284,12 +412,33 @@ def create_intake(payload: IntakeCreate, db: Session = Depends(get_db), current_
     return db_obj
 
 @router.get("/intakes/", response_model=List[Intake])
-def list_intakes(matter_id: Optional[int] = None, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
+def list_intakes(
+    response: Response,
+    matter_id: Optional[int] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.CRM_MAX_PAGE_SIZE),
+    order: str = "asc",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    List intakes, all at once or one page at a time, optionally for one matter or status.
+
+    Send limit to page; pass the X-Next-Cursor response header back as cursor for the next page;
+    fields (e.g. "id,name,status") skips the potentially large data_json column.
+    """
     from app.models.intake import Intake as IntakeModel
     q = db.query(IntakeModel)
     if matter_id:
         q = q.filter(IntakeModel.matter_id == matter_id)
-    return q.all()
+    if status:
+        q = q.filter(IntakeModel.status == status)
+    q = filter_created(q, IntakeModel, created_after, created_before)
+    return _list_page(response, q, IntakeModel, Intake, cursor, limit, order, fields)
 
 @router.post("/field-mappings", response_model=FieldMapping)
 def upsert_field_mapping(mapping: FieldMapping, db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)):
@@ -323,16 +472,6 @@ def get_pipeline_stats(
     it will scope to their advisor. SuperAdmin/Admin may pass advisor_id to
     scope to a specific advisor; otherwise returns aggregate across all advisors.
     """
-    from app.models.crm import Matter as MatterModel
-    from datetime import datetime, timedelta
-    
-    # Filter by period
-    now = datetime.utcnow()
-    if period == "month":
-        start_date = now - timedelta(days=30)
-    else:
-        start_date = datetime(2000, 1, 1)  # inception
-    
     # Determine effective advisor scope
     effective_advisor_id: Optional[int] = None
     try:
@@ -345,45 +484,14 @@ def get_pipeline_stats(
     except Exception:
         effective_advisor_id = advisor_id
 
-    # Build query
-    q = db.query(MatterModel).filter(MatterModel.created_at >= start_date)
-    if effective_advisor_id is not None:
-        q = q.filter(MatterModel.advisor_id == effective_advisor_id)
-    matters = q.all()
-    
-    # Calculate KPIs
-    stats = {
-        "leads": len([m for m in matters if m.stage == "New"]),
-        "booked": len([m for m in matters if m.stage in ["Booked", "Paid"]]),
-        "showed": len([m for m in matters if m.stage in ["Signed", "Onboarding", "Completed"]]),
-        "signed": len([m for m in matters if m.stage in ["Signed", "Completed"]]),
-        "matters_in_process": len([m for m in matters if m.stage == "Onboarding"]),
-        "completed": len([m for m in matters if m.stage == "Completed"]),
-        "period": period
-    }
-    
-    # Calculate show up ratio
-    stats["show_up_ratio"] = (
-        round((stats["showed"] / stats["booked"]) * 100) if stats["booked"] > 0 else 0
-    )
-    
-    # Average $ per matter (mock for now)
-    stats["avg_dollar_per_matter"] = 18500 if stats["signed"] > 0 else 0
-    
-    # Total pipeline counts by stage
-    stats["pipeline_stages"] = {
-        "Booked Consults": stats["booked"],
-        "Pre-Engagement": stats["leads"],
-        "Engaged": stats["signed"],
-        "Questionnaire Received": 0,  # TODO: implement questionnaire tracking
-        "Matter in Process": stats["matters_in_process"],
-        "Matter Fulfilled": stats["completed"]
-    }
-    
-    return stats
+    # KPIs from one GROUP BY stage query (or the daily rollup)
+    return pipeline_stats.get_pipeline_stats(db, period, effective_advisor_id)
 
 # --- Public endpoint to create CRM records from public booking ---
-@router.post("/public/lead")
+@router.post(
+    "/public/lead",
+    dependencies=[Depends(rate_limit("public-lead", settings.PUBLIC_LEAD_RATE_LIMIT, settings.PUBLIC_LEAD_RATE_LIMIT_WINDOW_SECONDS))],
+)
 def public_lead_submit(payload: PublicLead, db: Session = Depends(get_db)):
     from app.models.crm import Contact as ContactModel, Matter as MatterModel
     from app.models.intake import Intake as IntakeModel
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Response
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.api.api import get_current_user
+from app.api.api import get_current_user, rate_limit
+from app.core.config import settings
 from app.models.user import User, Entity
 from app.services.rag_chat import get_rag_chat_service
 from app.services.document_processor import get_document_processor
 from app.services.vector_db import get_vector_db
+from app.services.embedding_cache import get_embedding_cache
+from app.services.retrieval_cache import get_retrieval_cache
+from app.core.concurrency import run_blocking, get_blocking_executor
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import logging
+from concurrent.futures import Future, wait
 from app.models.legal import Document
+from app.models.ingestion import IngestionJob
+from app.services.ingestion import get_ingestion_service
+from app.services.insights import get_insight_service, serialize_insight
 from app.services import seed_data
 
 logger = logging.getLogger(__name__)
@@ -22,10 +33,10 @@ class ChatRequest(BaseModel):
     context_type: str = "legal"
     conversation_history: Optional[List[Dict[str, str]]] = None
 
-class DocumentUploadResponse(BaseModel):
+class IngestionJobResponse(BaseModel):
     message: str
+    job_id: str
     document_id: str
-    chunks_created: int
     status: str
 
 class ChatResponse(BaseModel):
@@ -33,7 +44,22 @@ class ChatResponse(BaseModel):
     sources: List[Dict[str, Any]]
     status: str
 
-@router.post("/chat", response_model=ChatResponse)
+def _build_chat_filter(request: ChatRequest, current_user: User) -> Dict[str, Any]:
+    """Build the retrieval filter for a chat request, always scoped to the current user."""
+    filter_dict = {}
+    if request.entity_id:
+        filter_dict['entity_id'] = request.entity_id
+    if request.document_type:
+        filter_dict['document_type'] = request.document_type
+    
+    # Add user filter for security
+    filter_dict['user_id'] = str(current_user.id)
+    return filter_dict
+
+# Shared by /chat and /chat/stream: every request costs an LLM call
+chat_rate_limit = rate_limit("chat", settings.CHAT_RATE_LIMIT, settings.CHAT_RATE_LIMIT_WINDOW_SECONDS, per_user=True)
+
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(chat_rate_limit)])
 async def chat_with_documents(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
@@ -44,19 +70,11 @@ async def chat_with_documents(
     """
     try:
         rag_service = get_rag_chat_service()
-        
-        # Build filter dict
-        filter_dict = {}
-        if request.entity_id:
-            filter_dict['entity_id'] = request.entity_id
-        if request.document_type:
-            filter_dict['document_type'] = request.document_type
-        
-        # Add user filter for security
-        filter_dict['user_id'] = str(current_user.id)
+        filter_dict = _build_chat_filter(request, current_user)
         
         # Get response
-        response = rag_service.chat_with_documents(
+        response = await run_blocking(
+            rag_service.chat_with_documents,
             query=request.query,
             conversation_history=request.conversation_history,
             filter_dict=filter_dict,
@@ -73,10 +91,68 @@ async def chat_with_documents(
         logger.error(f"Error in chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _close_event_stream(events, pending: Optional[Future]) -> None:
+    """
+    Close a chat event generator (and with it the OpenAI stream) once no next() is running.
+
+    A client disconnect cancels event_stream while next() may still be executing on the
+    pool; closing the generator then would raise "generator already executing".
+    """
+    if pending is not None and not pending.cancel():
+        wait([pending])
+    try:
+        events.close()
+    except Exception as e:
+        logger.error(f"Error closing chat stream: {str(e)}")
+
+@router.post("/chat/stream", dependencies=[Depends(chat_rate_limit)])
+async def stream_chat_with_documents(
+    request: ChatRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Chat with documents using RAG, streamed as Server-Sent Events.
+
+    Emits a `sources` event once retrieval finishes, then `token` events as the
+    model generates, then `done` (or `error`).
+    """
+    rag_service = get_rag_chat_service()
+    events = rag_service.stream_chat_with_documents(
+        query=request.query,
+        conversation_history=request.conversation_history,
+        filter_dict=_build_chat_filter(request, current_user),
+        context_type=request.context_type
+    )
+
+    async def event_stream():
+        # Pull each event on the blocking pool so the sync OpenAI stream never blocks the loop
+        executor = get_blocking_executor()
+        pending = None
+        try:
+            while True:
+                pending = executor.submit(next, events, None)
+                event = await asyncio.wrap_future(pending)
+                if event is None:
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if await http_request.is_disconnected():
+                    logger.info("Chat stream client disconnected; stopping generation")
+                    break
+        finally:
+            # Not awaited: on disconnect this task is cancelled, and awaiting here is not reliable
+            executor.submit(_close_event_stream, events, pending)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 ALLOWED_TYPES = {"application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
 MAX_BYTES = 20 * 1024 * 1024
 
-@router.post("/upload-and-index")
+@router.post("/upload-and-index", status_code=202, response_model=IngestionJobResponse)
 async def upload_and_index_document(
     file: UploadFile = File(...),
     entity_id: str = Form(...),
@@ -85,7 +161,9 @@ async def upload_and_index_document(
     db: Session = Depends(get_db)
 ):
     """
-    Upload a document and index it in the vector database.
+    Upload a document and queue it for indexing in the vector database.
+
+    Returns immediately with a job id; poll /ingestion-jobs/{job_id} for progress.
     """
     try:
         # Validate content type
@@ -107,58 +185,79 @@ async def upload_and_index_document(
         file_content = bytes(buf)
         file_name = file.filename
         file_type = file_name.split('.')[-1] if '.' in file_name else 'txt'
+        document_id = f"{entity_id}_{file_name}"
         
-        # Process document
-        processor = get_document_processor()
-        processed = processor.process_document(
+        # Persist and queue; extraction, chunking, embedding and upsert run on the ingestion workers
+        job = await run_blocking(
+            get_ingestion_service().enqueue,
+            db,
             file_content=file_content,
             file_name=file_name,
             file_type=file_type,
-            metadata={
-                'entity_id': entity_id,
-                'document_type': document_type,
-                'user_id': str(current_user.id)
-            }
+            document_id=document_id,
+            entity_id=entity_id,
+            document_type=document_type,
+            user_id=str(current_user.id)
         )
         
-        # Index in vector database
-        vector_db = get_vector_db()
-        success = vector_db.upsert_document_chunks(
-            chunks=processed['chunks'],
-            metadata={
-                'document_id': f"{entity_id}_{file_name}",
-                'entity_id': entity_id,
-                'document_type': document_type,
-                'user_id': str(current_user.id),
-                'file_name': file_name
-            }
-        )
-        
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to index document")
-        
-        return DocumentUploadResponse(
-            message="Document uploaded and indexed successfully",
-            document_id=f"{entity_id}_{file_name}",
-            chunks_created=processed['num_chunks'],
-            status="success"
+        return IngestionJobResponse(
+            message="Document queued for indexing",
+            job_id=job.id,
+            document_id=document_id,
+            status=job.status
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading document: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/ingestion-jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Report status and per-stage progress of an indexing job.
+    """
+    job = db.query(IngestionJob).filter(
+        IngestionJob.id == job_id,
+        IngestionJob.user_id == str(current_user.id)
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        'job_id': job.id,
+        'document_id': job.document_id,
+        'file_name': job.file_name,
+        'status': job.status,
+        'stage': job.stage,
+        'chunks_total': job.chunks_total,
+        'chunks_done': job.chunks_done,
+        'attempts': job.attempts,
+        'next_attempt_at': job.next_attempt_at,
+        'error': job.error,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at
+    }
+
 @router.post("/analyze-document")
 async def analyze_document(
     file: UploadFile = File(...),
     analysis_type: str = Form("summary"),
+    mode: str = Form("auto"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Analyze a document using GPT-4o.
+    Analyze a document using GPT-4o (map-reduce for documents too long for one call).
     """
     try:
+        if mode not in {"auto", "single", "map_reduce"}:
+            raise HTTPException(status_code=400, detail="mode must be auto, single or map_reduce")
         # Validate content type
         content_type = (file.content_type or "").lower()
         if content_type not in ALLOWED_TYPES:
@@ -181,72 +280,146 @@ async def analyze_document(
         
         # Extract text
         processor = get_document_processor()
-        text = processor.extract_text(file_content, file_type)
+        text = await run_blocking(processor.extract_text, file_content, file_type)
         
         # Analyze document
         rag_service = get_rag_chat_service()
-        analysis = rag_service.analyze_document(text, analysis_type)
+        analysis = await run_blocking(rag_service.analyze_document, text, analysis_type, mode)
         
         return {
             'file_name': file_name,
             'analysis': analysis['analysis'],
             'analysis_type': analysis_type,
+            'mode': analysis.get('mode'),
+            'stats': analysis.get('stats'),
             'status': analysis['status']
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing document: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _require_entity_access(db: Session, current_user: User, entity_id: str) -> None:
+    """
+    403 unless the entity is linked to the current user or the user has indexed
+    documents under it (uploads take a free-form entity_id). Admins may access any entity.
+    """
+    if getattr(current_user, "role", None) in ["Admin", "SuperAdmin"]:
+        return
+    if any(str(entity.id) == str(entity_id) for entity in current_user.entities):
+        return
+    owns_documents = db.query(IngestionJob.id).filter(
+        IngestionJob.entity_id == str(entity_id),
+        IngestionJob.user_id == str(current_user.id)
+    ).first()
+    if owns_documents is None:
+        raise HTTPException(status_code=403, detail="Not authorized for this entity")
+
 @router.get("/document-insights/{entity_id}")
 async def get_document_insights(
     entity_id: str,
+    response: Response,
     document_type: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Generate insights across all documents for an entity.
+    Serve the stored insights for an entity. They are refreshed in the background
+    after ingestion; when none exist yet, generation is queued and a 202 with
+    status "pending" is returned (poll until it changes). If the first generation
+    failed, the stored error is returned with status "error"; it is retried in the
+    background once INSIGHTS_ERROR_RETRY_SECONDS have passed.
     """
     try:
-        rag_service = get_rag_chat_service()
-        insights = rag_service.generate_document_insights(entity_id, document_type)
+        await run_blocking(_require_entity_access, db, current_user, entity_id)
+        insight_service = get_insight_service()
+        row = await run_blocking(insight_service.get, db, entity_id, document_type)
+        if row is not None and row.generated_at is None and row.status == 'error':
+            if insight_service.should_retry_failed(row):
+                insight_service.schedule_refresh(entity_id, document_type)
+            return serialize_insight(row)
+        if row is None or row.generated_at is None:
+            insight_service.schedule_refresh(entity_id, document_type)
+            response.status_code = 202
+            return {
+                'entity_id': entity_id,
+                'document_type': document_type,
+                'insights': '',
+                'documents_analyzed': None,
+                'status': 'pending',
+                'stale': True,
+                'refreshing': True,
+                'generated_at': None,
+                'error': None,
+            }
         
-        return insights
+        return serialize_insight(row)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating insights: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/document-insights/{entity_id}/refresh", status_code=202)
+async def refresh_document_insights(
+    entity_id: str,
+    document_type: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a background regeneration of an entity's insights.
+    """
+    await run_blocking(_require_entity_access, db, current_user, entity_id)
+    queued = get_insight_service().schedule_refresh(entity_id, document_type)
+    return {
+        'entity_id': entity_id,
+        'document_type': document_type,
+        'status': 'queued' if queued else 'already_refreshing'
+    }
+
 @router.get("/search")
 async def search_documents(
     query: str,
     entity_id: Optional[str] = None,
     top_k: int = 5,
+    hybrid: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Search documents using semantic search.
+    Search documents using semantic search, or hybrid full-text + semantic
+    search fused by reciprocal rank when hybrid=true.
     """
+    vector_db = get_vector_db()
+    if hybrid and not vector_db.lexical_search_available():
+        raise HTTPException(
+            status_code=400,
+            detail="Hybrid search needs the lexical index; set LEXICAL_INDEX_ENABLED for the Pinecone backend"
+        )
+    mode = "hybrid" if hybrid else "vector"
     try:
-        vector_db = get_vector_db()
-        
         # Build filter
         filter_dict = {'user_id': str(current_user.id)}
         if entity_id:
             filter_dict['entity_id'] = entity_id
         
         # Search
-        results = vector_db.search_similar_chunks(
+        results = await run_blocking(
+            vector_db.search_similar_chunks,
             query=query,
             top_k=top_k,
             filter_dict=filter_dict,
-            include_metadata=True
+            include_metadata=True,
+            mode=mode
         )
         
         return {
             'query': query,
+            'mode': mode,
             'results': results,
             'total_results': len(results)
         }
@@ -256,6 +429,26 @@ async def search_documents(
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
+@router.get("/embedding-cache/stats")
+async def get_embedding_cache_stats(current_user: User = Depends(get_current_user)):
+    """
+    Embedding cache hit/miss counters for this worker process.
+    """
+    if getattr(current_user, "role", None) not in ["Admin", "SuperAdmin"]:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return get_embedding_cache().stats()
+
+
+@router.get("/retrieval-cache/stats")
+async def get_retrieval_cache_stats(current_user: User = Depends(get_current_user)):
+    """
+    RAG retrieval cache hit/miss counters for this worker process.
+    """
+    if getattr(current_user, "role", None) not in ["Admin", "SuperAdmin"]:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return get_retrieval_cache().stats()
+
+
 @router.post("/seed-mock")
 async def seed_mock_documents_for_current_user(
     current_user: User = Depends(get_current_user),
@@ -310,7 +503,8 @@ async def seed_mock_documents_for_current_user(
                 db.refresh(db_doc)
 
             # Index content into vector database
-            processed = processor.process_document(
+            processed = await run_blocking(
+                processor.process_document,
                 file_content=doc_data['content'].encode('utf-8'),
                 file_name=doc_data['file_name'],
                 file_type='txt',
@@ -320,7 +514,8 @@ async def seed_mock_documents_for_current_user(
                     'user_id': str(current_user.id)
                 }
             )
-            ok = vector_db.upsert_document_chunks(
+            ok = await run_blocking(
+                vector_db.upsert_document_chunks,
                 chunks=processed['chunks'],
                 metadata={
                     'document_id': f"{entity.id}_{doc_data['file_name']}",
@@ -9,6 +9,7 @@ import os
 from ..db.database import get_db
 from ..models.user import User
 from ..core.config import settings
+from ..services.user_cache import get_user_cache
 from ..core.security import create_access_token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -79,6 +80,7 @@ async def google_auth(credential_data: dict, db: Session = Depends(get_db), resp
             if name and not user.name:
                 user.name = name
             db.commit()
+            get_user_cache().invalidate(user.email)
         
         # Create access token and set HttpOnly cookie
         access_token = create_access_token(
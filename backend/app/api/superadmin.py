@@ -6,8 +6,11 @@ from app.db.database import get_db
 from app.models.user import User as UserModel
 from app.api.api import get_current_user
 from app.db.crud import get_user_by_email
-from app.core.security import get_password_hash
+from app.core.security import hash_password_async
+from app.core.concurrency import run_blocking
 from app.core.security import encrypt_secret
+from app.services.user_cache import get_user_cache
+from app.services.rate_limit import get_rate_limiter
 import base64
 import pyotp
 
@@ -73,13 +76,18 @@ class AdvisorCreate(BaseModel):
     username: Optional[str] = None
     role: Optional[str] = "Advisor"
 
+def _add_user(db: Session, user: UserModel) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
 @router.post("/advisors")
-def create_advisor(
+async def create_advisor(
     payload: AdvisorCreate,
     db: Session = Depends(get_db),
     _: UserModel = Depends(require_superadmin)
 ):
-    existing = get_user_by_email(db, payload.email)
+    existing = await run_blocking(get_user_by_email, db, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     user = UserModel(
@@ -87,12 +95,10 @@ def create_advisor(
         name=payload.name,
         role=payload.role or "Advisor",
         username=payload.username,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=await hash_password_async(payload.password),
         is_active=True,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_blocking(_add_user, db, user)
     return {
         "id": user.id,
         "email": user.email,
@@ -116,6 +122,7 @@ def setup_2fa(db: Session = Depends(get_db), current_user: UserModel = Depends(r
     current_user.twofa_secret_iv = base64.b64encode(iv).decode("utf-8")
     db.add(current_user)
     db.commit()
+    get_user_cache().invalidate(current_user.email)
     uri = pyotp.totp.TOTP(secret).provisioning_uri(name=current_user.email, issuer_name="LIFTed VFO")
     log_admin_action(None, current_user, "2fa.setup", {})
     return {"otpauth_uri": uri}
@@ -131,8 +138,10 @@ def delete_advisor(
         raise HTTPException(status_code=404, detail="User not found")
     if user.role not in ("Advisor", "Admin"):
         raise HTTPException(status_code=400, detail="Can only delete Advisor/Admin users here")
+    email = user.email
     db.delete(user)
     db.commit()
+    get_user_cache().invalidate(email)
     return {"ok": True}
 
 
@@ -158,6 +167,7 @@ def link_client_to_advisor(
     db.add(client)
     db.commit()
     db.refresh(client)
+    get_user_cache().invalidate(client.email, advisor.email)
     return {"ok": True, "client_id": client.id, "advisor_id": advisor.id}
 
 
@@ -172,12 +182,14 @@ def update_advisor(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    previous_email = user.email
     update_data = payload.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(user, key, value)
 
     db.commit()
     db.refresh(user)
+    get_user_cache().invalidate(previous_email, user.email)
     return {
         "id": user.id,
         "email": user.email,
@@ -189,3 +201,15 @@ def update_advisor(
     }
 
 
+
+
+@router.get("/user-cache/stats")
+def user_cache_stats(_: UserModel = Depends(require_superadmin)):
+    """Authenticated-user cache counters for this worker process (hits = users SELECTs saved)."""
+    return get_user_cache().stats()
+
+
+@router.get("/rate-limit/stats")
+def rate_limit_stats(_: UserModel = Depends(require_superadmin)):
+    """Rate limiter counters for this worker process (store backend, allowed/denied, tracked keys)."""
+    return get_rate_limiter().stats()
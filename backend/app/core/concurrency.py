@@ -0,0 +1,48 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Dedicated pool for blocking OpenAI / Pinecone / SQLAlchemy work triggered from async endpoints.
+# Kept separate from Starlette's default threadpool so long LLM calls cannot starve sync endpoints.
+_blocking_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded executor for blocking I/O."""
+    global _blocking_executor
+    if _blocking_executor is None:
+        _blocking_executor = ThreadPoolExecutor(
+            max_workers=settings.BLOCKING_POOL_SIZE,
+            thread_name_prefix="blocking-io"
+        )
+    return _blocking_executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable on the bounded executor without blocking the event loop.
+
+    Args:
+        func: Blocking callable
+        *args, **kwargs: Arguments forwarded to func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_executor() -> None:
+    """Stop accepting work and wait for in-flight calls (used on app shutdown)."""
+    global _blocking_executor
+    if _blocking_executor is not None:
+        _blocking_executor.shutdown(wait=True)
+        _blocking_executor = None
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,33 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Authenticated-user cache in get_current_user (per worker process; TTL 0 disables)
+    USER_CACHE_SIZE: int = 1000
+    USER_CACHE_TTL_SECONDS: int = 30
+    # bcrypt cost factor; existing hashes with fewer rounds are re-hashed on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Concurrent bcrypt hashes/verifications per worker process (dedicated pool)
+    PASSWORD_HASH_CONCURRENCY: int = max(1, (os.cpu_count() or 2) // 2)
+    # Repeat logins with recently verified credentials skip bcrypt (per worker; TTL 0 disables)
+    VERIFIED_CREDENTIAL_CACHE_SIZE: int = 10000
+    VERIFIED_CREDENTIAL_TTL_SECONDS: int = 300
+    # Rate limiting: "memory" (per worker process) or "postgres" (rate_limit_counters, shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000  # memory backend; least recently used keys are evicted beyond this
+    # Failed logins per IP and per username; public intake submissions per IP; chat requests per user
+    LOGIN_RATE_LIMIT: int = 10
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 900
+    PUBLIC_LEAD_RATE_LIMIT: int = 20
+    PUBLIC_LEAD_RATE_LIMIT_WINDOW_SECONDS: int = 3600
+    CHAT_RATE_LIMIT: int = 30
+    CHAT_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    # CRM list endpoints (contacts, matters, intakes): page size when a cursor is sent without a limit,
+    # and the largest limit accepted; requests with neither limit nor cursor get every row
+    CRM_PAGE_SIZE: int = 50
+    CRM_MAX_PAGE_SIZE: int = 500
+    # Maintain the matter_stage_daily rollup on matter writes and serve /pipeline/stats from it instead of
+    # grouping matters; run scripts/rebuild_pipeline_rollup.py after turning it on
+    PIPELINE_STATS_ROLLUP: bool = False
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""
@@ -17,11 +45,85 @@ class Settings(BaseSettings):
     PINECONE_ENVIRONMENT: str = ""
     PINECONE_INDEX_NAME: str = "vfo-documents"
     PINECONE_DIMENSION: int = 1536  # Dimension for text-embedding-3-small
+
+    # Embedding provider: "openai" or "local" (sentence-transformers on CPU). Its output
+    # dimension must equal PINECONE_DIMENSION (e.g. 384 for all-MiniLM-L6-v2).
+    EMBEDDING_PROVIDER: str = "openai"
+    LOCAL_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 64
+    LOCAL_EMBEDDING_PROCESSES: int = max(1, min(4, (os.cpu_count() or 1)))  # Bulk re-index jobs only
+
+    # Embedding requests: max inputs and max total tokens per embeddings.create call
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000
+
+    # Embedding cache: in-process LRU size and optional write-through to the embedding_cache table
+    EMBEDDING_CACHE_SIZE: int = 5000
+    EMBEDDING_CACHE_PERSIST: bool = False
+
+    # Vector backend: "pinecone", "pgvector" or "postgres"; empty picks Pinecone when PINECONE_API_KEY is set
+    VECTOR_BACKEND: str = ""
+    PGVECTOR_INDEX_TYPE: str = "hnsw"  # "hnsw" or "ivfflat"
+    PGVECTOR_EF_SEARCH: int = 40
+    PGVECTOR_PROBES: int = 10
+    # Filtered (per-user) searches: ef_search >= top_k * multiplier, plus iterative index scans
+    # ("relaxed_order" or "strict_order", pgvector >= 0.8; "off" disables). Short results fall back to an exact scan.
+    PGVECTOR_FILTERED_EF_MULTIPLIER: int = 10
+    PGVECTOR_ITERATIVE_SCAN: str = "relaxed_order"
+
+    # Postgres fallback embedding storage ("float32" or "float16")
+    EMBEDDING_STORAGE_DTYPE: str = "float32"
+    CHUNK_WRITE_BATCH_SIZE: int = 500  # Rows per multi-row INSERT ... ON CONFLICT
     
     # Document Processing
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    CHUNKER_WINDOW_CHARS: int = 20000  # Text buffered by the streaming chunker before splitting
     MAX_SEARCH_RESULTS: int = 5
+    CONTEXT_RETRIEVAL_TOP_K: int = 8  # Chunks retrieved per chat turn before token packing
+    CONTEXT_TOKEN_BUDGET: int = 3000  # Max tokens of document context per prompt
+    HISTORY_TOKEN_BUDGET: int = 1500  # Max tokens of conversation history per prompt
+    RETRIEVAL_SEARCH_MODE: str = "vector"  # vector, hybrid or lexical for RAG chat retrieval
+    # Pinecone backend only: mirror chunk text into Postgres for full-text search; unset = on only for
+    # hybrid/lexical RETRIEVAL_SEARCH_MODE. The Postgres backends always support lexical search.
+    LEXICAL_INDEX_ENABLED: Optional[bool] = None
+    HYBRID_CANDIDATE_MULTIPLIER: int = 4  # Candidates per retriever = top_k * multiplier before fusion
+    RRF_K: int = 60
+
+    # Optional cross-encoder re-ranking of chat retrieval (sentence-transformers, CPU)
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20  # Chunks retrieved before re-ranking
+    RERANK_TOP_N: int = 5  # Chunks kept for the prompt
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_MAX_LENGTH: int = 512
+    RETRIEVAL_CACHE_SIZE: int = 1000  # 0 disables the RAG retrieval cache
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 600
+    PDF_EXTRACTION_WORKERS: int = max(1, min(4, (os.cpu_count() or 1)))
+    PDF_PARALLEL_MIN_PAGES: int = 50  # Smaller PDFs are extracted in-process
+
+    # Long-document analysis: one call up to the single-pass budget, map-reduce above it
+    ANALYSIS_SINGLE_PASS_MAX_TOKENS: int = 12000
+    ANALYSIS_MAP_CHUNK_TOKENS: int = 3000
+    ANALYSIS_MAP_CHUNK_OVERLAP_TOKENS: int = 150
+    ANALYSIS_MAP_MAX_TOKENS: int = 800  # Completion budget per part / intermediate reduce
+    ANALYSIS_MAP_CONCURRENCY: int = 4
+    ANALYSIS_REDUCE_MAX_TOKENS: int = 12000
+
+    # Background ingestion queue (per worker process; 0 disables the in-process workers)
+    INGESTION_WORKERS: int = 2
+    INGESTION_POLL_SECONDS: float = 2.0
+    INGESTION_STALE_SECONDS: int = 900  # Running jobs without a heartbeat for this long are requeued
+    INGESTION_HEARTBEAT_SECONDS: int = 60  # Must stay well below INGESTION_STALE_SECONDS
+    INGESTION_MAX_ATTEMPTS: int = 3  # Failed or abandoned jobs are retried up to this many runs in total
+    INGESTION_RETRY_BACKOFF_SECONDS: int = 30  # Delay before the first retry, doubled for each later one
+    # Upload spool; must be a volume shared by every host that runs ingestion workers
+    INGESTION_STORAGE_DIR: str = ""
+    INSIGHTS_REFRESH_WORKERS: int = 1  # Background LLM refreshes of stored entity insights
+    INSIGHTS_ERROR_RETRY_SECONDS: int = 300  # A failed first generation is retried on read only after this long
+
+    # Threads for blocking OpenAI/Pinecone/DB work offloaded from async endpoints (per worker)
+    BLOCKING_POOL_SIZE: int = 16
     
     class Config:
         env_file = ".env"
@@ -1,12 +1,25 @@
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import os
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with fewer rounds than BCRYPT_ROUNDS report needs_update and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
 ALGORITHM = "HS256"
 
@@ -20,11 +33,133 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# --- Password hashing ---
+# bcrypt is CPU-bound (~250ms per call at 12 rounds). All hashing and verification
+# runs on this small dedicated pool so a burst of logins queues here instead of
+# occupying every core and the threads that serve unrelated requests.
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_executor_lock = threading.Lock()
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Get or create the bounded executor for bcrypt work."""
+    global _password_executor
+    if _password_executor is None:
+        with _password_executor_lock:
+            if _password_executor is None:
+                _password_executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.PASSWORD_HASH_CONCURRENCY),
+                    thread_name_prefix="password-hash"
+                )
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Wait for in-flight hashing and stop the pool (used on app shutdown)."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True)
+        _password_executor = None
+
+
+class VerifiedCredentialCache:
+    """
+    Remembers recently verified logins so a repeat login skips bcrypt.
+
+    Only successful verifications are stored, so failed guesses always pay the
+    full bcrypt cost. Entries are keyed by an HMAC (per-process random key) of
+    email, password and the stored hash: no plaintext is kept, and changing the
+    password invalidates the entry because the stored hash changes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum remembered credentials
+            ttl_seconds: How long a verification is trusted (0 disables the cache)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._key = os.urandom(32)
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, email: str, password: str, hashed_password: str) -> str:
+        message = "\0".join([email, password, hashed_password]).encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).hexdigest()
+
+    def check(self, email: str, password: str, hashed_password: str) -> bool:
+        """True if these exact credentials were verified within the TTL."""
+        if self.ttl_seconds <= 0:
+            return False
+        digest = self._digest(email, password, hashed_password)
+        with self._lock:
+            expires = self._entries.get(digest)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[digest]
+                return False
+            self._entries.move_to_end(digest)
+            return True
+
+    def add(self, email: str, password: str, hashed_password: str) -> None:
+        """Remember a successful verification."""
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        digest = self._digest(email, password, hashed_password)
+        with self._lock:
+            self._entries[digest] = time.monotonic() + self.ttl_seconds
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+verified_credentials = VerifiedCredentialCache(
+    max_entries=settings.VERIFIED_CREDENTIAL_CACHE_SIZE,
+    ttl_seconds=settings.VERIFIED_CREDENTIAL_TTL_SECONDS
+)
+
+
+# Sync helpers for scripts and sync code paths; they run bcrypt in the calling thread.
+# Request handlers use the async helpers below so bcrypt runs on the bounded password executor.
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password) 
+    return pwd_context.hash(password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password executor without blocking the event loop."""
+    return await asyncio.wrap_future(get_password_executor().submit(pwd_context.hash, password))
+
+
+async def verify_login_password(email: str, password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a login password off the event loop.
+
+    Args:
+        email: Account email (part of the fast-path key)
+        password: Submitted password
+        hashed_password: Stored hash (None for accounts without a password)
+
+    Returns:
+        (valid, new_hash) where new_hash is set when the stored hash uses outdated
+        parameters and should be replaced (passlib's needs_update)
+    """
+    if not hashed_password:
+        return False, None
+    if verified_credentials.check(email, password, hashed_password):
+        return True, None
+    valid, new_hash = await asyncio.wrap_future(
+        get_password_executor().submit(pwd_context.verify_and_update, password, hashed_password)
+    )
+    if valid and new_hash is None:
+        verified_credentials.add(email, password, hashed_password)
+    return valid, new_hash
 
 # --- Application-layer encryption helpers (envelope style) ---
 def _get_data_encryption_key() -> bytes:
@@ -1,9 +1,12 @@
 from app.db.database import Base, engine
 from app.models.user import User, Entity
-from app.models.legal import Document, DocumentChunk
+from app.models.legal import Document, DocumentChunk, EmbeddingCacheEntry, IndexVersion, DocumentInsight
 from app.models.agent import Agent
-from app.models.crm import Contact, Matter
+from app.models.crm import Contact, Matter, MatterStageDaily
 from app.models.intake import Intake, FieldMapping
+from app.models.ingestion import IngestionJob
+from app.models.rate_limit import RateLimitCounter
+import app.services.pipeline_stats  # noqa: F401  (registers the matter_stage_daily rollup listeners if PIPELINE_STATS_ROLLUP)
 from sqlalchemy import text
 import os
 
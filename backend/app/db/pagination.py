@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Query
+
+ORDERS = ("asc", "desc")
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a sparse field selection like "id,title,stage".
+
+    Args:
+        fields: Comma-separated field names, or None for full objects
+        allowed: Selectable fields (the response schema's fields)
+
+    Returns:
+        Field names with "id" always first (it is the cursor), or None
+
+    Raises:
+        ValueError: If a field is not selectable
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
+def filter_created(query: Query, model: Any, created_after: Optional[datetime], created_before: Optional[datetime]) -> Query:
+    """Restrict a query to rows created in [created_after, created_before)."""
+    if created_after is not None:
+        query = query.filter(model.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(model.created_at < created_before)
+    return query
+
+
+def keyset_page(
+    query: Query,
+    model: Any,
+    cursor: Optional[int],
+    limit: Optional[int],
+    order: str = "asc",
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    Fetch one page of a filtered query by primary-key keyset.
+
+    Pages continue from the last id seen (WHERE id > cursor ORDER BY id LIMIT n),
+    so every page is one index range scan no matter how deep it is, unlike
+    OFFSET. Ids are assigned in insertion order, so "desc" is newest first.
+
+    Args:
+        query: Filtered query over model
+        model: Mapped class with an integer id primary key
+        cursor: Last id of the previous page, or None for the first page
+        limit: Page size, or None for every remaining row
+        order: "asc" or "desc" by id
+        fields: Columns to select (from parse_fields); None loads full objects
+
+    Returns:
+        (rows, next_cursor) where rows are ORM objects, or dicts when fields is
+        given, and next_cursor is None on the last page
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+    if fields:
+        query = query.with_entities(*[getattr(model, f) for f in fields])
+    if cursor is not None:
+        query = query.filter(model.id > cursor if order == "asc" else model.id < cursor)
+    query = query.order_by(model.id.asc() if order == "asc" else model.id.desc())
+    if limit is None:
+        rows, has_more = query.all(), False
+    else:
+        # One extra row tells us whether another page exists without a COUNT
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    if fields:
+        rows = [dict(row._mapping) for row in rows]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = last["id"] if fields else last.id
+    return rows, next_cursor
+
+
+def page_headers(next_cursor: Optional[int]) -> Dict[str, str]:
+    return {NEXT_CURSOR_HEADER: str(next_cursor)} if next_cursor is not None else {}
@@ -17,6 +17,11 @@ import sentry_sdk
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 from sqlalchemy import text
 from app.core.logging_config import configure_logging
+from app.core.concurrency import shutdown_blocking_executor
+from app.core.security import shutdown_password_executor
+from app.core.config import settings
+from app.services.ingestion import get_ingestion_service
+from app.services.insights import get_insight_service
 from starlette.middleware.base import BaseHTTPMiddleware
 import uuid
 
@@ -47,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # CRM list pagination
 )
 
 # Request ID middleware for structured logs
@@ -76,6 +82,14 @@ app.add_middleware(SecurityHeadersMiddleware)
 @app.on_event("startup")
 def on_startup():
     init_db()
+    get_ingestion_service().start(settings.INGESTION_WORKERS)
+
+@app.on_event("shutdown")
+def on_shutdown():
+    get_ingestion_service().stop()
+    get_insight_service().shutdown()
+    shutdown_blocking_executor()
+    shutdown_password_executor()
 
 app.include_router(api_router, prefix="/api")
 app.include_router(legal_router, prefix="/api/legal", tags=["legal"])
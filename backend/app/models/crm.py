@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -32,4 +32,24 @@ class Matter(Base):
 
     contact = relationship("Contact", back_populates="matters")
 
+    # Keyset pagination (ORDER BY id) within the common list filters
+    __table_args__ = (
+        Index("ix_matters_pipeline_stage_id", "pipeline", "stage", "id"),
+        Index("ix_matters_advisor_id_id", "advisor_id", "id"),
+        Index("ix_matters_contact_id_id", "contact_id", "id"),
+        # Pipeline stats: GROUP BY stage over a created_at range is an index-only scan
+        Index("ix_matters_advisor_id_created_at_stage", "advisor_id", "created_at", "stage"),
+        Index("ix_matters_created_at_stage", "created_at", "stage"),
+    )
+
+
+class MatterStageDaily(Base):
+    """Matters per advisor, creation day and current stage; maintained by app.services.pipeline_stats."""
+    __tablename__ = "matter_stage_daily"
+
+    advisor_id = Column(Integer, primary_key=True)  # 0 = no advisor
+    day = Column(Date, primary_key=True)  # Matter created_at date (UTC)
+    stage = Column(String, primary_key=True)  # "" = no stage
+    count = Column(Integer, nullable=False, default=0)
+
 
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from app.db.database import Base
+from datetime import datetime
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String(36), primary_key=True)  # uuid4
+    status = Column(String, index=True, nullable=False, default="queued")  # queued, running, succeeded, failed
+    stage = Column(String, nullable=False, default="queued")  # queued, extracting, embedding, storing, done
+    file_path = Column(String, nullable=False)
+    file_name = Column(String, nullable=False)
+    file_type = Column(String, nullable=False)
+    document_id = Column(String, index=True, nullable=False)
+    entity_id = Column(String, nullable=True)
+    user_id = Column(String, index=True, nullable=True)
+    document_type = Column(String, nullable=True)
+    chunks_total = Column(Integer, nullable=True)
+    chunks_done = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)  # Heartbeat while running
+    next_attempt_at = Column(DateTime, nullable=True)  # Retry backoff: not claimed before this time
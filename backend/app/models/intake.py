@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -16,6 +16,10 @@ class Intake(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_intakes_matter_id_id", "matter_id", "id"),  # Keyset pagination per matter
+    )
+
 
 class FieldMapping(Base):
     __tablename__ = "field_mappings"
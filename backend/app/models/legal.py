@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, LargeBinary, Boolean, UniqueConstraint, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
@@ -18,6 +19,7 @@ class Document(Base):
 
 class DocumentChunk(Base):
     __tablename__ = "document_chunks"
+    __table_args__ = (Index('ix_document_chunks_chunk_tsv', 'chunk_tsv', postgresql_using='gin'),)
 
     id = Column(String, primary_key=True, index=True)
     document_id = Column(String, index=True, nullable=False)
@@ -28,5 +30,43 @@ class DocumentChunk(Base):
     chunk_index = Column(Integer, nullable=False)
     page_number = Column(Integer, nullable=True)
     chunk_text = Column(Text, nullable=False)
-    embedding = Column(Text, nullable=True)  # Stored as JSON string
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    content_hash = Column(String(64), index=True, nullable=True)  # sha256 of the full chunk text
+    embedding = Column(LargeBinary, nullable=True)  # Packed little-endian floats
+    embedding_dim = Column(Integer, nullable=True)
+    embedding_dtype = Column(String(16), nullable=True)  # "float32" or "float16"
+    chunk_tsv = Column(TSVECTOR, Computed("to_tsvector('english', coalesce(chunk_text, ''))", persisted=True))  # Full-text index for lexical/hybrid search
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256(model + normalized text)
+    model = Column(String, nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # Packed little-endian float32
+    embedding_dim = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IndexVersion(Base):
+    __tablename__ = "index_versions"
+
+    scope = Column(String, primary_key=True)  # "global", "user:<id>" or "entity:<id>"
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DocumentInsight(Base):
+    __tablename__ = "document_insights"
+    __table_args__ = (UniqueConstraint('entity_id', 'document_type', name='uq_document_insights_entity_type'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_id = Column(String, index=True, nullable=False)
+    document_type = Column(String, nullable=False, default="")  # "" = all document types
+    insights = Column(Text, nullable=True)
+    documents_analyzed = Column(Integer, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, success, no_data, error
+    stale = Column(Boolean, nullable=False, default=True)  # set on ingest, cleared by a refresh
+    error = Column(Text, nullable=True)
+    generated_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, BigInteger
+from app.db.database import Base
+
+
+class RateLimitCounter(Base):
+    __tablename__ = "rate_limit_counters"
+
+    key = Column(String(255), primary_key=True)  # "<scope>:<client key>"
+    window_start = Column(BigInteger, primary_key=True)  # Epoch seconds, multiple of the window length
+    count = Column(Integer, nullable=False, default=0)
+    expires_at = Column(BigInteger, nullable=False, index=True)  # Epoch seconds; rows are pruned after this
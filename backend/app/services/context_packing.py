@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services.tokens import count_tokens, get_encoding
+
+MIN_OVERLAP_CHARS = 20  # Shorter suffix/prefix matches are treated as coincidence
+MIN_PARTIAL_TOKENS = 100  # Don't bother including a truncated passage smaller than this
+
+
+def _overlap_length(left: str, right: str, max_overlap: int) -> int:
+    """Length of the longest suffix of left that is also a prefix of right (0 if under MIN_OVERLAP_CHARS)."""
+    upper = min(len(left), len(right), max_overlap)
+    for k in range(upper, MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:k]):
+            return k
+    return 0
+
+
+def _join(left: str, right: str) -> str:
+    k = _overlap_length(left, right, settings.CHUNK_OVERLAP)
+    if k:
+        return left + right[k:]
+    return f"{left}\n{right}"
+
+
+def merge_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse retrieved chunks into passages.
+
+    Exact duplicate texts are dropped, and chunks with consecutive chunk_index
+    values from the same document are merged into one passage with the
+    CHUNK_OVERLAP region stored once. Passages keep the rank of their best chunk.
+
+    Args:
+        chunks: Retrieved chunks (Pinecone-match shaped), best first
+
+    Returns:
+        Passages with text, file_name, first_page, last_page, score and rank, best first
+    """
+    seen_texts = set()
+    by_document: Dict[Any, List[Dict[str, Any]]] = {}
+    for rank, chunk in enumerate(chunks):
+        metadata = chunk.get('metadata', {})
+        text = (metadata.get('chunk_text') or '').strip()
+        if not text or text in seen_texts:
+            continue
+        seen_texts.add(text)
+        index = metadata.get('chunk_index')
+        by_document.setdefault(metadata.get('document_id') or chunk.get('id'), []).append({
+            'text': text,
+            'file_name': metadata.get('file_name', 'Unknown'),
+            'first_page': metadata.get('page_number', 'N/A'),
+            'last_page': metadata.get('page_number', 'N/A'),
+            'chunk_index': int(index) if index is not None else None,
+            'score': chunk.get('score', 0),
+            'rank': rank,
+        })
+
+    passages = []
+    for members in by_document.values():
+        members.sort(key=lambda m: (m['chunk_index'] is None, m['chunk_index'] or 0, m['rank']))
+        current = None
+        for m in members:
+            if (
+                current is not None
+                and m['chunk_index'] is not None
+                and current['chunk_index'] is not None
+                and m['chunk_index'] == current['chunk_index'] + 1
+            ):
+                current['text'] = _join(current['text'], m['text'])
+                current['chunk_index'] = m['chunk_index']
+                current['last_page'] = m['last_page']
+                current['score'] = max(current['score'], m['score'])
+                current['rank'] = min(current['rank'], m['rank'])
+                continue
+            if current is not None:
+                passages.append(current)
+            current = dict(m)
+        if current is not None:
+            passages.append(current)
+
+    passages.sort(key=lambda p: p['rank'])
+    return passages
+
+
+def _header(i: int, passage: Dict[str, Any]) -> str:
+    if passage['first_page'] != passage['last_page']:
+        pages = f"Pages {passage['first_page']}-{passage['last_page']}"
+    else:
+        pages = f"Page {passage['first_page']}"
+    return f"[Source {i}: {passage['file_name']}, {pages}]\n"
+
+
+def pack_context(
+    chunks: List[Dict[str, Any]],
+    token_budget: Optional[int] = None,
+    model: Optional[str] = None
+) -> str:
+    """
+    Format retrieved chunks into a context string that fits a token budget.
+
+    Passages are added best first; the first one that does not fit is cut on a
+    token boundary if enough budget remains, and packing stops there.
+
+    Args:
+        chunks: Retrieved chunks, best first
+        token_budget: Max context tokens (defaults to CONTEXT_TOKEN_BUDGET)
+        model: Model whose tokenizer to count with (defaults to OPENAI_MODEL)
+
+    Returns:
+        Context string ("No relevant context found." if nothing fits)
+    """
+    budget = settings.CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    separator = "\n---\n"
+    separator_tokens = count_tokens(separator, model)
+    parts: List[str] = []
+    used = 0
+    for passage in merge_chunks(chunks):
+        header = _header(len(parts) + 1, passage)
+        overhead = count_tokens(header, model) + (separator_tokens if parts else 0)
+        body_tokens = count_tokens(passage['text'], model)
+        if used + overhead + body_tokens <= budget:
+            parts.append(f"{header}{passage['text']}\n")
+            used += overhead + body_tokens
+            continue
+        remaining = budget - used - overhead
+        if remaining >= MIN_PARTIAL_TOKENS:
+            encoding = get_encoding(model)
+            clipped = encoding.decode(encoding.encode(passage['text'], disallowed_special=())[:remaining])
+            parts.append(f"{header}{clipped} ...\n")
+        break
+
+    if not parts:
+        return "No relevant context found."
+    return separator.join(parts)
+
+
+def trim_history(
+    history: Optional[List[Dict[str, str]]],
+    token_budget: Optional[int] = None,
+    max_messages: int = 5,
+    model: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Keep the most recent conversation messages that fit a token budget.
+
+    Args:
+        history: Conversation messages, oldest first
+        token_budget: Max history tokens (defaults to HISTORY_TOKEN_BUDGET)
+        max_messages: Hard cap on the number of messages kept
+        model: Model whose tokenizer to count with
+
+    Returns:
+        The kept messages, oldest first
+    """
+    if not history:
+        return []
+    budget = settings.HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+    kept: List[Dict[str, str]] = []
+    used = 0
+    for msg in reversed(history[-max_messages:]):
+        tokens = count_tokens(msg.get('content') or '', model) + 4  # role/framing overhead per message
+        if used + tokens > budget:
+            break
+        kept.append(msg)
+        used += tokens
+    kept.reverse()
+    return kept
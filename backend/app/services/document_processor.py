@@ -1,7 +1,11 @@
 import os
 import io
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import tempfile
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Union
 from PyPDF2 import PdfReader
 import docx
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -9,6 +13,31 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool for PDF page extraction (spawned, not forked, as the app is threaded)."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _extraction_pool
+
+
+def _extract_pdf_page_range(source: Union[bytes, str], start: int, end: int) -> List[str]:
+    """
+    Extract text for pages [start, end); runs in pool workers so it must stay module-level.
+
+    source is the PDF bytes, or for pool tasks a file path, so the document is not
+    pickled into every task.
+    """
+    reader = PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
 class DocumentProcessor:
     """Service for processing and chunking documents."""
     
@@ -23,17 +52,55 @@ class DocumentProcessor:
     
     def extract_text_from_pdf(self, file_content: bytes) -> str:
         """Extract text from PDF file."""
+        return "".join(
+            f"\n[Page {page_number}]\n{page_text}"
+            for page_number, page_text in self.iter_pdf_pages(file_content)
+            if page_text
+        )
+    
+    def iter_pdf_pages(self, file_content: bytes) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) for each PDF page, in order.
+        
+        Large PDFs are split into page ranges extracted in parallel on a process
+        pool; pages are yielded as soon as their range finishes, so callers can
+        start chunking before the whole document is parsed.
+        
+        Args:
+            file_content: PDF bytes
+        
+        Yields:
+            1-based page number and extracted text
+        """
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PdfReader(pdf_file)
-            text = ""
+            num_pages = len(PdfReader(io.BytesIO(file_content)).pages)
+            workers = settings.PDF_EXTRACTION_WORKERS
+            if workers <= 1 or num_pages < settings.PDF_PARALLEL_MIN_PAGES:
+                for page_number, page_text in enumerate(_extract_pdf_page_range(file_content, 0, num_pages), 1):
+                    yield page_number, page_text
+                return
             
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n[Page {page_num + 1}]\n{page_text}"
-            
-            return text
+            # A few ranges per worker keeps the pool busy while early pages stream out
+            range_size = max(1, -(-num_pages // (workers * 4)))
+            pool = _get_extraction_pool()
+            # Workers read the PDF from one temp file instead of each task pickling the bytes
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                f.write(file_content)
+                pdf_path = f.name
+            futures = []
+            try:
+                futures = [
+                    (start, pool.submit(_extract_pdf_page_range, pdf_path, start, min(start + range_size, num_pages)))
+                    for start in range(0, num_pages, range_size)
+                ]
+                for start, future in futures:
+                    for offset, page_text in enumerate(future.result()):
+                        yield start + offset + 1, page_text
+            finally:
+                # Also runs when the caller stops early; don't let queued ranges read a deleted file
+                for _, future in futures:
+                    future.cancel()
+                os.remove(pdf_path)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             raise
@@ -43,25 +110,38 @@ class DocumentProcessor:
         try:
             doc_file = io.BytesIO(file_content)
             doc = docx.Document(doc_file)
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text:
-                    text += paragraph.text + "\n"
+            parts = [paragraph.text + "\n" for paragraph in doc.paragraphs if paragraph.text]
             
             # Also extract text from tables
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text:
-                            text += cell.text + " "
-                    text += "\n"
+                    parts.extend(cell.text + " " for cell in row.cells if cell.text)
+                    parts.append("\n")
             
-            return text
+            return "".join(parts)
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {str(e)}")
             raise
     
+    def iter_pages(self, file_content: bytes, file_type: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) for a document.
+        
+        Only PDFs carry page boundaries; other formats are yielded as a single
+        page numbered 0 (unknown page).
+        
+        Args:
+            file_content: File content as bytes
+            file_type: File extension (pdf, docx, txt, etc.)
+        
+        Yields:
+            Page number and page text
+        """
+        if file_type.lower().replace('.', '') == 'pdf':
+            yield from self.iter_pdf_pages(file_content)
+        else:
+            yield 0, self.extract_text(file_content, file_type)
+    
     def extract_text_from_txt(self, file_content: bytes) -> str:
         """Extract text from TXT file."""
         try:
@@ -130,6 +210,90 @@ class DocumentProcessor:
             logger.error(f"Error chunking document: {str(e)}")
             raise
     
+    def iter_chunks(
+        self,
+        pages: Iterable[Tuple[int, str]],
+        metadata: Optional[Dict] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Chunk a stream of pages incrementally.
+        
+        Pages are joined with newlines into a sliding buffer that is split once it
+        holds CHUNKER_WINDOW_CHARS characters; every piece except the last is
+        emitted and the buffer restarts at the last piece. Memory is therefore
+        bounded by the window plus one page, whatever the document size.
+        
+        Args:
+            pages: Iterable of (page_number, text), e.g. from iter_pages
+            metadata: Optional metadata to attach to chunks
+        
+        Yields:
+            Chunks with 'text', 'chunk_index', 'page' (page of the first character)
+            and 'start_char'/'end_char' offsets into the newline-joined document
+        """
+        window = max(settings.CHUNKER_WINDOW_CHARS, 2 * settings.CHUNK_SIZE)
+        buffer = ""
+        buffer_start = 0  # document offset of buffer[0]
+        page_starts: List[int] = []  # document offsets where each buffered page begins
+        page_numbers: List[int] = []
+        chunk_index = 0
+        
+        def emit(pieces: List[Tuple[int, str]]) -> Iterator[Dict[str, Any]]:
+            nonlocal chunk_index
+            for offset, piece in pieces:
+                start = buffer_start + offset
+                page_pos = max(0, bisect_right(page_starts, start) - 1)
+                chunk_data = {
+                    'text': piece,
+                    'chunk_index': chunk_index,
+                    'page': page_numbers[page_pos],
+                    'start_char': start,
+                    'end_char': start + len(piece)
+                }
+                if metadata:
+                    chunk_data.update(metadata)
+                chunk_index += 1
+                yield chunk_data
+        
+        for page_number, page_text in pages:
+            if not page_text:
+                continue
+            if buffer:
+                buffer += "\n"
+            page_starts.append(buffer_start + len(buffer))
+            page_numbers.append(page_number)
+            buffer += page_text
+            if len(buffer) < window:
+                continue
+            
+            pieces = self._locate_pieces(buffer)
+            if len(pieces) < 2:
+                continue
+            yield from emit(pieces[:-1])
+            
+            # Restart the buffer at the unfinished last piece and drop pages it no longer touches
+            cut = pieces[-1][0]
+            buffer = buffer[cut:]
+            buffer_start += cut
+            keep_from = max(0, bisect_right(page_starts, buffer_start) - 1)
+            del page_starts[:keep_from]
+            del page_numbers[:keep_from]
+        
+        if buffer.strip():
+            yield from emit(self._locate_pieces(buffer))
+    
+    def _locate_pieces(self, text: str) -> List[Tuple[int, str]]:
+        """Split text and return (offset, piece) pairs; pieces are in order and may overlap."""
+        located = []
+        search_from = 0
+        for piece in self.text_splitter.split_text(text):
+            offset = text.find(piece, search_from)
+            if offset < 0:
+                offset = search_from
+            located.append((offset, piece))
+            search_from = offset + 1
+        return located
+    
     def process_document(
         self, 
         file_content: bytes, 
@@ -138,7 +302,7 @@ class DocumentProcessor:
         metadata: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """
-        Process a complete document: extract text and chunk it.
+        Process a complete document: extract pages and chunk them as they stream in.
         
         Args:
             file_content: File content as bytes
@@ -150,25 +314,34 @@ class DocumentProcessor:
             Processed document with chunks
         """
         try:
-            # Extract text
-            text = self.extract_text(file_content, file_type)
+            total_characters = 0
             
-            if not text or len(text.strip()) == 0:
+            def counted(pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+                nonlocal total_characters
+                for page_number, page_text in pages:
+                    total_characters += len(page_text or "")
+                    yield page_number, page_text
+            
+            chunks = list(self.iter_chunks(
+                counted(self.iter_pages(file_content, file_type)),
+                {'file_name': file_name}
+            ))
+            
+            if not chunks:
                 raise ValueError("No text could be extracted from the document")
+            for chunk in chunks:
+                chunk['total_chunks'] = len(chunks)
+            logger.info(f"Created {len(chunks)} chunks from document")
             
             # Prepare metadata
             doc_metadata = {
                 'file_name': file_name,
                 'file_type': file_type,
-                'total_characters': len(text),
+                'total_characters': total_characters,
                 **(metadata or {})
             }
             
-            # Chunk the document
-            chunks = self.chunk_document(text, {'file_name': file_name})
-            
             return {
-                'text': text,
                 'chunks': chunks,
                 'metadata': doc_metadata,
                 'num_chunks': len(chunks)
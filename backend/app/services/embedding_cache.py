@@ -0,0 +1,173 @@
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.legal import EmbeddingCacheEntry
+from app.services.embedding_codec import encode_embedding, decode_embedding
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing so trivially different copies share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model: str, text: str) -> str:
+    """Content address for an embedding: sha256 over model name and normalized text."""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-process LRU backed by an optional database table."""
+
+    def __init__(self, max_entries: int, persist: bool = False):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum embeddings held in memory
+            persist: Whether to read through / write through the embedding_cache table
+        """
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Look up embeddings for texts.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            Mapping of text -> embedding for every cached text
+        """
+        found: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        seen = set()
+        with self._lock:
+            for t in texts:
+                if t in seen:
+                    continue
+                seen.add(t)
+                key = cache_key(model, t)
+                vec = self._entries.get(key)
+                if vec is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[t] = vec.tolist()
+                else:
+                    missing[key] = t
+
+        if missing and self.persist:
+            for key, vec in self._load(list(missing)).items():
+                found[missing.pop(key)] = vec.tolist()
+                self._remember(key, vec)
+                with self._lock:
+                    self.persistent_hits += 1
+
+        with self._lock:
+            self.misses += len(missing)
+        return found
+
+    def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """
+        Store freshly generated embeddings.
+
+        Args:
+            model: Embedding model name
+            embeddings: Mapping of text -> embedding
+        """
+        rows = {}
+        for t, emb in embeddings.items():
+            key = cache_key(model, t)
+            vec = np.asarray(emb, dtype=np.float32)
+            self._remember(key, vec)
+            rows[key] = vec
+        if rows and self.persist:
+            self._store(model, rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.persistent_hits = self.misses = 0
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = vec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        db: Session = SessionLocal()
+        try:
+            rows = db.query(EmbeddingCacheEntry).filter(EmbeddingCacheEntry.key.in_(keys)).all()
+            return {r.key: decode_embedding(r.embedding, r.embedding_dim) for r in rows}
+        except Exception as e:
+            logger.error(f"Error reading embedding cache: {str(e)}")
+            return {}
+        finally:
+            db.close()
+
+    def _store(self, model: str, rows: Dict[str, np.ndarray]) -> None:
+        db: Session = SessionLocal()
+        try:
+            stmt = pg_insert(EmbeddingCacheEntry).values([
+                {
+                    'key': key,
+                    'model': model,
+                    'embedding': encode_embedding(vec),
+                    'embedding_dim': int(vec.shape[0]),
+                }
+                for key, vec in rows.items()
+            ]).on_conflict_do_nothing(index_elements=['key'])
+            db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error writing embedding cache: {str(e)}")
+        finally:
+            db.close()
+
+
+# Singleton instance
+embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache."""
+    global embedding_cache
+    if embedding_cache is None:
+        embedding_cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            persist=settings.EMBEDDING_CACHE_PERSIST
+        )
+    return embedding_cache
@@ -0,0 +1,40 @@
+from typing import Sequence
+import numpy as np
+
+SUPPORTED_DTYPES = {"float32", "float16"}
+
+
+def encode_embedding(values: Sequence[float], dtype: str = "float32") -> bytes:
+    """
+    Pack an embedding into little-endian bytes for a LargeBinary column.
+
+    Args:
+        values: Embedding vector
+        dtype: Storage dtype ("float32" or "float16")
+
+    Returns:
+        Packed embedding bytes
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    return np.asarray(values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+
+
+def decode_embedding(blob, dimension: int, dtype: str = "float32") -> np.ndarray:
+    """
+    View packed embedding bytes as a NumPy array without copying.
+
+    Args:
+        blob: Bytes (or memoryview) produced by encode_embedding
+        dimension: Number of components stored
+        dtype: Storage dtype the blob was written with
+
+    Returns:
+        Read-only array of shape (dimension,)
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    arr = np.frombuffer(blob, dtype=np.dtype(dtype).newbyteorder("<"))
+    if arr.shape[0] != dimension:
+        raise ValueError(f"Embedding blob holds {arr.shape[0]} values, expected {dimension}")
+    return arr
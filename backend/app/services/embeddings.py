@@ -0,0 +1,144 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import numpy as np
+from openai import OpenAI
+from app.core.config import settings
+from app.services.similarity import normalize_rows
+from app.services.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Output dimensions of the OpenAI embedding models we use (default `dimensions`)
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+PROVIDERS = ("openai", "local")
+
+
+class EmbeddingProvider(ABC):
+    """Interface for embedding backends used by VectorDBService."""
+
+    # Key under which embeddings are cached; must differ between models
+    name: str = ""
+    # Output dimension, or None if only known after the first call
+    dimension: Optional[int] = None
+    # Max inputs per embed() call
+    batch_size: int = 100
+    # Max total tokens per embed() call, or None for no token limit
+    max_batch_tokens: Optional[int] = None
+    # Whether embed_multi_process really fans out; otherwise callers must batch themselves
+    multi_process: bool = False
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts, preserving order."""
+
+    def embed_multi_process(self, texts: List[str], processes: int) -> List[List[float]]:
+        """Embed many texts using several worker processes where the backend supports it."""
+        return self.embed(texts)
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens counted against max_batch_tokens."""
+        return 0
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Remote embeddings via OpenAI embeddings.create."""
+
+    def __init__(self, model: str, api_key: str):
+        """
+        Args:
+            model: OpenAI embedding model
+            api_key: OpenAI API key
+        """
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+        self.name = model
+        self.dimension = OPENAI_EMBEDDING_DIMENSIONS.get(model)
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.max_batch_tokens = settings.EMBEDDING_BATCH_MAX_TOKENS
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    def count_tokens(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Local CPU embeddings with sentence-transformers (no network calls, no rate limits)."""
+
+    def __init__(self, model_name: str, batch_size: int):
+        """
+        Load the model (downloaded to the Hugging Face cache on first use).
+
+        Args:
+            model_name: sentence-transformers model name or path
+            batch_size: Texts per forward pass
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"local:{model_name}"
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+        self.max_batch_tokens = None
+        self.multi_process = True
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return vectors.astype(np.float32).tolist()
+
+    def embed_multi_process(self, texts: List[str], processes: int) -> List[List[float]]:
+        """Encode across a pool of CPU worker processes (worth it for bulk re-indexing only)."""
+        if processes <= 1 or len(texts) < processes * self.batch_size:
+            return self.embed(texts)
+        pool = self.model.start_multi_process_pool(target_devices=["cpu"] * processes)
+        try:
+            vectors = self.model.encode_multi_process(texts, pool, batch_size=self.batch_size)
+        finally:
+            self.model.stop_multi_process_pool(pool)
+        return normalize_rows(np.asarray(vectors, dtype=np.float32)).tolist()
+
+
+def check_dimension(provider: EmbeddingProvider) -> None:
+    """Fail fast if the provider's output dimension does not match PINECONE_DIMENSION (the storage dimension)."""
+    if provider.dimension is not None and provider.dimension != settings.PINECONE_DIMENSION:
+        raise ValueError(
+            f"Embedding provider {provider.name} produces {provider.dimension}-dimensional vectors "
+            f"but PINECONE_DIMENSION is {settings.PINECONE_DIMENSION}; set PINECONE_DIMENSION to match "
+            f"and re-create the vector index"
+        )
+
+
+# Singleton instance
+embedding_provider: Optional[EmbeddingProvider] = None
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """Get or create the embedding provider selected by EMBEDDING_PROVIDER."""
+    global embedding_provider
+    if embedding_provider is None:
+        provider = (settings.EMBEDDING_PROVIDER or "openai").lower()
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown EMBEDDING_PROVIDER: {settings.EMBEDDING_PROVIDER}")
+        if provider == "local":
+            embedding_provider = LocalEmbeddingProvider(
+                settings.LOCAL_EMBEDDING_MODEL,
+                batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE
+            )
+        else:
+            embedding_provider = OpenAIEmbeddingProvider(settings.OPENAI_EMBEDDING_MODEL, settings.OPENAI_API_KEY)
+        check_dimension(embedding_provider)
+        logger.info(f"Embedding provider: {embedding_provider.name} ({embedding_provider.dimension} dims)")
+    return embedding_provider
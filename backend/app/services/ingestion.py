@@ -0,0 +1,335 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.ingestion import IngestionJob
+from app.services.document_processor import get_document_processor
+from app.services.insights import get_insight_service
+from app.services.vector_db import get_vector_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "db", "uploads", "ingestion")
+REQUEUE_INTERVAL_SECONDS = 60  # How often each process looks for jobs abandoned by dead workers
+
+
+def _remove_file(path: str) -> None:
+    """Delete a stored upload once its job has finished for good."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error(f"Error removing ingestion upload {path}: {str(e)}")
+
+
+class IngestionService:
+    """DB-backed document indexing queue with an in-process worker pool."""
+
+    def __init__(self):
+        """Initialize storage location and worker state."""
+        self.storage_dir = settings.INGESTION_STORAGE_DIR or DEFAULT_STORAGE_DIR
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._requeue_lock = threading.Lock()
+        self._last_requeue = 0.0
+
+    def enqueue(
+        self,
+        db: Session,
+        file_content: bytes,
+        file_name: str,
+        file_type: str,
+        document_id: str,
+        entity_id: Optional[str],
+        document_type: Optional[str],
+        user_id: Optional[str]
+    ) -> IngestionJob:
+        """
+        Persist an uploaded file and queue it for indexing.
+
+        Args:
+            db: Database session
+            file_content: Raw file bytes
+            file_name: Original file name
+            file_type: File extension
+            document_id: Vector-store document ID
+            entity_id: Owning entity
+            document_type: Document type
+            user_id: Uploading user
+
+        Returns:
+            The queued job
+        """
+        os.makedirs(self.storage_dir, exist_ok=True)
+        job_id = str(uuid.uuid4())
+        file_path = os.path.join(self.storage_dir, f"{job_id}.{file_type}")
+        with open(file_path, "wb") as f:
+            f.write(file_content)
+
+        job = IngestionJob(
+            id=job_id,
+            status="queued",
+            stage="queued",
+            file_path=file_path,
+            file_name=file_name,
+            file_type=file_type,
+            document_id=document_id,
+            entity_id=entity_id,
+            user_id=user_id,
+            document_type=document_type,
+            chunks_done=0,
+            attempts=0,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        logger.info(f"Queued ingestion job {job_id} for {document_id}")
+        return job
+
+    def start(self, num_workers: int) -> None:
+        """Start polling worker threads (each loop also requeues stale jobs periodically)."""
+        if self._threads or num_workers <= 0:
+            return
+        self._stop.clear()
+        for i in range(num_workers):
+            t = threading.Thread(target=self._worker_loop, name=f"ingestion-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"Started {num_workers} ingestion workers")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Signal workers to exit after their current job."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            self._maybe_requeue_stale()
+            try:
+                job_id = self._claim_next()
+            except Exception as e:
+                logger.error(f"Error claiming ingestion job: {str(e)}")
+                job_id = None
+            if job_id is None:
+                self._stop.wait(settings.INGESTION_POLL_SECONDS)
+                continue
+            try:
+                self._run(job_id)
+            except Exception as e:
+                # e.g. the DB write recording a failure; never let it kill the worker thread
+                logger.error(f"Unhandled error in ingestion job {job_id}: {str(e)}")
+
+    def _maybe_requeue_stale(self) -> None:
+        """Run _requeue_stale from one worker at most every REQUEUE_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        with self._requeue_lock:
+            if self._last_requeue and now - self._last_requeue < REQUEUE_INTERVAL_SECONDS:
+                return
+            self._last_requeue = now
+        self._requeue_stale()
+
+    def _claim_next(self) -> Optional[str]:
+        """Atomically move the oldest queued job to running; safe across processes via SKIP LOCKED."""
+        db: Session = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            job = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.status == "queued",
+                    or_(IngestionJob.next_attempt_at.is_(None), IngestionJob.next_attempt_at <= now)
+                )
+                .order_by(IngestionJob.created_at)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                db.rollback()
+                return None
+            job.status = "running"
+            job.stage = "extracting"
+            job.attempts = (job.attempts or 0) + 1
+            job.started_at = now
+            job.updated_at = now
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def _requeue_stale(self) -> None:
+        """
+        Put back jobs left running by a worker that died mid-job (in any process);
+        jobs that have used up INGESTION_MAX_ATTEMPTS are failed instead.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.INGESTION_STALE_SECONDS)
+        db: Session = SessionLocal()
+        try:
+            stale = (
+                db.query(IngestionJob)
+                .filter(IngestionJob.status == "running", IngestionJob.updated_at < cutoff)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            now = datetime.utcnow()
+            exhausted = []
+            for job in stale:
+                if (job.attempts or 0) >= settings.INGESTION_MAX_ATTEMPTS:
+                    job.status = "failed"
+                    job.error = "Worker stopped responding; retry limit reached"
+                    job.finished_at = now
+                    exhausted.append(job.file_path)
+                else:
+                    job.status = "queued"
+                    job.stage = "queued"
+                job.updated_at = now
+            db.commit()
+            for path in exhausted:
+                _remove_file(path)
+            if stale:
+                logger.info(f"Requeued {len(stale) - len(exhausted)} stale ingestion jobs, failed {len(exhausted)}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error requeuing stale ingestion jobs: {str(e)}")
+        finally:
+            db.close()
+
+    def _update(self, job_id: str, **fields) -> None:
+        db: Session = SessionLocal()
+        try:
+            fields["updated_at"] = datetime.utcnow()
+            db.query(IngestionJob).filter(IngestionJob.id == job_id).update(fields, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _heartbeat(self, job_id: str, done: threading.Event) -> None:
+        """Touch updated_at while a job runs so _requeue_stale never hands it to a second worker."""
+        while not done.wait(settings.INGESTION_HEARTBEAT_SECONDS):
+            db: Session = SessionLocal()
+            try:
+                db.query(IngestionJob).filter(
+                    IngestionJob.id == job_id, IngestionJob.status == "running"
+                ).update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error recording heartbeat for ingestion job {job_id}: {str(e)}")
+            finally:
+                db.close()
+
+    def _run(self, job_id: str) -> None:
+        # Long extractions and embedding batches send no progress updates; keep the job visibly alive
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, done), name=f"ingestion-heartbeat-{job_id[:8]}", daemon=True)
+        heartbeat.start()
+        try:
+            self._run_job(job_id)
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _run_job(self, job_id: str) -> None:
+        db: Session = SessionLocal()
+        try:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is None:
+                return
+            db.expunge(job)
+        finally:
+            db.close()
+
+        try:
+            try:
+                with open(job.file_path, "rb") as f:
+                    file_content = f.read()
+            except FileNotFoundError:
+                raise RuntimeError(
+                    f"Upload {job.file_path} not found on this host; INGESTION_STORAGE_DIR must be "
+                    f"shared by every host running ingestion workers"
+                )
+
+            processed = get_document_processor().process_document(
+                file_content=file_content,
+                file_name=job.file_name,
+                file_type=job.file_type,
+                metadata={
+                    'entity_id': job.entity_id,
+                    'document_type': job.document_type,
+                    'user_id': job.user_id
+                }
+            )
+            self._update(job_id, stage="embedding", chunks_total=processed['num_chunks'], chunks_done=0)
+
+            def on_progress(stage: str, done: int, total: int) -> None:
+                if stage == "embedding":
+                    self._update(job_id, stage=stage, chunks_done=done)
+                else:
+                    self._update(job_id, stage=stage)
+
+            success = get_vector_db().upsert_document_chunks(
+                chunks=processed['chunks'],
+                metadata={
+                    'document_id': job.document_id,
+                    'entity_id': job.entity_id,
+                    'document_type': job.document_type,
+                    'user_id': job.user_id,
+                    'file_name': job.file_name
+                },
+                progress_callback=on_progress
+            )
+            if not success:
+                raise RuntimeError("Failed to index document")
+
+            now = datetime.utcnow()
+            self._update(
+                job_id,
+                status="succeeded",
+                stage="done",
+                chunks_done=processed['num_chunks'],
+                error=None,
+                finished_at=now
+            )
+        except Exception as e:
+            if (job.attempts or 0) < settings.INGESTION_MAX_ATTEMPTS:
+                # Exponential backoff so a persistent failure is not retried in a tight loop
+                delay = settings.INGESTION_RETRY_BACKOFF_SECONDS * 2 ** max(0, (job.attempts or 1) - 1)
+                logger.error(f"Ingestion job {job_id} failed (attempt {job.attempts}), retrying in {delay}s: {str(e)}")
+                self._update(
+                    job_id,
+                    status="queued",
+                    stage="queued",
+                    error=str(e)[:2000],
+                    next_attempt_at=datetime.utcnow() + timedelta(seconds=delay)
+                )
+            else:
+                logger.error(f"Ingestion job {job_id} failed after {job.attempts} attempts: {str(e)}")
+                self._update(job_id, status="failed", error=str(e)[:2000], finished_at=datetime.utcnow())
+                _remove_file(job.file_path)
+            return
+
+        _remove_file(job.file_path)
+        logger.info(f"Ingestion job {job_id} indexed {processed['num_chunks']} chunks")
+        if job.entity_id:
+            get_insight_service().mark_stale_and_refresh(job.entity_id, job.document_type)
+
+
+# Singleton instance
+ingestion_service = None
+
+
+def get_ingestion_service() -> IngestionService:
+    """Get or create ingestion service instance."""
+    global ingestion_service
+    if ingestion_service is None:
+        ingestion_service = IngestionService()
+    return ingestion_service
@@ -0,0 +1,182 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.legal import DocumentInsight
+from app.services.rag_chat import get_rag_chat_service
+
+logger = logging.getLogger(__name__)
+
+ALL_TYPES = ""  # document_type key for insights across every document type
+
+
+def _type_key(document_type: Optional[str]) -> str:
+    return document_type or ALL_TYPES
+
+
+def serialize_insight(row: DocumentInsight) -> Dict[str, Any]:
+    """Response payload for a stored insight row."""
+    return {
+        'entity_id': row.entity_id,
+        'document_type': row.document_type or None,
+        'insights': row.insights or '',
+        'documents_analyzed': row.documents_analyzed,
+        'status': row.status,
+        'stale': row.stale,
+        'refreshing': get_insight_service().is_refreshing(row.entity_id, row.document_type),
+        'generated_at': row.generated_at,
+        'error': row.error,
+    }
+
+
+class InsightService:
+    """Precomputes per-(entity, document type) insight summaries off the request path."""
+
+    def __init__(self, max_workers: int):
+        """
+        Initialize the refresh pool.
+
+        Args:
+            max_workers: Concurrent LLM refreshes in this process
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="insights")
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, entity_id: str, document_type: Optional[str] = None) -> Optional[DocumentInsight]:
+        """Return the stored insight row, if any."""
+        return db.query(DocumentInsight).filter(
+            DocumentInsight.entity_id == entity_id,
+            DocumentInsight.document_type == _type_key(document_type)
+        ).first()
+
+    def is_refreshing(self, entity_id: str, document_type: Optional[str] = None) -> bool:
+        """Whether a refresh for this key is queued or running in this process."""
+        with self._lock:
+            return (entity_id, _type_key(document_type)) in self._in_flight
+
+    def refresh(self, entity_id: str, document_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Regenerate insights with the LLM and store them.
+
+        Args:
+            entity_id: Entity ID to analyze
+            document_type: Optional document type filter
+
+        Returns:
+            The generated insights payload
+        """
+        result = get_rag_chat_service().generate_document_insights(entity_id, document_type)
+        now = datetime.utcnow()
+        values = {
+            'entity_id': entity_id,
+            'document_type': _type_key(document_type),
+            'status': result.get('status', 'error'),
+            'documents_analyzed': result.get('documents_analyzed'),
+            'updated_at': now,
+        }
+        if result.get('status') == 'error':
+            # Keep the last good summary; record why the refresh failed.
+            values['error'] = result.get('insights')
+        else:
+            values.update(insights=result.get('insights'), error=None, stale=False, generated_at=now)
+
+        db: Session = SessionLocal()
+        try:
+            stmt = pg_insert(DocumentInsight).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['entity_id', 'document_type'],
+                set_={k: v for k, v in values.items() if k not in ('entity_id', 'document_type')}
+            )
+            db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error storing insights for entity {entity_id}: {str(e)}")
+        finally:
+            db.close()
+        return result
+
+    def should_retry_failed(self, row: DocumentInsight) -> bool:
+        """
+        Whether a row whose generation never succeeded may be retried on read.
+
+        Failed refreshes are backed off by INSIGHTS_ERROR_RETRY_SECONDS so polling
+        clients do not trigger an LLM call on every request.
+        """
+        if row.updated_at is None:
+            return True
+        return datetime.utcnow() - row.updated_at >= timedelta(seconds=settings.INSIGHTS_ERROR_RETRY_SECONDS)
+
+    def schedule_refresh(self, entity_id: str, document_type: Optional[str] = None) -> bool:
+        """
+        Queue a background refresh unless one is already pending for the same key.
+
+        Returns:
+            True if a refresh was queued
+        """
+        key = (entity_id, _type_key(document_type))
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        try:
+            self._executor.submit(self._refresh_in_background, key)
+        except RuntimeError:
+            # Executor already shut down (app stopping)
+            with self._lock:
+                self._in_flight.discard(key)
+            return False
+        return True
+
+    def _refresh_in_background(self, key: Tuple[str, str]) -> None:
+        try:
+            self.refresh(key[0], key[1] or None)
+        except Exception as e:
+            logger.error(f"Error refreshing insights for entity {key[0]}: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def mark_stale_and_refresh(self, entity_id: str, document_type: Optional[str] = None) -> None:
+        """
+        Called after ingestion: flag stored insights for the entity as stale and
+        queue refreshes for the document type and the all-types summary.
+        """
+        db: Session = SessionLocal()
+        try:
+            db.query(DocumentInsight).filter(
+                DocumentInsight.entity_id == entity_id,
+                DocumentInsight.document_type.in_({_type_key(document_type), ALL_TYPES})
+            ).update({'stale': True, 'updated_at': datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error marking insights stale for entity {entity_id}: {str(e)}")
+        finally:
+            db.close()
+
+        self.schedule_refresh(entity_id, document_type)
+        if document_type:
+            self.schedule_refresh(entity_id, None)
+
+    def shutdown(self) -> None:
+        """Drop queued refreshes and wait for running ones (used on app shutdown)."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Singleton instance
+insight_service = None
+
+
+def get_insight_service() -> InsightService:
+    """Get or create insight service instance."""
+    global insight_service
+    if insight_service is None:
+        insight_service = InsightService(settings.INSIGHTS_REFRESH_WORKERS)
+    return insight_service
@@ -0,0 +1,203 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.crm import Matter, MatterStageDaily
+
+logger = logging.getLogger(__name__)
+
+MONTH_DAYS = 30
+NO_ADVISOR = 0  # matter_stage_daily key for matters without an advisor
+EPOCH_DAY = date(1970, 1, 1)  # matter_stage_daily key for matters without created_at
+
+# Dashboard KPI -> matter stages it counts
+KPI_STAGES = {
+    "leads": ["New"],
+    "booked": ["Booked", "Paid"],
+    "showed": ["Signed", "Onboarding", "Completed"],
+    "signed": ["Signed", "Completed"],
+    "matters_in_process": ["Onboarding"],
+    "completed": ["Completed"],
+}
+
+
+def stage_counts(db: Session, period: str, advisor_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Count matters per stage with a single GROUP BY.
+
+    "month" is an index range scan over the last 30 days of created_at;
+    "inception" has no date predicate at all.
+
+    Args:
+        db: Database session
+        period: "month" or "inception"
+        advisor_id: Restrict to one advisor's matters
+
+    Returns:
+        {stage: count}
+    """
+    q = db.query(Matter.stage, func.count()).group_by(Matter.stage)
+    if period == "month":
+        q = q.filter(Matter.created_at >= datetime.utcnow() - timedelta(days=MONTH_DAYS))
+    if advisor_id is not None:
+        q = q.filter(Matter.advisor_id == advisor_id)
+    return {stage: count for stage, count in q.all() if stage is not None}
+
+
+def rollup_stage_counts(db: Session, period: str, advisor_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Count matters per stage from the matter_stage_daily rollup.
+
+    Reads at most (advisors x days x stages) rows however many matters exist.
+    "month" works at day granularity: it includes all of the day 30 days ago.
+    """
+    q = db.query(MatterStageDaily.stage, func.sum(MatterStageDaily.count)).group_by(MatterStageDaily.stage)
+    if period == "month":
+        q = q.filter(MatterStageDaily.day >= (datetime.utcnow() - timedelta(days=MONTH_DAYS)).date())
+    if advisor_id is not None:
+        q = q.filter(MatterStageDaily.advisor_id == advisor_id)
+    return {stage: int(count or 0) for stage, count in q.all() if stage}
+
+
+def build_pipeline_stats(counts: Dict[str, int], period: str) -> Dict[str, Any]:
+    """Turn per-stage counts into the dashboard KPI payload."""
+    stats: Dict[str, Any] = {
+        kpi: sum(counts.get(stage, 0) for stage in stages) for kpi, stages in KPI_STAGES.items()
+    }
+    stats["period"] = period
+
+    # Calculate show up ratio
+    stats["show_up_ratio"] = (
+        round((stats["showed"] / stats["booked"]) * 100) if stats["booked"] > 0 else 0
+    )
+
+    # Average $ per matter (mock for now)
+    stats["avg_dollar_per_matter"] = 18500 if stats["signed"] > 0 else 0
+
+    # Total pipeline counts by stage
+    stats["pipeline_stages"] = {
+        "Booked Consults": stats["booked"],
+        "Pre-Engagement": stats["leads"],
+        "Engaged": stats["signed"],
+        "Questionnaire Received": 0,  # TODO: implement questionnaire tracking
+        "Matter in Process": stats["matters_in_process"],
+        "Matter Fulfilled": stats["completed"]
+    }
+    return stats
+
+
+def get_pipeline_stats(db: Session, period: str, advisor_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Dashboard KPIs, from the rollup when PIPELINE_STATS_ROLLUP is on, else from matters.
+
+    Args:
+        db: Database session
+        period: "month" or anything else for inception
+        advisor_id: Restrict to one advisor's matters
+
+    Returns:
+        KPI payload for /api/pipeline/stats
+    """
+    source = "month" if period == "month" else "inception"
+    if settings.PIPELINE_STATS_ROLLUP:
+        counts = rollup_stage_counts(db, source, advisor_id)
+    else:
+        counts = stage_counts(db, source, advisor_id)
+    return build_pipeline_stats(counts, period)
+
+
+# --- Rollup maintenance ---
+
+def _rollup_key(advisor_id: Optional[int], created_at: Optional[datetime], stage: Optional[str]) -> Tuple[int, date, str]:
+    return (
+        advisor_id if advisor_id is not None else NO_ADVISOR,
+        created_at.date() if created_at is not None else EPOCH_DAY,
+        stage or "",
+    )
+
+
+def _adjust(connection, key: Tuple[int, date, str], delta: int) -> None:
+    stmt = pg_insert(MatterStageDaily).values(advisor_id=key[0], day=key[1], stage=key[2], count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['advisor_id', 'day', 'stage'],
+        set_={'count': MatterStageDaily.count + delta}
+    )
+    connection.execute(stmt)
+
+
+ROLLUP_ATTRIBUTES = ("advisor_id", "created_at", "stage")
+
+
+def _load_old_value(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+def _previous(target: Matter, attr: str) -> Any:
+    history = inspect(target).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attr)
+
+
+def _rollup_after_insert(mapper, connection, target: Matter) -> None:
+    _adjust(connection, _rollup_key(target.advisor_id, target.created_at, target.stage), 1)
+
+
+def _rollup_after_update(mapper, connection, target: Matter) -> None:
+    old = _rollup_key(*[_previous(target, attr) for attr in ROLLUP_ATTRIBUTES])
+    new = _rollup_key(target.advisor_id, target.created_at, target.stage)
+    if old != new:
+        _adjust(connection, old, -1)
+        _adjust(connection, new, 1)
+
+
+def _rollup_after_delete(mapper, connection, target: Matter) -> None:
+    old = _rollup_key(*[_previous(target, attr) for attr in ROLLUP_ATTRIBUTES])
+    _adjust(connection, old, -1)
+
+
+def register_rollup_listeners() -> None:
+    """
+    Keep matter_stage_daily in step with ORM writes to matters (idempotent).
+
+    Called on import when PIPELINE_STATS_ROLLUP is on. Rows written while the
+    listeners were off are missing from the rollup; run
+    scripts/rebuild_pipeline_rollup.py after turning the setting on.
+    """
+    if event.contains(Matter, "after_insert", _rollup_after_insert):
+        return
+    # active_history makes SQLAlchemy load the old value before an expired attribute
+    # is overwritten, so after_update can decrement the row the matter is leaving
+    for attr in ROLLUP_ATTRIBUTES:
+        event.listen(getattr(Matter, attr), "set", _load_old_value, active_history=True)
+    event.listen(Matter, "after_insert", _rollup_after_insert)
+    event.listen(Matter, "after_update", _rollup_after_update)
+    event.listen(Matter, "after_delete", _rollup_after_delete)
+
+
+def rebuild_rollup(db: Session) -> int:
+    """
+    Recompute matter_stage_daily from matters (e.g. after bulk SQL edits that bypass the ORM).
+
+    Returns:
+        Number of rollup rows written
+    """
+    rows = db.query(Matter.advisor_id, Matter.created_at, Matter.stage).yield_per(10000)
+    totals: Dict[Tuple[int, date, str], int] = {}
+    for advisor_id, created_at, stage in rows:
+        key = _rollup_key(advisor_id, created_at, stage)
+        totals[key] = totals.get(key, 0) + 1
+    db.query(MatterStageDaily).delete(synchronize_session=False)
+    db.bulk_insert_mappings(MatterStageDaily, [
+        {'advisor_id': a, 'day': d, 'stage': s, 'count': c} for (a, d, s), c in totals.items()
+    ])
+    db.commit()
+    logger.info(f"Rebuilt matter_stage_daily: {len(totals)} rows")
+    return len(totals)
+
+
+if settings.PIPELINE_STATS_ROLLUP:
+    register_rollup_listeners()
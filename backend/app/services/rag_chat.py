@@ -1,18 +1,62 @@
+import contextlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator
 from openai import OpenAI
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.config import settings
+from app.services.tokens import count_tokens, get_encoding
+from app.services.context_packing import pack_context, trim_history
 from app.services.vector_db import get_vector_db
+from app.services.retrieval_cache import get_retrieval_cache
+from app.services.reranker import get_reranker
 import json
 
 logger = logging.getLogger(__name__)
 
+ANALYSIS_PROMPTS = {
+    "summary": "Provide a comprehensive summary of this document, highlighting the main points and key provisions.",
+    "key_points": "Extract and list the key points, important dates, parties involved, and critical provisions from this document.",
+    "risks": "Identify any potential risks, liabilities, or areas of concern in this document.",
+    "compliance": "Analyze this document for compliance requirements and identify any regulatory obligations.",
+    "extraction": """Extract the following information from this document:
+    - Parties involved
+    - Key dates and deadlines
+    - Financial terms and amounts
+    - Obligations and responsibilities
+    - Termination conditions
+    - Governing law"""
+}
+
+
+def _new_stage() -> Dict[str, Any]:
+    return {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'seconds': 0.0}
+
+
+def _pack_for_reduce(partials: List[str], max_tokens: int) -> List[List[str]]:
+    """Group consecutive partial analyses into batches of at most max_tokens (at least two per batch)."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in partials:
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > max_tokens and len(current) >= 2:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
 class RAGChatService:
     """Service for RAG-based chat with documents using GPT-4o."""
     
-    def __init__(self):
+    def __init__(self, openai_client: Optional[OpenAI] = None):
         """Initialize OpenAI client and vector DB."""
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.openai_client = openai_client or OpenAI(api_key=settings.OPENAI_API_KEY)
         self.vector_db = get_vector_db()
         self.model = settings.OPENAI_MODEL
     
@@ -25,6 +69,10 @@ class RAGChatService:
         """
         Retrieve relevant context from vector database.
         
+        Results are cached per (query, filters, top_k, index version); any index
+        write for the user/entity bumps the version, so cached results never
+        outlive the data they came from.
+        
         Args:
             query: User query
             filter_dict: Metadata filters
@@ -34,23 +82,62 @@ class RAGChatService:
             List of relevant document chunks
         """
         try:
+            cache = get_retrieval_cache() if settings.RETRIEVAL_CACHE_SIZE > 0 else None
+            key = cache.make_key(query, filter_dict, top_k) if cache else None
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+            
             results = self.vector_db.search_similar_chunks(
                 query=query,
                 top_k=top_k,
                 filter_dict=filter_dict,
-                include_metadata=True
+                include_metadata=True,
+                mode=settings.RETRIEVAL_SEARCH_MODE
             )
+            if key is not None and results:
+                cache.put(key, results)
             return results
         except Exception as e:
             logger.error(f"Error retrieving context: {str(e)}")
             return []
     
-    def format_context(self, chunks: List[Dict[str, Any]]) -> str:
+    def retrieve_chat_context(self, query: str, filter_dict: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the chunks for a chat turn.
+        
+        With RERANK_ENABLED, RERANK_CANDIDATES chunks are retrieved and re-scored by
+        the local cross-encoder, and only the best RERANK_TOP_N go into the prompt.
+        
+        Args:
+            query: User query
+            filter_dict: Metadata filters
+        
+        Returns:
+            Chunks for the prompt, best first
+        """
+        reranker = get_reranker()
+        if reranker is None:
+            return self.retrieve_context(query, filter_dict, top_k=settings.CONTEXT_RETRIEVAL_TOP_K)
+        
+        candidates = self.retrieve_context(query, filter_dict, top_k=settings.RERANK_CANDIDATES)
+        try:
+            return reranker.rerank(query, candidates, settings.RERANK_TOP_N)
+        except Exception as e:
+            logger.error(f"Error re-ranking chunks: {str(e)}")
+            return candidates[:settings.CONTEXT_RETRIEVAL_TOP_K]
+    
+    def format_context(self, chunks: List[Dict[str, Any]], token_budget: Optional[int] = None) -> str:
         """
         Format retrieved chunks into context string.
         
+        Duplicate and overlapping chunks are merged into passages, which are then
+        packed best-first into the token budget (see context_packing.pack_context).
+        
         Args:
             chunks: Retrieved document chunks
+            token_budget: Max context tokens (defaults to CONTEXT_TOKEN_BUDGET)
         
         Returns:
             Formatted context string
@@ -58,18 +145,7 @@ class RAGChatService:
         if not chunks:
             return "No relevant context found."
         
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            metadata = chunk.get('metadata', {})
-            text = metadata.get('chunk_text', '')
-            source = metadata.get('file_name', 'Unknown')
-            page = metadata.get('page_number', 'N/A')
-            
-            context_parts.append(
-                f"[Source {i}: {source}, Page {page}]\n{text}\n"
-            )
-        
-        return "\n---\n".join(context_parts)
+        return pack_context(chunks, token_budget=token_budget, model=self.model)
     
     def generate_system_prompt(self, context_type: str = "legal") -> str:
         """
@@ -129,29 +205,8 @@ class RAGChatService:
         """
         try:
             # Retrieve relevant context
-            chunks = self.retrieve_context(query, filter_dict)
-            context = self.format_context(chunks)
-            
-            # Prepare messages
-            messages = [
-                {"role": "system", "content": self.generate_system_prompt(context_type)}
-            ]
-            
-            # Add conversation history if provided
-            if conversation_history:
-                for msg in conversation_history[-5:]:  # Keep last 5 messages for context
-                    messages.append(msg)
-            
-            # Add current query with context
-            user_message = f"""Context from documents:
-            {context}
-            
-            User Question: {query}
-            
-            Please provide a comprehensive answer based on the context above. 
-            Cite specific documents and page numbers when referencing information."""
-            
-            messages.append({"role": "user", "content": user_message})
+            chunks = self.retrieve_chat_context(query, filter_dict)
+            messages = self._build_chat_messages(query, chunks, conversation_history, context_type)
             
             # Generate response using GPT-4o
             response = self.openai_client.chat.completions.create(
@@ -163,20 +218,9 @@ class RAGChatService:
             
             answer = response.choices[0].message.content
             
-            # Format sources
-            sources = []
-            for chunk in chunks[:3]:  # Top 3 sources
-                metadata = chunk.get('metadata', {})
-                sources.append({
-                    'document': metadata.get('file_name', 'Unknown'),
-                    'page': metadata.get('page_number', 'N/A'),
-                    'relevance_score': chunk.get('score', 0),
-                    'excerpt': metadata.get('chunk_text', '')[:200] + '...'
-                })
-            
             return {
                 'answer': answer,
-                'sources': sources,
+                'sources': self._format_sources(chunks),
                 'chunks_retrieved': len(chunks),
                 'model_used': self.model,
                 'status': 'success'
@@ -191,52 +235,170 @@ class RAGChatService:
                 'error': str(e)
             }
     
+    def stream_chat_with_documents(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]] = None,
+        filter_dict: Optional[Dict] = None,
+        context_type: str = "legal",
+        temperature: float = 0.3
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of chat_with_documents.
+        
+        Yields a 'sources' event as soon as retrieval finishes, then one 'token'
+        event per streamed completion delta, then a final 'done' (or 'error') event.
+        
+        Args:
+            query: User query
+            conversation_history: Previous messages
+            filter_dict: Metadata filters for document retrieval
+            context_type: Type of context (legal, financial, etc.)
+            temperature: Model temperature
+        
+        Yields:
+            Event dicts with a 'type' key
+        """
+        stream = None
+        try:
+            chunks = self.retrieve_chat_context(query, filter_dict)
+            yield {
+                'type': 'sources',
+                'sources': self._format_sources(chunks),
+                'chunks_retrieved': len(chunks)
+            }
+            
+            stream = self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_chat_messages(query, chunks, conversation_history, context_type),
+                temperature=temperature,
+                max_tokens=2000,
+                stream=True
+            )
+            for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if delta:
+                    yield {'type': 'token', 'content': delta}
+            
+            yield {'type': 'done', 'model_used': self.model, 'status': 'success'}
+            
+        except Exception as e:
+            logger.error(f"Error in streaming RAG chat: {str(e)}")
+            yield {'type': 'error', 'status': 'error', 'error': str(e)}
+        finally:
+            # Also runs when the caller closes the generator early (client disconnected):
+            # drop the OpenAI HTTP stream instead of letting it generate to the end
+            if stream is not None:
+                stream.close()
+    
+    def _build_chat_messages(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        conversation_history: Optional[List[Dict[str, str]]],
+        context_type: str
+    ) -> List[Dict[str, str]]:
+        """Assemble system prompt, recent history and the context-bearing user message."""
+        context = self.format_context(chunks)
+        
+        # Prepare messages
+        messages = [
+            {"role": "system", "content": self.generate_system_prompt(context_type)}
+        ]
+        
+        # Add the most recent history that fits HISTORY_TOKEN_BUDGET (at most 5 messages)
+        messages.extend(trim_history(conversation_history, max_messages=5, model=self.model))
+        
+        # Add current query with context
+        user_message = f"""Context from documents:
+        {context}
+        
+        User Question: {query}
+        
+        Please provide a comprehensive answer based on the context above. 
+        Cite specific documents and page numbers when referencing information."""
+        
+        messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    def _format_sources(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Format the top 3 retrieved chunks as citation sources."""
+        sources = []
+        for chunk in chunks[:3]:  # Top 3 sources
+            metadata = chunk.get('metadata', {})
+            sources.append({
+                'document': metadata.get('file_name', 'Unknown'),
+                'page': metadata.get('page_number', 'N/A'),
+                'relevance_score': chunk.get('score', 0),
+                'excerpt': metadata.get('chunk_text', '')[:200] + '...'
+            })
+        return sources
+    
     def analyze_document(
         self,
         document_text: str,
-        analysis_type: str = "summary"
+        analysis_type: str = "summary",
+        mode: str = "auto"
     ) -> Dict[str, Any]:
         """
         Analyze a document using GPT-4o.
         
+        Documents that fit ANALYSIS_SINGLE_PASS_MAX_TOKENS are analyzed in one call;
+        longer ones are split, analyzed part by part concurrently (map) and the
+        partial analyses are combined (reduce), so nothing is silently dropped.
+        
         Args:
             document_text: Full document text
             analysis_type: Type of analysis (summary, key_points, risks, etc.)
+            mode: "auto", "single" (one call, clipped to the single-pass budget) or "map_reduce"
         
         Returns:
-            Analysis results
+            Analysis results with per-stage token usage and wall time under 'stats'
         """
         try:
-            prompts = {
-                "summary": "Provide a comprehensive summary of this document, highlighting the main points and key provisions.",
-                "key_points": "Extract and list the key points, important dates, parties involved, and critical provisions from this document.",
-                "risks": "Identify any potential risks, liabilities, or areas of concern in this document.",
-                "compliance": "Analyze this document for compliance requirements and identify any regulatory obligations.",
-                "extraction": """Extract the following information from this document:
-                - Parties involved
-                - Key dates and deadlines
-                - Financial terms and amounts
-                - Obligations and responsibilities
-                - Termination conditions
-                - Governing law"""
-            }
+            prompt = ANALYSIS_PROMPTS.get(analysis_type, ANALYSIS_PROMPTS["summary"])
+            started = time.perf_counter()
+            document_tokens = count_tokens(document_text)
+            truncated = False
             
-            prompt = prompts.get(analysis_type, prompts["summary"])
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert document analyst."},
-                    {"role": "user", "content": f"{prompt}\n\nDocument:\n{document_text[:8000]}"}  # Limit to 8000 chars
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
+            if mode == "map_reduce" or (mode == "auto" and document_tokens > settings.ANALYSIS_SINGLE_PASS_MAX_TOKENS):
+                mode = "map_reduce"
+                analysis, stages, num_parts = self._map_reduce_analysis(document_text, prompt)
+            else:
+                mode = "single"
+                num_parts = 1
+                if document_tokens > settings.ANALYSIS_SINGLE_PASS_MAX_TOKENS:
+                    encoding = get_encoding(self.model)
+                    tokens = encoding.encode(document_text, disallowed_special=())
+                    document_text = encoding.decode(tokens[:settings.ANALYSIS_SINGLE_PASS_MAX_TOKENS])
+                    truncated = True
+                stage = _new_stage()
+                analysis = self._timed_completion(
+                    [
+                        {"role": "system", "content": "You are an expert document analyst."},
+                        {"role": "user", "content": f"{prompt}\n\nDocument:\n{document_text}"}
+                    ],
+                    max_tokens=2000,
+                    stage=stage
+                )
+                stage['seconds'] = round(time.perf_counter() - started, 3)
+                stages = {'single': stage}
             
             return {
-                'analysis': response.choices[0].message.content,
+                'analysis': analysis,
                 'analysis_type': analysis_type,
-                'status': 'success'
+                'mode': mode,
+                'status': 'success',
+                'stats': {
+                    'document_tokens': document_tokens,
+                    'parts': num_parts,
+                    'truncated': truncated,
+                    'stages': stages,
+                    'total_tokens': sum(st['prompt_tokens'] + st['completion_tokens'] for st in stages.values()),
+                    'total_seconds': round(time.perf_counter() - started, 3)
+                }
             }
             
         except Exception as e:
@@ -246,6 +408,99 @@ class RAGChatService:
                 'status': 'error'
             }
     
+    def _timed_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        stage: Dict[str, Any],
+        lock: Optional[threading.Lock] = None
+    ) -> str:
+        """Run one chat completion and add its token usage to the stage counters."""
+        response = self.openai_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.3,
+            max_tokens=max_tokens
+        )
+        usage = getattr(response, 'usage', None)
+        with lock or contextlib.nullcontext():
+            stage['calls'] += 1
+            stage['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+            stage['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+        return response.choices[0].message.content or ''
+    
+    def _map_reduce_analysis(self, document_text: str, prompt: str):
+        """
+        Analyze document parts concurrently, then reduce the partial analyses.
+        
+        Returns:
+            (final analysis, per-stage stats, number of parts)
+        """
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=settings.ANALYSIS_MAP_CHUNK_TOKENS,
+            chunk_overlap=settings.ANALYSIS_MAP_CHUNK_OVERLAP_TOKENS,
+            length_function=count_tokens
+        )
+        parts = [p for p in splitter.split_text(document_text) if p.strip()] or [document_text]
+        concurrency = max(1, min(settings.ANALYSIS_MAP_CONCURRENCY, len(parts)))
+        lock = threading.Lock()
+        
+        def analyze_part(indexed_part):
+            i, part = indexed_part
+            return self._timed_completion(
+                [
+                    {"role": "system", "content": "You are an expert document analyst."},
+                    {"role": "user", "content": (
+                        f"{prompt}\n\nThis is part {i + 1} of {len(parts)} of a longer document. "
+                        "Analyze only this part and keep specific names, dates and amounts; "
+                        "if it contains nothing relevant, say so in one line.\n\n"
+                        f"Document part:\n{part}"
+                    )}
+                ],
+                max_tokens=settings.ANALYSIS_MAP_MAX_TOKENS,
+                stage=map_stage,
+                lock=lock
+            )
+        
+        def reduce_batch(batch: List[str], final: bool) -> str:
+            numbered = "\n\n".join(f"[Part {i + 1}]\n{text}" for i, text in enumerate(batch))
+            instruction = (
+                "The document was too long to read at once, so it was analyzed in consecutive parts. "
+                "Combine the partial analyses below into one coherent answer for the whole document, "
+                "removing repetition and keeping document order."
+                if final else
+                "Merge the partial analyses of consecutive document parts below into one, "
+                "keeping every specific name, date and amount."
+            )
+            return self._timed_completion(
+                [
+                    {"role": "system", "content": "You are an expert document analyst."},
+                    {"role": "user", "content": f"{prompt}\n\n{instruction}\n\n{numbered}"}
+                ],
+                max_tokens=2000 if final else settings.ANALYSIS_MAP_MAX_TOKENS,
+                stage=reduce_stage,
+                lock=lock
+            )
+        
+        map_stage = _new_stage()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="analysis-map") as pool:
+            partials = list(pool.map(analyze_part, enumerate(parts)))
+            map_stage['seconds'] = round(time.perf_counter() - started, 3)
+            
+            # Collapse until the partials fit one reduce call.
+            reduce_stage = _new_stage()
+            started = time.perf_counter()
+            batches = _pack_for_reduce(partials, settings.ANALYSIS_REDUCE_MAX_TOKENS)
+            while len(batches) > 1:
+                partials = list(pool.map(lambda batch: reduce_batch(batch, final=False), batches))
+                batches = _pack_for_reduce(partials, settings.ANALYSIS_REDUCE_MAX_TOKENS)
+            analysis = reduce_batch(batches[0], final=True)
+            reduce_stage['seconds'] = round(time.perf_counter() - started, 3)
+        
+        map_stage['concurrency'] = concurrency
+        return analysis, {'map': map_stage, 'reduce': reduce_stage}, len(parts)
+    
     def generate_document_insights(
         self,
         entity_id: str,
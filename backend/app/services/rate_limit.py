@@ -0,0 +1,263 @@
+import hashlib
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.rate_limit import RateLimitCounter
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("memory", "postgres")
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # Seconds until the estimate drops back under the limit (0 when allowed)
+
+
+def _window_start(now: float, window_seconds: int) -> int:
+    return int(now // window_seconds) * window_seconds
+
+
+def _evaluate(
+    previous: int, current: int, window_start: int, now: float, limit: int, window_seconds: int
+) -> RateLimitResult:
+    """
+    Sliding-window-counter estimate: the previous fixed window's count weighted by
+    how much of it still overlaps the sliding window, plus the current count.
+    """
+    overlap = 1.0 - (now - window_start) / window_seconds
+    estimate = previous * overlap + current
+    if estimate <= limit:
+        return RateLimitResult(True, limit, max(0, int(limit - estimate)), 0)
+    # Earliest time the weighted previous window has decayed enough (or the current window rolls over)
+    if previous and current <= limit:
+        wait = (estimate - limit) / previous * window_seconds
+    else:
+        wait = window_start + window_seconds - now
+    return RateLimitResult(False, limit, 0, max(1, int(wait + 0.999)))
+
+
+class RateLimitStore(ABC):
+    """Counter storage for the sliding-window rate limiter."""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window_seconds: int, cost: int = 1) -> RateLimitResult:
+        """
+        Count cost events for key and report whether the key is within its limit.
+
+        Args:
+            key: Scoped client key, e.g. "login-ip:10.0.0.1"
+            limit: Events allowed per sliding window
+            window_seconds: Window length
+            cost: Events to record (0 only checks)
+
+        Returns:
+            RateLimitResult for the key after recording
+        """
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process counters with bounded memory.
+
+    Each key keeps two integers (previous and current window); entries expire two
+    windows after their last use and the least recently used key is evicted once
+    max_keys is reached. Limits only hold per worker process.
+    """
+
+    def __init__(self, max_keys: int):
+        """
+        Args:
+            max_keys: Maximum tracked keys
+        """
+        self.max_keys = max_keys
+        # key -> [window_start, previous count, current count, expires_at]
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _purge_expired(self, now: float) -> None:
+        # Front of the LRU order is the least recently used; stop at the first live entry
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[3] > now:
+                break
+            del self._entries[key]
+
+    def hit(self, key: str, limit: int, window_seconds: int, cost: int = 1) -> RateLimitResult:
+        now = time.time()
+        start = _window_start(now, window_seconds)
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                if cost == 0:
+                    return _evaluate(0, 0, start, now, limit, window_seconds)
+                entry = [start, 0, 0, 0]
+                self._entries[key] = entry
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            elif entry[0] != start:
+                entry[1] = entry[2] if start - entry[0] == window_seconds else 0
+                entry[2] = 0
+                entry[0] = start
+            entry[2] += cost
+            entry[3] = start + 2 * window_seconds
+            self._entries.move_to_end(key)
+            return _evaluate(int(entry[1]), int(entry[2]), start, now, limit, window_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'keys': len(self._entries), 'max_keys': self.max_keys, 'evictions': self.evictions}
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """
+    Counters in the rate_limit_counters table, shared by every worker process.
+
+    One row per key and fixed window, incremented with an atomic upsert; expired
+    rows are pruned by whichever worker happens to pass the prune interval.
+    """
+
+    def __init__(self, prune_interval_seconds: int = 60):
+        """
+        Args:
+            prune_interval_seconds: Minimum seconds between expired-row deletes per process
+        """
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = 0.0
+
+    def _prune(self, db: Session, now: float) -> None:
+        if now - self._last_prune < self.prune_interval_seconds:
+            return
+        self._last_prune = now
+        db.query(RateLimitCounter).filter(RateLimitCounter.expires_at < int(now)).delete(synchronize_session=False)
+
+    def hit(self, key: str, limit: int, window_seconds: int, cost: int = 1) -> RateLimitResult:
+        now = time.time()
+        start = _window_start(now, window_seconds)
+        db: Session = SessionLocal()
+        try:
+            current = 0
+            if cost:
+                stmt = pg_insert(RateLimitCounter).values(
+                    key=key, window_start=start, count=cost, expires_at=start + 2 * window_seconds
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['key', 'window_start'],
+                    set_={'count': RateLimitCounter.count + cost}
+                ).returning(RateLimitCounter.count)
+                current = db.execute(stmt).scalar_one()
+            counts = dict(
+                db.query(RateLimitCounter.window_start, RateLimitCounter.count)
+                .filter(
+                    RateLimitCounter.key == key,
+                    RateLimitCounter.window_start.in_([start - window_seconds, start])
+                )
+                .all()
+            )
+            self._prune(db, now)
+            db.commit()
+            current = max(current, counts.get(start, 0))
+            return _evaluate(counts.get(start - window_seconds, 0), current, start, now, limit, window_seconds)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+class RateLimiter:
+    """Sliding-window rate limiter over a pluggable counter store."""
+
+    def __init__(self, store: RateLimitStore):
+        self.store = store
+        self.allowed = 0
+        self.denied = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(scope: str, key: str) -> str:
+        full_key = f"{scope}:{key}"
+        if len(full_key) > MAX_KEY_LENGTH:
+            full_key = f"{scope}:sha256:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+        return full_key
+
+    def hit(self, scope: str, key: str, limit: int, window_seconds: int, cost: int = 1) -> RateLimitResult:
+        """
+        Record cost events for key within scope and check its limit.
+
+        Store errors fail open (the request is allowed and the error logged) so an
+        unavailable rate-limit table cannot take logins or intake down with it.
+
+        Args:
+            scope: Limit name, e.g. "login-ip", "public-lead", "chat"
+            key: Client key within the scope (IP, username, user id)
+            limit: Events allowed per sliding window (0 or less disables the limit)
+            window_seconds: Window length
+            cost: Events to record (0 only checks)
+
+        Returns:
+            RateLimitResult
+        """
+        if limit <= 0 or window_seconds <= 0:
+            return RateLimitResult(True, limit, limit, 0)
+        try:
+            result = self.store.hit(self._key(scope, key), limit, window_seconds, cost)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Rate limit store error, allowing request: {str(e)}")
+            return RateLimitResult(True, limit, limit, 0)
+        if result.allowed:
+            self.allowed += 1
+        else:
+            self.denied += 1
+        return result
+
+    def check(self, scope: str, key: str, limit: int, window_seconds: int) -> RateLimitResult:
+        """Check a key's limit without recording an event."""
+        return self.hit(scope, key, limit, window_seconds, cost=0)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'backend': type(self.store).__name__,
+            'allowed': self.allowed,
+            'denied': self.denied,
+            'errors': self.errors,
+            **self.store.stats(),
+        }
+
+
+# Singleton instance
+rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the rate limiter for RATE_LIMIT_BACKEND."""
+    global rate_limiter
+    if rate_limiter is None:
+        backend = (settings.RATE_LIMIT_BACKEND or "memory").lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+        if backend == "postgres":
+            store: RateLimitStore = PostgresRateLimitStore()
+        else:
+            store = MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+        rate_limiter = RateLimiter(store)
+    return rate_limiter
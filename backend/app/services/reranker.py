@@ -0,0 +1,71 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Re-scores retrieved chunks against the query with a local CPU cross-encoder."""
+
+    def __init__(self, model_name: str, batch_size: int, max_length: int):
+        """
+        Load the cross-encoder (downloaded to the Hugging Face cache on first use).
+
+        Args:
+            model_name: sentence-transformers cross-encoder model
+            batch_size: (query, passage) pairs scored per forward pass
+            max_length: Max tokens per pair; longer passages are truncated
+        """
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+
+    def rerank(self, query: str, chunks: List[Dict[str, Any]], top_n: int) -> List[Dict[str, Any]]:
+        """
+        Order chunks by cross-encoder relevance and keep the best top_n.
+
+        Args:
+            query: User query
+            chunks: Retrieved chunks (Pinecone-match shaped)
+            top_n: Number of chunks to keep
+
+        Returns:
+            Chunks best first, each with a 'rerank_score'
+        """
+        if not chunks:
+            return []
+        pairs = [(query, chunk.get('metadata', {}).get('chunk_text', '')) for chunk in chunks]
+        scores = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        ranked = sorted(zip(chunks, scores), key=lambda pair: float(pair[1]), reverse=True)[:top_n]
+        return [{**chunk, 'rerank_score': float(score)} for chunk, score in ranked]
+
+
+# Singleton instance (loading the model takes seconds, so it happens once per process)
+reranker: Optional[CrossEncoderReranker] = None
+_reranker_lock = threading.Lock()
+_reranker_failed = False
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """Get or load the process-wide reranker; None if disabled or the model cannot be loaded."""
+    global reranker, _reranker_failed
+    if not settings.RERANK_ENABLED or _reranker_failed:
+        return None
+    if reranker is None:
+        with _reranker_lock:
+            if reranker is None and not _reranker_failed:
+                try:
+                    reranker = CrossEncoderReranker(
+                        settings.RERANK_MODEL,
+                        batch_size=settings.RERANK_BATCH_SIZE,
+                        max_length=settings.RERANK_MAX_LENGTH
+                    )
+                    logger.info(f"Loaded re-ranking model {settings.RERANK_MODEL}")
+                except Exception as e:
+                    _reranker_failed = True
+                    logger.error(f"Error loading re-ranking model, re-ranking disabled: {str(e)}")
+    return reranker
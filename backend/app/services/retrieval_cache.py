@@ -0,0 +1,156 @@
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.legal import IndexVersion
+from app.services.embedding_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+
+def scopes_for(filter_dict: Optional[Dict]) -> List[str]:
+    """Index-version scopes a retrieval with these filters depends on."""
+    scopes = [GLOBAL_SCOPE]
+    if filter_dict:
+        if filter_dict.get('user_id') is not None:
+            scopes.append(f"user:{filter_dict['user_id']}")
+        if filter_dict.get('entity_id') is not None:
+            scopes.append(f"entity:{filter_dict['entity_id']}")
+    return scopes
+
+
+def bump_index_version(user_id: Optional[str] = None, entity_id: Optional[str] = None) -> None:
+    """
+    Invalidate cached retrievals after an index write.
+
+    Bumps the user and entity scopes touched by the write; with neither given
+    (e.g. a delete whose owner is unknown) the global scope is bumped, which
+    invalidates every cached retrieval. Versions live in the database so the
+    bump is seen by every worker process.
+    """
+    scopes = []
+    if user_id is not None:
+        scopes.append(f"user:{user_id}")
+    if entity_id is not None:
+        scopes.append(f"entity:{entity_id}")
+    if not scopes:
+        scopes.append(GLOBAL_SCOPE)
+    db: Session = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        stmt = pg_insert(IndexVersion).values([
+            {'scope': scope, 'version': 1, 'updated_at': now} for scope in scopes
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['scope'],
+            set_={'version': IndexVersion.version + 1, 'updated_at': now}
+        )
+        db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bumping index version: {str(e)}")
+    finally:
+        db.close()
+
+
+def current_versions(scopes: List[str]) -> Tuple[int, ...]:
+    """Read the index versions for scopes (0 when never bumped)."""
+    db: Session = SessionLocal()
+    try:
+        rows = db.query(IndexVersion.scope, IndexVersion.version).filter(IndexVersion.scope.in_(scopes)).all()
+        versions = {scope: version for scope, version in rows}
+        return tuple(versions.get(scope, 0) for scope in scopes)
+    finally:
+        db.close()
+
+
+class RetrievalCache:
+    """TTL + LRU cache of retrieval results keyed by query, filters, top_k and index versions."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached result lists
+            ttl_seconds: Lifetime of a cached result list
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, query: str, filter_dict: Optional[Dict], top_k: int) -> Optional[str]:
+        """Build the cache key, or None if index versions cannot be read (cache bypassed)."""
+        scopes = scopes_for(filter_dict)
+        try:
+            versions = current_versions(scopes)
+        except Exception as e:
+            logger.error(f"Error reading index versions: {str(e)}")
+            return None
+        return json.dumps(
+            [normalize_text(query).casefold(), filter_dict or {}, top_k, list(zip(scopes, versions))],
+            sort_keys=True,
+            default=str
+        )
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached results for key, if present and fresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Store results for key."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+retrieval_cache: Optional[RetrievalCache] = None
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get or create the process-wide retrieval cache."""
+    global retrieval_cache
+    if retrieval_cache is None:
+        retrieval_cache = RetrievalCache(
+            max_entries=settings.RETRIEVAL_CACHE_SIZE,
+            ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS
+        )
+    return retrieval_cache
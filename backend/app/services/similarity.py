@@ -0,0 +1,99 @@
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EPSILON = 1e-9
+
+
+def to_matrix(embeddings: Sequence[Sequence[float]], dimension: int) -> np.ndarray:
+    """
+    Pack embeddings into a contiguous float32 matrix.
+
+    Args:
+        embeddings: Embedding vectors, all of length ``dimension``
+        dimension: Expected embedding dimension
+
+    Returns:
+        Array of shape (len(embeddings), dimension)
+    """
+    matrix = np.empty((len(embeddings), dimension), dtype=np.float32)
+    for i, emb in enumerate(embeddings):
+        matrix[i] = emb
+    return matrix
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length in place and return the matrix."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms += EPSILON
+    matrix /= norms
+    return matrix
+
+
+def top_k_cosine(
+    query_embedding: Sequence[float],
+    matrix: np.ndarray,
+    top_k: int
+) -> List[Tuple[int, float]]:
+    """
+    Score every row of ``matrix`` against the query and return the best matches.
+
+    Args:
+        query_embedding: Query vector
+        matrix: Row-normalized candidate embeddings, shape (n, dimension)
+        top_k: Number of results to return
+
+    Returns:
+        List of (row_index, cosine_score) pairs sorted by descending score
+    """
+    n = matrix.shape[0]
+    if n == 0 or top_k <= 0:
+        return []
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) + EPSILON)
+    scores = matrix @ query
+
+    k = min(top_k, n)
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k:]
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.argsort(scores[candidates])[::-1]]
+    return [(int(i), float(scores[i])) for i in order]
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[Sequence[Dict[str, Any]]],
+    top_k: int,
+    k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion (score = sum of 1 / (k + rank)).
+
+    Results are matched on 'id'; the first list a result appears in supplies its
+    metadata, and 'score' is replaced by the fused score.
+
+    Args:
+        result_lists: Ranked results (Pinecone-match shaped), best first
+        top_k: Number of fused results to return
+        k: RRF damping constant
+
+    Returns:
+        Top fused results, best first
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, 1):
+            key = result['id']
+            if key not in fused:
+                fused[key] = dict(result)
+                scores[key] = 0.0
+            scores[key] += 1.0 / (k + rank)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    for key in ranked:
+        fused[key]['score'] = scores[key]
+    return [fused[key] for key in ranked]
@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import Optional
+import tiktoken
+from app.core.config import settings
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: Optional[str] = None) -> tiktoken.Encoding:
+    """Get (and cache per process) the tiktoken encoding for a model."""
+    try:
+        return tiktoken.encoding_for_model(model or settings.OPENAI_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens in text for the given model (defaults to OPENAI_MODEL)."""
+    if not text:
+        return 0
+    return len(get_encoding(model).encode(text, disallowed_special=()))
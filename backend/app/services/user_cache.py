@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.config import settings
+from app.models.user import User
+
+
+def _snapshot(user: User) -> User:
+    """Detached copy of a user's column values, safe to share between requests."""
+    copy = User()
+    for attr in inspect(User).column_attrs:
+        setattr(copy, attr.key, getattr(user, attr.key))
+    make_transient_to_detached(copy)
+    return copy
+
+
+class UserCache:
+    """
+    Short-TTL LRU of authenticated users keyed by token subject (email).
+
+    A hit is merged into the request's session without a SELECT, so endpoints get
+    a normal persistent User (relationships lazy-load, changes commit as usual).
+    Entries are invalidated explicitly wherever user rows change in this process;
+    the TTL bounds staleness for changes made by other worker processes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached users
+            ttl_seconds: Lifetime of a cached user
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, db: Session, email: str) -> Optional[User]:
+        """Return the cached user attached to db, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            snapshot = entry[1]
+        return db.merge(snapshot, load=False)
+
+    def put(self, email: str, user: User) -> None:
+        """Cache a freshly loaded user."""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        snapshot = _snapshot(user)
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *emails: Optional[str]) -> None:
+        """Drop cached users after their rows change."""
+        with self._lock:
+            for email in emails:
+                if email and self._entries.pop(email, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; every hit is one users SELECT saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'db_queries_saved': self.hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get or create the process-wide user cache."""
+    global user_cache
+    if user_cache is None:
+        user_cache = UserCache(
+            max_entries=settings.USER_CACHE_SIZE,
+            ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+        )
+    return user_cache
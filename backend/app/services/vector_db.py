@@ -1,28 +1,158 @@
 import os
+import re
 import hashlib
-import json
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from pinecone import Pinecone, ServerlessSpec
-from openai import OpenAI
 from app.core.config import settings
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.db.database import SessionLocal
 from app.models.legal import DocumentChunk
+from app.services.similarity import to_matrix, normalize_rows, top_k_cosine, reciprocal_rank_fusion
+from app.services.embedding_codec import encode_embedding, decode_embedding
+from app.services.embeddings import get_embedding_provider
+from app.services.embedding_cache import get_embedding_cache
+from app.services.retrieval_cache import bump_index_version
 import logging
 
 logger = logging.getLogger(__name__)
 
+CHUNK_COLUMNS = "id, document_id, entity_id, user_id, document_type, file_name, chunk_index, page_number, chunk_text"
+CHUNK_WRITE_COLUMNS = [
+    "id", "document_id", "entity_id", "user_id", "document_type", "file_name", "chunk_index",
+    "page_number", "chunk_text", "content_hash", "embedding", "embedding_dim", "embedding_dtype", "created_at"
+]
+BACKENDS = {"pinecone", "postgres", "pgvector"}
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+ITERATIVE_SCAN_MODES = ("relaxed_order", "strict_order")  # pgvector >= 0.8
+TS_CONFIG = "english"  # Must match the chunk_tsv generated column (migration 0009)
+# A query that is only quoted phrases, or a bare article/section reference, is answered lexically
+EXACT_TERM_QUERY = re.compile(
+    r'^\s*(?:"[^"]+"\s*)+$|^\s*(?:article|section|§)\s*[\w.()-]+\s*$',
+    re.IGNORECASE
+)
+
+
+def _to_pgvector_literal(embedding: List[float]) -> str:
+    """Render an embedding as a pgvector text literal, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+def _build_where(filter_dict: Optional[Dict]) -> tuple:
+    """Translate the supported metadata filters into a SQL WHERE fragment and params."""
+    where_clauses = []
+    params: Dict[str, Any] = {}
+    if filter_dict:
+        for key in ('user_id', 'entity_id', 'document_type'):
+            if key in filter_dict:
+                where_clauses.append(f"{key} = :{key}")
+                params[key] = filter_dict[key]
+    return where_clauses, params
+
+
+def _row_to_result(row, score: float) -> Dict[str, Any]:
+    """Shape a document_chunks row like a Pinecone match."""
+    return {
+        'score': float(score),
+        'id': row.id,
+        'metadata': {
+            'document_id': row.document_id,
+            'entity_id': row.entity_id,
+            'user_id': row.user_id,
+            'document_type': row.document_type,
+            'file_name': row.file_name,
+            'chunk_index': row.chunk_index,
+            'page_number': row.page_number,
+            'chunk_text': row.chunk_text,
+        }
+    }
+
+
+def _chunk_row(i: int, chunk_id: str, content_hash: str, chunk: Dict[str, Any], metadata: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """document_chunks row for a chunk, without embedding fields."""
+    return {
+        'id': chunk_id,
+        'document_id': metadata.get('document_id', ''),
+        'entity_id': metadata.get('entity_id'),
+        'user_id': metadata.get('user_id'),
+        'document_type': metadata.get('document_type'),
+        'file_name': metadata.get('file_name'),
+        'chunk_index': i,
+        'page_number': chunk.get('page', 0),
+        'chunk_text': chunk['text'][:2000],
+        'content_hash': content_hash,
+        'embedding': None,
+        'embedding_dim': None,
+        'embedding_dtype': None,
+        'created_at': now
+    }
+
+
+def bulk_upsert_chunk_rows(db: Session, rows: List[Dict[str, Any]], use_pgvector: bool = False) -> None:
+    """
+    Write document_chunks rows with multi-row INSERT ... ON CONFLICT (id) DO UPDATE statements.
+
+    Rows are sent CHUNK_WRITE_BATCH_SIZE at a time (one round trip per batch),
+    and re-indexing an existing chunk ID updates it instead of failing.
+
+    Args:
+        db: Database session (caller commits)
+        rows: Dicts keyed by CHUNK_WRITE_COLUMNS (plus 'embedding_vector' for pgvector)
+        use_pgvector: Whether rows carry a pgvector literal in 'embedding_vector'
+    """
+    columns = CHUNK_WRITE_COLUMNS + (["embedding_vector"] if use_pgvector else [])
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in ("id", "created_at"))
+    batch_size = max(1, settings.CHUNK_WRITE_BATCH_SIZE)
+    for start in range(0, len(rows), batch_size):
+        values_sql = []
+        params: Dict[str, Any] = {}
+        for n, row in enumerate(rows[start:start + batch_size]):
+            placeholders = []
+            for c in columns:
+                key = f"{c}_{n}"
+                params[key] = row[c]
+                placeholders.append(f"CAST(:{key} AS vector)" if c == "embedding_vector" else f":{key}")
+            values_sql.append("(" + ", ".join(placeholders) + ")")
+        db.execute(
+            text(
+                f"INSERT INTO document_chunks ({', '.join(columns)}) VALUES {', '.join(values_sql)} "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}"
+            ),
+            params
+        )
+
+
+def lexical_mirror_enabled() -> bool:
+    """
+    Whether the Pinecone backend mirrors chunk text into document_chunks for full-text search.
+
+    LEXICAL_INDEX_ENABLED if set, else whether RETRIEVAL_SEARCH_MODE uses lexical search.
+    The Postgres backends always store chunk_tsv, so this only matters for Pinecone.
+    """
+    if settings.LEXICAL_INDEX_ENABLED is not None:
+        return settings.LEXICAL_INDEX_ENABLED
+    return (settings.RETRIEVAL_SEARCH_MODE or "vector").lower() in ("hybrid", "lexical")
+
 class VectorDBService:
-    """Service for managing vector database operations with Pinecone or Postgres fallback."""
+    """Service for managing vector database operations with Pinecone, pgvector or Postgres fallback."""
     
     def __init__(self):
-        """Initialize OpenAI client and choose backend (Pinecone or Postgres)."""
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.use_pinecone = bool(settings.PINECONE_API_KEY)
+        """Initialize the embedding provider and choose backend (Pinecone, pgvector or Postgres)."""
+        self.embedder = get_embedding_provider()
+        backend = (settings.VECTOR_BACKEND or "").lower()
+        if not backend:
+            backend = "pinecone" if settings.PINECONE_API_KEY else "postgres"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown VECTOR_BACKEND: {settings.VECTOR_BACKEND}")
+        self.backend = backend
+        self.use_pinecone = backend == "pinecone"
         if self.use_pinecone:
             self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
             self._initialize_index()
+        elif backend == "pgvector":
+            self._initialize_pgvector()
         
     def _initialize_index(self):
         """Initialize Pinecone index, create if doesn't exist."""
@@ -39,189 +169,565 @@ class VectorDBService:
                     )
                 )
                 logger.info(f"Created new Pinecone index: {settings.PINECONE_INDEX_NAME}")
+            else:
+                index_dimension = self.pc.describe_index(settings.PINECONE_INDEX_NAME).dimension
+                if index_dimension != settings.PINECONE_DIMENSION:
+                    raise ValueError(
+                        f"Pinecone index {settings.PINECONE_INDEX_NAME} has dimension {index_dimension}, "
+                        f"but PINECONE_DIMENSION is {settings.PINECONE_DIMENSION}"
+                    )
             self.index = self.pc.Index(settings.PINECONE_INDEX_NAME)
             logger.info(f"Connected to Pinecone index: {settings.PINECONE_INDEX_NAME}")
         except Exception as e:
             logger.error(f"Error initializing Pinecone index: {str(e)}")
             raise
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using OpenAI."""
+    def _initialize_pgvector(self):
+        """Ensure the pgvector extension, column and ANN index exist (non-production only)."""
+        if os.getenv("ENVIRONMENT") in {"production", "prod"}:
+            # Rely on Alembic migration 0003 in production
+            return
+        index_method = settings.PGVECTOR_INDEX_TYPE.lower()
+        if index_method not in {"hnsw", "ivfflat"}:
+            raise ValueError(f"Unknown PGVECTOR_INDEX_TYPE: {settings.PGVECTOR_INDEX_TYPE}")
+        db: Session = SessionLocal()
         try:
-            response = self.openai_client.embeddings.create(
-                model=settings.OPENAI_EMBEDDING_MODEL,
-                input=text
-            )
-            return response.data[0].embedding
+            db.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            db.execute(text(
+                f"ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_vector vector({settings.PINECONE_DIMENSION})"
+            ))
+            db.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_document_chunks_embedding_vector ON document_chunks "
+                f"USING {index_method} (embedding_vector vector_cosine_ops)"
+            ))
+            # For vector(n) columns atttypmod is n
+            column_dimension = db.execute(text(
+                "SELECT atttypmod FROM pg_attribute "
+                "WHERE attrelid = 'document_chunks'::regclass AND attname = 'embedding_vector'"
+            )).scalar()
+            if column_dimension != settings.PINECONE_DIMENSION:
+                raise ValueError(
+                    f"document_chunks.embedding_vector is vector({column_dimension}), "
+                    f"but PINECONE_DIMENSION is {settings.PINECONE_DIMENSION}"
+                )
+            db.commit()
+            logger.info(f"pgvector backend ready ({index_method} index)")
         except Exception as e:
-            logger.error(f"Error generating embedding: {str(e)}")
+            db.rollback()
+            logger.error(f"Error initializing pgvector: {str(e)}")
             raise
+        finally:
+            db.close()
+
+    def generate_embedding(self, text: str) -> List[float]:
+        """Generate embedding for text with the configured provider (served from the embedding cache when possible)."""
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        processes: int = 0
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for many texts with as few provider calls as possible.
+
+        Cached embeddings are reused; the remaining unique texts are grouped into
+        batches of at most the provider's batch size (and, for OpenAI,
+        EMBEDDING_BATCH_MAX_TOKENS tokens).
+
+        Args:
+            texts: Texts to embed
+            progress_callback: Optional callable(done, total) invoked after each batch
+            processes: Worker processes for local encoding (bulk re-index jobs); 0/1 encodes in-process.
+                Ignored by providers without multi-process support
+
+        Returns:
+            Embeddings in the same order as texts
+        """
+        model = self.embedder.name
+        cache = get_embedding_cache()
+        cached = cache.get_many(model, texts)
+        counts = Counter(texts)
+        done = sum(n for t, n in counts.items() if t in cached)
+        pending = list(dict.fromkeys(t for t in texts if t not in cached))
+        fresh: Dict[str, List[float]] = {}
+        # Only providers that encode locally can take everything at once; remote APIs
+        # cap inputs and tokens per request, so they always go through _embedding_batches
+        processes = processes if self.embedder.multi_process else 0
+        if processes > 1:
+            # One large call so the process pool stays busy; progress is reported once.
+            batches = [pending] if pending else []
+        else:
+            batches = self._embedding_batches(pending)
+        for batch in batches:
+            try:
+                if processes > 1:
+                    vectors = self.embedder.embed_multi_process(batch, processes)
+                else:
+                    vectors = self.embedder.embed(batch)
+            except Exception as e:
+                logger.error(f"Error generating embeddings for batch of {len(batch)}: {str(e)}")
+                raise
+            if vectors and len(vectors[0]) != settings.PINECONE_DIMENSION:
+                raise ValueError(
+                    f"{model} returned {len(vectors[0])}-dimensional embeddings, "
+                    f"expected PINECONE_DIMENSION={settings.PINECONE_DIMENSION}"
+                )
+            fresh.update(zip(batch, vectors))
+            done += sum(counts[t] for t in batch)
+            if progress_callback:
+                progress_callback(done, len(texts))
+        if fresh:
+            cache.put_many(model, fresh)
+        return [cached[t] if t in cached else fresh[t] for t in texts]
+
+    def _embedding_batches(self, texts: List[str]):
+        """Yield lists of texts that fit the provider's batch size and token budget."""
+        max_tokens = self.embedder.max_batch_tokens
+        batch: List[str] = []
+        batch_tokens = 0
+        for t in texts:
+            tokens = self.embedder.count_tokens(t) if max_tokens else 0
+            if batch and (
+                len(batch) >= self.embedder.batch_size
+                or (max_tokens and batch_tokens + tokens > max_tokens)
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(t)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def generate_chunk_ids(self, document_id: str, chunks: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """
+        Generate content-addressed IDs for a document's chunks.
+
+        IDs look like "<md5(document_id)>#<sha256(text)[:32]>#<n>", where n numbers
+        repeated identical chunks. An unchanged chunk keeps its ID across
+        re-indexing, and a document's chunks can be listed by prefix.
+
+        Args:
+            document_id: Document the chunks belong to
+            chunks: Chunks with a 'text' key
+
+        Returns:
+            (chunk_id, content_hash) per chunk, in order
+        """
+        prefix = self.chunk_id_prefix(document_id)
+        seen: Counter = Counter()
+        ids = []
+        for chunk in chunks:
+            content_hash = hashlib.sha256(chunk['text'].encode('utf-8')).hexdigest()
+            occurrence = seen[content_hash]
+            seen[content_hash] += 1
+            ids.append((f"{prefix}{content_hash[:32]}#{occurrence}", content_hash))
+        return ids
+
+    def chunk_id_prefix(self, document_id: str) -> str:
+        """ID prefix shared by every chunk of a document."""
+        return hashlib.md5(document_id.encode()).hexdigest() + "#"
+
+    def legacy_chunk_ids(self, document_id: str, chunks: List[Dict[str, Any]]) -> List[str]:
+        """
+        Positional IDs (md5 of document_id, chunk index and the first 50 characters)
+        that chunks were stored under before content-addressed IDs. Pinecone cannot
+        list them by document, so they are regenerated from the chunks instead.
+        """
+        return [
+            hashlib.md5(f"{document_id}_{i}_{chunk['text'][:50]}".encode()).hexdigest()
+            for i, chunk in enumerate(chunks)
+        ]
     
-    def generate_document_id(self, content: str, metadata: Dict) -> str:
-        """Generate unique ID for a document chunk."""
-        unique_string = f"{metadata.get('document_id', '')}_{metadata.get('chunk_index', '')}_{content[:50]}"
-        return hashlib.md5(unique_string.encode()).hexdigest()
-    
-    def upsert_document_chunks(self, chunks: List[Dict[str, Any]], metadata: Dict[str, Any]) -> bool:
+    def upsert_document_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> bool:
         """
-        Upsert document chunks to Pinecone.
+        Incrementally index a document's chunks in the configured vector backend.
+
+        Chunks whose content hash is already stored for the document are kept
+        (only their position is updated), new chunks are embedded in batches
+        (see generate_embeddings) and written, and stored chunks that no longer
+        appear are deleted.
         
         Args:
             chunks: List of text chunks with metadata
             metadata: Document-level metadata
+            progress_callback: Optional callable(stage, done, total) for "embedding" and "storing"
         
         Returns:
             Success status
         """
         try:
+            document_id = metadata.get('document_id', '')
+            chunk_ids = self.generate_chunk_ids(document_id, chunks)
+            existing = self._existing_chunks(document_id)
+            current = {chunk_id for chunk_id, _ in chunk_ids}
+            new_positions = [i for i, (chunk_id, _) in enumerate(chunk_ids) if chunk_id not in existing]
+            moved_positions = [
+                i for i, (chunk_id, _) in enumerate(chunk_ids)
+                if chunk_id in existing and existing[chunk_id] != (i, chunks[i].get('page', 0))
+            ]
+            stale_ids = [chunk_id for chunk_id in existing if chunk_id not in current]
+            if self.use_pinecone and not existing:
+                # First index under content-addressed IDs: remove any copy stored under the old
+                # positional IDs (a no-op for new documents). Documents whose chunking has changed
+                # since need scripts/rekey_pinecone_chunks.py.
+                stale_ids += self.legacy_chunk_ids(document_id, chunks)
+            reused = len(chunks) - len(new_positions)
+
+            embed_progress = (
+                (lambda done, total: progress_callback("embedding", reused + done, len(chunks)))
+                if progress_callback else None
+            )
+            embeddings = self.generate_embeddings([chunks[i]['text'] for i in new_positions], embed_progress)
+            if progress_callback:
+                progress_callback("storing", 0, len(chunks))
+
+            new_chunks = [(i, chunk_ids[i], chunks[i], emb) for i, emb in zip(new_positions, embeddings)]
+            moved_chunks = [(i, chunk_ids[i][0], chunks[i].get('page', 0)) for i in moved_positions]
             if self.use_pinecone:
-                vectors_to_upsert = []
-                for i, chunk in enumerate(chunks):
-                    embedding = self.generate_embedding(chunk['text'])
-                    chunk_metadata = {
-                        **metadata,
-                        'chunk_index': i,
-                        'chunk_text': chunk['text'][:1000],
-                        'page_number': chunk.get('page', 0)
-                    }
-                    vector_id = self.generate_document_id(chunk['text'], chunk_metadata)
-                    vectors_to_upsert.append({
-                        'id': vector_id,
-                        'values': embedding,
-                        'metadata': chunk_metadata
-                    })
-                batch_size = 100
-                for i in range(0, len(vectors_to_upsert), batch_size):
-                    batch = vectors_to_upsert[i:i + batch_size]
-                    self.index.upsert(vectors=batch)
-                logger.info(f"Successfully upserted {len(vectors_to_upsert)} vectors to Pinecone")
-                return True
-            else:
-                # Postgres fallback: store chunks and embeddings in DB
-                db: Session = SessionLocal()
-                try:
-                    for i, chunk in enumerate(chunks):
-                        embedding = self.generate_embedding(chunk['text'])
-                        chunk_id = self.generate_document_id(chunk['text'], {**metadata, 'chunk_index': i})
-                        db_chunk = DocumentChunk(
-                            id=chunk_id,
-                            document_id=metadata.get('document_id', ''),
-                            entity_id=metadata.get('entity_id'),
-                            user_id=metadata.get('user_id'),
-                            document_type=metadata.get('document_type'),
-                            file_name=metadata.get('file_name'),
-                            chunk_index=i,
-                            page_number=chunk.get('page', 0),
-                            chunk_text=chunk['text'][:2000],
-                            embedding=json.dumps(embedding)
-                        )
-                        db.add(db_chunk)
-                    db.commit()
-                    logger.info(f"Stored {len(chunks)} chunks in Postgres fallback")
-                    return True
-                except Exception as e:
-                    db.rollback()
-                    logger.error(f"Error storing chunks in Postgres: {str(e)}")
-                    return False
-                finally:
-                    db.close()
+                self._write_pinecone(new_chunks, moved_chunks, stale_ids, metadata)
+                if lexical_mirror_enabled():
+                    self._write_lexical_rows(chunk_ids, chunks, metadata)
+            elif not self._write_postgres(new_chunks, moved_chunks, stale_ids, metadata):
+                return False
+            if new_chunks or moved_chunks or stale_ids:
+                bump_index_version(metadata.get('user_id'), metadata.get('entity_id'))
+            logger.info(
+                f"Indexed {document_id}: {len(new_chunks)} embedded, {reused} unchanged "
+                f"({len(moved_chunks)} moved), {len(stale_ids)} deleted [{self.backend}]"
+            )
+            return True
         except Exception as e:
             logger.error(f"Error in upsert_document_chunks: {str(e)}")
             return False
+
+    def missing_chunk_texts(self, document_id: str, chunks: List[Dict[str, Any]]) -> List[str]:
+        """Texts of the chunks upsert_document_chunks would have to embed (not yet stored for the document)."""
+        existing = self._existing_chunks(document_id)
+        return [
+            chunk['text'] for (chunk_id, _), chunk in zip(self.generate_chunk_ids(document_id, chunks), chunks)
+            if chunk_id not in existing
+        ]
+
+    def _existing_chunks(self, document_id: str) -> Dict[str, Tuple[int, int]]:
+        """Map stored chunk ID -> (chunk_index, page_number) for a document."""
+        if self.use_pinecone:
+            existing = {}
+            ids = self._list_pinecone_ids(document_id)
+            for i in range(0, len(ids), 100):
+                fetched = self.index.fetch(ids=ids[i:i + 100])
+                for vector_id, vector in fetched.vectors.items():
+                    md = vector.metadata or {}
+                    existing[vector_id] = (int(md.get('chunk_index', -1)), int(md.get('page_number', 0)))
+            return existing
+        # Rows without this backend's embedding column (e.g. written by the other Postgres backend
+        # before a VECTOR_BACKEND switch) are unsearchable, so count them as missing and re-embed
+        vector_column = "embedding_vector" if self.backend == "pgvector" else "embedding"
+        db: Session = SessionLocal()
+        try:
+            rows = db.execute(
+                text(
+                    f"SELECT id, chunk_index, page_number FROM document_chunks "
+                    f"WHERE document_id = :document_id AND {vector_column} IS NOT NULL"
+                ),
+                {'document_id': document_id}
+            ).fetchall()
+            return {r.id: (r.chunk_index, r.page_number or 0) for r in rows}
+        finally:
+            db.close()
+
+    def _list_pinecone_ids(self, document_id: str) -> List[str]:
+        ids: List[str] = []
+        for page in self.index.list(prefix=self.chunk_id_prefix(document_id)):
+            ids.extend(page)
+        return ids
+
+    def _write_pinecone(self, new_chunks, moved_chunks, stale_ids, metadata: Dict[str, Any]) -> None:
+        vectors_to_upsert = []
+        for i, (chunk_id, content_hash), chunk, embedding in new_chunks:
+            vectors_to_upsert.append({
+                'id': chunk_id,
+                'values': embedding,
+                'metadata': {
+                    **metadata,
+                    'chunk_index': i,
+                    'chunk_text': chunk['text'][:1000],
+                    'page_number': chunk.get('page', 0),
+                    'content_hash': content_hash
+                }
+            })
+        batch_size = 100
+        for i in range(0, len(vectors_to_upsert), batch_size):
+            self.index.upsert(vectors=vectors_to_upsert[i:i + batch_size])
+        for i, chunk_id, page in moved_chunks:
+            self.index.update(id=chunk_id, set_metadata={'chunk_index': i, 'page_number': page})
+        for i in range(0, len(stale_ids), 1000):
+            self.index.delete(ids=stale_ids[i:i + 1000])
+
+    def _write_lexical_rows(self, chunk_ids: List[Tuple[str, str]], chunks: List[Dict[str, Any]], metadata: Dict[str, Any]) -> None:
+        """
+        Mirror a Pinecone-indexed document's chunk text into document_chunks (no embeddings)
+        so the full-text index covers it. Every current chunk is upserted, which also
+        backfills documents indexed before the mirror existed.
+        """
+        db: Session = SessionLocal()
+        try:
+            document_id = metadata.get('document_id', '')
+            current = [chunk_id for chunk_id, _ in chunk_ids]
+            db.query(DocumentChunk).filter(
+                DocumentChunk.document_id == document_id,
+                ~DocumentChunk.id.in_(current)
+            ).delete(synchronize_session=False)
+            now = datetime.utcnow()
+            rows = [
+                _chunk_row(i, chunk_id, content_hash, chunk, metadata, now)
+                for i, ((chunk_id, content_hash), chunk) in enumerate(zip(chunk_ids, chunks))
+            ]
+            bulk_upsert_chunk_rows(db, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error mirroring chunk text for lexical search: {str(e)}")
+        finally:
+            db.close()
+
+    def _write_postgres(self, new_chunks, moved_chunks, stale_ids, metadata: Dict[str, Any]) -> bool:
+        # Postgres: store chunks in DB, embeddings as packed bytes or a pgvector column
+        use_pgvector = self.backend == "pgvector"
+        db: Session = SessionLocal()
+        try:
+            if stale_ids:
+                db.query(DocumentChunk).filter(DocumentChunk.id.in_(stale_ids)).delete(synchronize_session=False)
+            if moved_chunks:
+                db.execute(
+                    text("UPDATE document_chunks SET chunk_index = :chunk_index, page_number = :page_number WHERE id = :id"),
+                    [{'id': chunk_id, 'chunk_index': i, 'page_number': page} for i, chunk_id, page in moved_chunks]
+                )
+            now = datetime.utcnow()
+            rows = []
+            for i, (chunk_id, content_hash), chunk, embedding in new_chunks:
+                row = _chunk_row(i, chunk_id, content_hash, chunk, metadata, now)
+                row.update(
+                    embedding=None if use_pgvector else encode_embedding(embedding, settings.EMBEDDING_STORAGE_DTYPE),
+                    embedding_dim=len(embedding),
+                    embedding_dtype=None if use_pgvector else settings.EMBEDDING_STORAGE_DTYPE
+                )
+                if use_pgvector:
+                    row['embedding_vector'] = _to_pgvector_literal(embedding)
+                rows.append(row)
+            bulk_upsert_chunk_rows(db, rows, use_pgvector)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error storing chunks in Postgres: {str(e)}")
+            return False
+        finally:
+            db.close()
     
     def search_similar_chunks(
         self, 
         query: str, 
         top_k: int = 5,
         filter_dict: Optional[Dict] = None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        mode: str = "vector"
     ) -> List[Dict[str, Any]]:
         """
         Search for similar document chunks.
         
+        "hybrid" runs full-text (Postgres tsvector) and vector search over
+        top_k * HYBRID_CANDIDATE_MULTIPLIER candidates each and fuses them with
+        reciprocal rank fusion; exact-term queries (quoted phrases, "Article 4.2")
+        that match lexically skip the embedding call. "lexical" is full-text only.
+        
         Args:
             query: Search query
             top_k: Number of results to return
             filter_dict: Metadata filters
             include_metadata: Whether to include metadata in results
+            mode: "vector", "hybrid" or "lexical"
         
         Returns:
             List of similar chunks with scores
         """
         try:
-            query_embedding = self.generate_embedding(query)
-            if self.use_pinecone:
-                results = self.index.query(
-                    vector=query_embedding,
-                    top_k=top_k,
-                    filter=filter_dict,
-                    include_metadata=include_metadata
-                )
-                formatted_results = []
-                for match in results.matches:
-                    result = {
-                        'score': match.score,
-                        'id': match.id
-                    }
-                    if include_metadata and hasattr(match, 'metadata'):
-                        result['metadata'] = match.metadata
-                    formatted_results.append(result)
-                return formatted_results
-            else:
-                # Postgres fallback: cosine similarity with stored embeddings
-                db: Session = SessionLocal()
-                try:
-                    # Build basic filtering in SQL
-                    where_clauses = []
-                    params: Dict[str, Any] = {}
-                    if filter_dict:
-                        if 'user_id' in filter_dict:
-                            where_clauses.append("user_id = :user_id")
-                            params['user_id'] = filter_dict['user_id']
-                        if 'entity_id' in filter_dict:
-                            where_clauses.append("entity_id = :entity_id")
-                            params['entity_id'] = filter_dict['entity_id']
-                        if 'document_type' in filter_dict:
-                            where_clauses.append("document_type = :document_type")
-                            params['document_type'] = filter_dict['document_type']
-                    where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
-
-                    rows = db.execute(text(f"SELECT id, document_id, entity_id, user_id, document_type, file_name, chunk_index, page_number, chunk_text, embedding FROM document_chunks {where_sql}"), params).fetchall()
-                    # Compute cosine similarity in Python
-                    def cosine(a: List[float], b: List[float]) -> float:
-                        import math
-                        dot = sum(x*y for x, y in zip(a, b))
-                        na = math.sqrt(sum(x*x for x in a))
-                        nb = math.sqrt(sum(y*y for y in b))
-                        return dot / (na * nb + 1e-9)
-                    scored = []
-                    for r in rows:
-                        emb = json.loads(r.embedding) if r.embedding else []
-                        if not emb:
-                            continue
-                        score = cosine(query_embedding, emb)
-                        scored.append({
-                            'score': float(score),
-                            'id': r.id,
-                            'metadata': {
-                                'document_id': r.document_id,
-                                'entity_id': r.entity_id,
-                                'user_id': r.user_id,
-                                'document_type': r.document_type,
-                                'file_name': r.file_name,
-                                'chunk_index': r.chunk_index,
-                                'page_number': r.page_number,
-                                'chunk_text': r.chunk_text,
-                            }
-                        })
-                    scored.sort(key=lambda x: x['score'], reverse=True)
-                    return scored[:top_k]
-                finally:
-                    db.close()
+            if mode not in SEARCH_MODES:
+                raise ValueError(f"Unknown search mode: {mode}")
+            if mode != "vector" and not self.lexical_search_available():
+                logger.warning(f"{mode} search needs the lexical index (LEXICAL_INDEX_ENABLED); using vector search")
+                mode = "vector"
+            if mode == "vector":
+                return self._search_vector(query, top_k, filter_dict, include_metadata)
+            
+            candidates = top_k if mode == "lexical" else top_k * max(1, settings.HYBRID_CANDIDATE_MULTIPLIER)
+            lexical = self._search_lexical(query, candidates, filter_dict)
+            if mode == "lexical" or (lexical and EXACT_TERM_QUERY.match(query)):
+                return lexical[:top_k]
+            vector = self._search_vector(query, candidates, filter_dict, include_metadata)
+            return reciprocal_rank_fusion([vector, lexical], top_k, settings.RRF_K)
         except Exception as e:
             logger.error(f"Error in search_similar_chunks: {str(e)}")
             return []
     
+    def _search_vector(
+        self,
+        query: str,
+        top_k: int,
+        filter_dict: Optional[Dict],
+        include_metadata: bool
+    ) -> List[Dict[str, Any]]:
+        """Embed the query and search the configured vector backend."""
+        query_embedding = self.generate_embedding(query)
+        if self.use_pinecone:
+            results = self.index.query(
+                vector=query_embedding,
+                top_k=top_k,
+                filter=filter_dict,
+                include_metadata=include_metadata
+            )
+            formatted_results = []
+            for match in results.matches:
+                result = {
+                    'score': match.score,
+                    'id': match.id
+                }
+                if include_metadata and hasattr(match, 'metadata'):
+                    result['metadata'] = match.metadata
+                formatted_results.append(result)
+            return formatted_results
+        elif self.backend == "pgvector":
+            return self._search_pgvector(query_embedding, top_k, filter_dict)
+        else:
+            return self._search_postgres(query_embedding, top_k, filter_dict)
+    
+    def lexical_search_available(self) -> bool:
+        """Full-text search needs chunk rows in Postgres: always there unless the backend is Pinecone."""
+        return not self.use_pinecone or lexical_mirror_enabled()
+
+    def _search_lexical(
+        self,
+        query: str,
+        top_k: int,
+        filter_dict: Optional[Dict]
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over document_chunks.chunk_tsv (GIN index), ranked with ts_rank_cd."""
+        if not self.lexical_search_available():
+            return []
+        where_clauses, params = _build_where(filter_dict)
+        where_clauses.append("chunk_tsv @@ tsq")
+        params['q'] = query
+        params['k'] = top_k
+        sql = (
+            f"SELECT {CHUNK_COLUMNS}, ts_rank_cd(chunk_tsv, tsq, 32) AS score "
+            f"FROM document_chunks, websearch_to_tsquery('{TS_CONFIG}', :q) AS tsq "
+            f"WHERE {' AND '.join(where_clauses)} "
+            f"ORDER BY score DESC LIMIT :k"
+        )
+        db: Session = SessionLocal()
+        try:
+            rows = db.execute(text(sql), params).fetchall()
+            return [_row_to_result(r, r.score) for r in rows]
+        except Exception as e:
+            # e.g. migration 0009 not applied yet: degrade to vector-only results
+            logger.error(f"Error in lexical search: {str(e)}")
+            return []
+        finally:
+            db.close()
+    
+    def _search_pgvector(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filter_dict: Optional[Dict]
+    ) -> List[Dict[str, Any]]:
+        """
+        Nearest-neighbour search using the pgvector ANN index, filters applied in the same query.
+
+        pgvector applies the WHERE clause to the index's candidate list (ef_search
+        for HNSW, the probed lists for IVFFlat), so a user owning a small share of
+        document_chunks could get fewer than top_k rows. Filtered searches therefore
+        widen the candidate list, use iterative index scans where the server supports
+        them (pgvector >= 0.8), and fall back to an exact scan if still short.
+        """
+        where_clauses, params = _build_where(filter_dict)
+        filtered = bool(where_clauses)
+        where_clauses.append("embedding_vector IS NOT NULL")
+        params['q'] = _to_pgvector_literal(query_embedding)
+        params['k'] = top_k
+        sql = (
+            f"SELECT {CHUNK_COLUMNS}, 1 - (embedding_vector <=> CAST(:q AS vector)) AS score "
+            f"FROM document_chunks WHERE {' AND '.join(where_clauses)} "
+            f"ORDER BY embedding_vector <=> CAST(:q AS vector) LIMIT :k"
+        )
+        db: Session = SessionLocal()
+        try:
+            self._configure_ann_search(db, top_k, filtered)
+            rows = db.execute(text(sql), params).fetchall()
+            if filtered and len(rows) < top_k:
+                # Exact scan over the filtered rows; also correct when the filter simply matches fewer than top_k
+                db.execute(text("SET LOCAL enable_indexscan = off"))
+                rows = db.execute(text(sql), params).fetchall()
+            results = [_row_to_result(r, r.score) for r in rows]
+            # relaxed_order iterative scans may return rows slightly out of distance order
+            results.sort(key=lambda r: r['score'], reverse=True)
+            return results
+        finally:
+            db.close()
+
+    def _configure_ann_search(self, db: Session, top_k: int, filtered: bool) -> None:
+        """Set the per-transaction ANN search parameters for a pgvector query."""
+        index_type = settings.PGVECTOR_INDEX_TYPE.lower()
+        if index_type == "ivfflat":
+            db.execute(text(f"SET LOCAL ivfflat.probes = {int(settings.PGVECTOR_PROBES)}"))
+        else:
+            ef_search = int(settings.PGVECTOR_EF_SEARCH)
+            if filtered:
+                ef_search = max(ef_search, top_k * int(settings.PGVECTOR_FILTERED_EF_MULTIPLIER))
+            db.execute(text(f"SET LOCAL hnsw.ef_search = {min(ef_search, 1000)}"))
+        iterative_scan = settings.PGVECTOR_ITERATIVE_SCAN.lower()
+        if filtered and iterative_scan in ITERATIVE_SCAN_MODES:
+            prefix = "ivfflat" if index_type == "ivfflat" else "hnsw"
+            try:
+                # Savepoint so older pgvector versions (unknown parameter) don't abort the transaction
+                with db.begin_nested():
+                    db.execute(text(f"SET LOCAL {prefix}.iterative_scan = {iterative_scan}"))
+            except Exception as e:
+                logger.debug(f"pgvector iterative scan unavailable: {str(e)}")
+
+    def _search_postgres(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filter_dict: Optional[Dict]
+    ) -> List[Dict[str, Any]]:
+        """Postgres fallback: vectorized cosine similarity over every matching stored embedding."""
+        where_clauses, params = _build_where(filter_dict)
+        where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+        db: Session = SessionLocal()
+        try:
+            rows = db.execute(text(f"SELECT {CHUNK_COLUMNS}, embedding, embedding_dim, embedding_dtype FROM document_chunks {where_sql}"), params).fetchall()
+            # Pack embeddings into one float32 matrix and score with a single matmul
+            dimension = len(query_embedding)
+            candidates = []
+            embeddings = []
+            for r in rows:
+                if not r.embedding or r.embedding_dim != dimension:
+                    continue
+                emb = decode_embedding(r.embedding, r.embedding_dim, r.embedding_dtype or 'float32')
+                candidates.append(r)
+                embeddings.append(emb)
+            matrix = normalize_rows(to_matrix(embeddings, dimension))
+            return [_row_to_result(candidates[idx], score) for idx, score in top_k_cosine(query_embedding, matrix, top_k)]
+        finally:
+            db.close()
+
     def delete_document(self, document_id: str) -> bool:
         """
         Delete all chunks for a document.
@@ -232,15 +738,49 @@ class VectorDBService:
         Returns:
             Success status
         """
+        if self.use_pinecone:
+            try:
+                ids = self._list_pinecone_ids(document_id)
+                if ids:
+                    for i in range(0, len(ids), 1000):
+                        self.index.delete(ids=ids[i:i + 1000])
+                else:
+                    # Vectors still under the old positional IDs can only be found by metadata; serverless
+                    # indexes reject this, so re-key them first with scripts/rekey_pinecone_chunks.py
+                    try:
+                        self.index.delete(filter={'document_id': document_id})
+                    except Exception as e:
+                        logger.error(
+                            f"Metadata delete failed for {document_id} ({str(e)}); "
+                            f"run scripts/rekey_pinecone_chunks.py and delete again"
+                        )
+                        return False
+                if lexical_mirror_enabled():
+                    self._delete_chunk_rows(document_id)
+                bump_index_version()
+                logger.info(f"Deleted document {document_id} from Pinecone")
+                return True
+            except Exception as e:
+                logger.error(f"Error deleting from Pinecone: {str(e)}")
+                return False
         try:
-            # Delete by metadata filter
-            self.index.delete(filter={'document_id': document_id})
-            logger.info(f"Deleted document {document_id} from Pinecone")
+            deleted = self._delete_chunk_rows(document_id)
+            bump_index_version()
+            logger.info(f"Deleted {deleted} chunks for document {document_id} from Postgres")
             return True
         except Exception as e:
-            logger.error(f"Error deleting from Pinecone: {str(e)}")
+            logger.error(f"Error deleting from Postgres: {str(e)}")
             return False
     
+    def _delete_chunk_rows(self, document_id: str) -> int:
+        db: Session = SessionLocal()
+        try:
+            deleted = db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+    
     def get_index_stats(self) -> Dict[str, Any]:
         """Get statistics about the Pinecone index."""
         try:
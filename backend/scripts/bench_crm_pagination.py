@@ -0,0 +1,121 @@
+"""
+Benchmark the CRM list queries: full-table listing vs keyset pages.
+
+Seeds a scratch database with --matters matters (and one contact per 5 matters),
+then times the old `db.query(Matter).all()` + Pydantic serialization against
+keyset pages at the start and the end of the table, a filtered page and a
+projected page. Keyset page times should stay flat as --matters grows.
+
+Usage (from backend/):
+    python scripts/bench_crm_pagination.py --matters 100000
+    python scripts/bench_crm_pagination.py --database-url postgresql://.../scratch_db
+
+Only point --database-url at a scratch database: it creates and fills the CRM tables.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.db.database import Base  # noqa: E402
+from app.db.pagination import keyset_page, parse_fields  # noqa: E402
+from app.models.crm import Contact, Matter  # noqa: E402
+from app.models.intake import Intake  # noqa: E402
+import app.models.user  # noqa: E402,F401  (users table for the advisor_id foreign key)
+from app.schemas.user import Matter as MatterSchema  # noqa: E402
+
+PIPELINES = ["Public Intake", "Referral", "Existing Client"]
+STAGES = ["New", "Booked", "Consult", "Engaged", "Closed"]
+
+
+def seed(session, matters: int, batch: int = 10000) -> None:
+    contacts = max(1, matters // 5)
+    start = datetime(2024, 1, 1)
+    session.bulk_insert_mappings(Contact, [
+        {"id": i, "name": f"Contact {i}", "email": f"contact{i}@example.com", "created_at": start}
+        for i in range(1, contacts + 1)
+    ])
+    for offset in range(0, matters, batch):
+        session.bulk_insert_mappings(Matter, [
+            {
+                "id": i,
+                "title": f"Matter {i}",
+                "pipeline": PIPELINES[i % len(PIPELINES)],
+                "stage": STAGES[i % len(STAGES)],
+                "contact_id": (i % contacts) + 1,
+                "advisor_id": (i % 25) + 1,
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(offset + 1, min(matters, offset + batch) + 1)
+        ])
+    session.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matters", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="scratch database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_crm.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine, tables=[Contact.__table__, Matter.__table__, Intake.__table__])
+    session = sessionmaker(bind=engine)()
+    if session.query(func.count(Matter.id)).scalar() < args.matters:
+        print(f"Seeding {args.matters} matters into {engine.url.render_as_string(hide_password=True)} ...")
+        session.query(Matter).delete()
+        session.query(Contact).delete()
+        session.commit()
+        seed(session, args.matters)
+    last_id = session.query(func.max(Matter.id)).scalar()
+
+    def full_listing():
+        rows = session.query(Matter).all()
+        [MatterSchema.model_validate(r).model_dump() for r in rows]
+        session.expunge_all()
+
+    def page(cursor=None, fields=None, **filters):
+        def run():
+            q = session.query(Matter)
+            for name, value in filters.items():
+                q = q.filter(getattr(Matter, name) == value)
+            rows, _ = keyset_page(q, Matter, cursor, args.page_size, "asc", parse_fields(fields, list(MatterSchema.model_fields)))
+            if not fields:
+                [MatterSchema.model_validate(r).model_dump() for r in rows]
+            session.expunge_all()
+        return run
+
+    cases = [
+        ("old: all rows + schema", full_listing, 1),
+        ("keyset: first page", page(), args.repeat),
+        ("keyset: last page", page(cursor=last_id - args.page_size - 1), args.repeat),
+        ("keyset: pipeline+stage filter, deep", page(cursor=last_id // 2, pipeline="Referral", stage="Booked"), args.repeat),
+        ("keyset: advisor filter", page(advisor_id=7), args.repeat),
+        ("keyset: fields=id,title,stage", page(fields="id,title,stage"), args.repeat),
+    ]
+    print(f"{last_id} matters, page size {args.page_size}")
+    for name, fn, repeat in cases:
+        print(f"  {name:<38} {timed(fn, repeat):9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
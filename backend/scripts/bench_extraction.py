@@ -0,0 +1,117 @@
+"""
+Benchmark document text extraction.
+
+- Generates multi-hundred-page text PDFs and compares single-process page
+  extraction with the process-pool path in DocumentProcessor.iter_pdf_pages.
+- Extracts every .docx under the repo's documents/ tree, serially and
+  fanned out across a process pool (a single DOCX is one XML part, so the
+  parallelism for DOCX is across files).
+
+Usage (from backend/):
+    python scripts/bench_extraction.py [--pages 200 500] [--workers 4]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.document_processor import DocumentProcessor, _extract_pdf_page_range  # noqa: E402
+
+DOCUMENTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "documents")
+LINE = "The Trustee shall hold, manage and distribute the trust property as provided in Article {n}."
+
+
+def make_pdf(num_pages: int, lines_per_page: int = 40) -> bytes:
+    """Build a minimal text PDF by hand (no PDF writer dependency)."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # pages tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for p in range(num_pages):
+        ops = ["BT /F1 10 Tf 40 800 Td 12 TL"]
+        for i in range(lines_per_page):
+            ops.append(f"({LINE.format(n=p * lines_per_page + i)}) '")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, num_pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _docx_text(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(DocumentProcessor().extract_text_from_docx(f.read()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[200, 500])
+    parser.add_argument("--workers", type=int, default=settings.PDF_EXTRACTION_WORKERS)
+    args = parser.parse_args()
+
+    settings.PDF_EXTRACTION_WORKERS = args.workers
+    settings.PDF_PARALLEL_MIN_PAGES = 1
+    processor = DocumentProcessor()
+
+    print(f"PDF extraction (workers={args.workers})")
+    for n in args.pages:
+        pdf = make_pdf(n)
+        start = time.perf_counter()
+        serial = _extract_pdf_page_range(pdf, 0, n)
+        t_serial = time.perf_counter() - start
+
+        list(processor.iter_pdf_pages(make_pdf(1)))  # warm up the pool
+        start = time.perf_counter()
+        first_page_at = None
+        parallel = []
+        for _, text in processor.iter_pdf_pages(pdf):
+            if first_page_at is None:
+                first_page_at = time.perf_counter() - start
+            parallel.append(text)
+        t_parallel = time.perf_counter() - start
+        assert parallel == serial, "parallel extraction differs from serial"
+        print(
+            f"  {n:>5} pages: serial {t_serial:.2f}s, pool {t_parallel:.2f}s "
+            f"({t_serial / t_parallel:.1f}x), first page after {first_page_at:.2f}s"
+        )
+
+    paths = sorted(glob.glob(os.path.join(DOCUMENTS_DIR, "**", "*.docx"), recursive=True))
+    if paths:
+        start = time.perf_counter()
+        for p in paths:
+            _docx_text(p)
+        t_serial = time.perf_counter() - start
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(_docx_text, paths))
+        t_parallel = time.perf_counter() - start
+        print(f"DOCX extraction over {len(paths)} files: serial {t_serial:.2f}s, pool {t_parallel:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
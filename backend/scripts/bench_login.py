@@ -0,0 +1,107 @@
+"""
+Login latency under a burst of concurrent logins against one running worker.
+
+Start a single worker first, e.g.:
+    VERIFIED_CREDENTIAL_TTL_SECONDS=0 uvicorn app.main:app --workers 1 --port 8000
+
+(TTL 0 makes every login pay for bcrypt; leave it at the default to measure the
+repeat-login fast path instead.) Then (from backend/):
+    python scripts/bench_login.py --email advisor@example.com --password ... --concurrency 20 --requests 200
+
+While logins run, a probe thread polls /healthz; its p99 shows whether the login
+burst stalls unrelated requests on the same worker. Every login runs bcrypt on
+PASSWORD_HASH_CONCURRENCY threads, so login p99 grows with queueing there while
+the probe latency should stay flat. Use an account without 2FA and a client IP
+that is not rate limited (only failed logins count against the limit).
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+
+def login(args) -> float:
+    body = urllib.parse.urlencode({"username": args.email, "password": args.password}).encode("utf-8")
+    req = urllib.request.Request(
+        f"{args.base_url}/api/token",
+        data=body,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        method="POST",
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=args.timeout) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+
+def probe(args, stop: threading.Event, latencies: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(f"{args.base_url}/healthz", timeout=args.timeout) as resp:
+                resp.read()
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            pass
+        stop.wait(args.probe_interval)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summary(name: str, values: List[float]) -> str:
+    if not values:
+        return f"{name}: no successful requests"
+    ms = [v * 1000 for v in values]
+    return (
+        f"{name}: n={len(ms)} p50={statistics.median(ms):.0f}ms "
+        f"p95={percentile(ms, 0.95):.0f}ms p99={percentile(ms, 0.99):.0f}ms max={max(ms):.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="seconds between /healthz probes")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    latencies: List[float] = []
+    probe_latencies: List[float] = []
+    errors = 0
+    stop = threading.Event()
+    prober = threading.Thread(target=probe, args=(args, stop, probe_latencies), daemon=True)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(login, args) for _ in range(args.requests)]
+        for f in futures:
+            try:
+                latencies.append(f.result())
+            except Exception as e:
+                errors += 1
+                if errors <= 3:
+                    print(f"login failed: {e}")
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    print(f"{args.requests} logins, concurrency {args.concurrency}: {elapsed:.1f}s, "
+          f"{len(latencies) / elapsed:.1f} logins/s, {errors} errors")
+    print(summary("login  ", latencies))
+    print(summary("healthz", probe_latencies))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Exercise map-reduce document analysis against a local stub of the chat client.
+
+No OpenAI calls are made: the stub sleeps for --latency seconds per call and
+records peak concurrency, so the run reports per-stage token usage and wall
+time against a serial baseline. Correctness of split, map and reduce is covered
+by tests/test_map_reduce.py.
+
+Usage (from backend/):
+    python scripts/bench_map_reduce.py [--articles 400] [--concurrency 4] [--latency 0.5]
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.rag_chat import RAGChatService  # noqa: E402
+from app.services.tokens import count_tokens  # noqa: E402
+
+ARTICLE = (
+    "Article {n}. The Manager shall maintain the books and records of the Company and shall "
+    "deliver to each Member, within ninety days after the end of each fiscal year, a statement "
+    "of that Member's capital account together with the information needed for tax reporting. "
+)
+MARKER = re.compile(r"Article (\d+)")
+
+
+class StubChatClient:
+    """Mimics client.chat.completions.create, answering with the article numbers in the prompt."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature, max_tokens):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.latency)
+            prompt = messages[-1]["content"]
+            seen = sorted({int(n) for n in MARKER.findall(prompt)})
+            content = " ".join(f"Article {n}" for n in seen)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=SimpleNamespace(
+                    prompt_tokens=sum(count_tokens(m["content"]) for m in messages),
+                    completion_tokens=count_tokens(content),
+                ),
+            )
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=settings.ANALYSIS_MAP_CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    settings.ANALYSIS_MAP_CONCURRENCY = args.concurrency
+    document = "".join(ARTICLE.format(n=n) for n in range(1, args.articles + 1))
+    stub = StubChatClient(args.latency)
+    result = RAGChatService(openai_client=stub).analyze_document(document, "summary", mode="auto")
+    if result["status"] != "success":
+        sys.exit(result["analysis"])
+
+    stats = result["stats"]
+    print(f"mode={result['mode']} document_tokens={stats['document_tokens']} parts={stats['parts']}")
+    for name, stage in stats["stages"].items():
+        print(
+            f"  {name:<7} calls={stage['calls']:<4} prompt_tokens={stage['prompt_tokens']:<8} "
+            f"completion_tokens={stage['completion_tokens']:<7} wall={stage['seconds']:.2f}s"
+        )
+    serial = stub.calls * args.latency
+    print(f"total {stats['total_seconds']:.2f}s vs {serial:.2f}s serial; peak concurrency {stub.peak}/{args.concurrency}")
+
+
+if __name__ == "__main__":
+    main()
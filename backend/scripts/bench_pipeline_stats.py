@@ -0,0 +1,154 @@
+"""
+Benchmark /api/pipeline/stats aggregation strategies as matter volume grows.
+
+Seeds a scratch database with --matters matters spread over two years, then
+times, for one advisor and for all advisors, both periods of:
+  - the old approach (load every matching Matter, count stages in Python)
+  - a single GROUP BY stage over matters
+  - the matter_stage_daily rollup
+and checks that all three agree. With a Postgres --database-url it also
+exercises the ORM listeners that maintain the rollup (insert, stage change,
+advisor change, delete); their upsert is Postgres-only.
+
+Usage (from backend/):
+    python scripts/bench_pipeline_stats.py --matters 100000
+    python scripts/bench_pipeline_stats.py --database-url postgresql://.../scratch_db
+
+Only point --database-url at a scratch database: it creates and fills the CRM tables.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.db.database import Base  # noqa: E402
+from app.models.crm import Contact, Matter, MatterStageDaily  # noqa: E402
+import app.models.user  # noqa: E402,F401  (users table for the advisor_id foreign key)
+from app.services import pipeline_stats  # noqa: E402
+
+STAGES = ["New", "Booked", "Paid", "Signed", "Onboarding", "Completed", "Lost"]
+ADVISORS = 25
+
+
+def seed(session, matters: int, batch: int = 10000) -> None:
+    now = datetime.utcnow()
+    session.bulk_insert_mappings(Contact, [{"id": 1, "name": "Contact", "created_at": now}])
+    for offset in range(0, matters, batch):
+        session.bulk_insert_mappings(Matter, [
+            {
+                "id": i,
+                "title": f"Matter {i}",
+                "pipeline": "Public Intake",
+                "stage": STAGES[(i * 7) % len(STAGES)],
+                "contact_id": 1,
+                "advisor_id": (i % ADVISORS) + 1,
+                # Spread over ~2 years, newest last
+                "created_at": now - timedelta(minutes=(matters - i) * 1051200 // matters),
+            }
+            for i in range(offset + 1, min(matters, offset + batch) + 1)
+        ])
+    session.commit()
+
+
+def old_stats(session, period, advisor_id):
+    start_date = datetime.utcnow() - timedelta(days=30) if period == "month" else datetime(2000, 1, 1)
+    q = session.query(Matter).filter(Matter.created_at >= start_date)
+    if advisor_id is not None:
+        q = q.filter(Matter.advisor_id == advisor_id)
+    matters = q.all()
+    counts = {}
+    for m in matters:
+        counts[m.stage] = counts.get(m.stage, 0) + 1
+    session.expunge_all()
+    return pipeline_stats.build_pipeline_stats(counts, period)
+
+
+def timed(fn, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def check_listeners(session) -> None:
+    """Insert/update/delete through the ORM and compare the rollup with a full rebuild."""
+    contact_id = session.query(Contact.id).first()[0]
+    m = Matter(title="listener check", stage="New", contact_id=contact_id, advisor_id=1)
+    session.add(m)
+    session.commit()
+    m.stage = "Booked"
+    session.commit()
+    m.advisor_id = 2
+    session.commit()
+    maintained = {
+        (r.advisor_id, r.day, r.stage): r.count
+        for r in session.query(MatterStageDaily).filter(MatterStageDaily.count != 0)
+    }
+    session.delete(m)
+    session.commit()
+    pipeline_stats.rebuild_rollup(session)
+    session.add(Matter(id=m.id, title="listener check", stage="Booked", contact_id=contact_id, advisor_id=2,
+                       created_at=m.created_at))
+    session.commit()
+    rebuilt = {
+        (r.advisor_id, r.day, r.stage): r.count
+        for r in session.query(MatterStageDaily).filter(MatterStageDaily.count != 0)
+    }
+    session.query(Matter).filter(Matter.id == m.id).delete()
+    session.commit()
+    pipeline_stats.rebuild_rollup(session)
+    print(f"Rollup maintained by listeners matches a rebuild: {maintained == rebuilt}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matters", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="scratch database (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_stats.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine, tables=[Contact.__table__, Matter.__table__, MatterStageDaily.__table__])
+    session = sessionmaker(bind=engine)()
+    if session.query(func.count(Matter.id)).scalar() < args.matters:
+        print(f"Seeding {args.matters} matters into {engine.url.render_as_string(hide_password=True)} ...")
+        session.query(Matter).delete()
+        session.query(Contact).delete()
+        session.commit()
+        seed(session, args.matters)
+    rollup_rows = pipeline_stats.rebuild_rollup(session)
+    print(f"{args.matters} matters, {rollup_rows} rollup rows")
+
+    for advisor_id in (7, None):
+        for period in ("month", "inception"):
+            old_ms, old = timed(lambda: old_stats(session, period, advisor_id), 1 if period == "inception" else args.repeat)
+            sql_ms, sql = timed(lambda: pipeline_stats.build_pipeline_stats(
+                pipeline_stats.stage_counts(session, period, advisor_id), period), args.repeat)
+            rollup_ms, rollup = timed(lambda: pipeline_stats.build_pipeline_stats(
+                pipeline_stats.rollup_stage_counts(session, period, advisor_id), period), args.repeat)
+            scope = f"advisor {advisor_id}" if advisor_id else "all advisors"
+            # The rollup counts whole days, so "month" may include part of one extra day
+            agree = old == sql and (period != "inception" or sql == rollup)
+            print(f"  {scope:<13} {period:<9} old {old_ms:8.1f} ms | GROUP BY {sql_ms:7.1f} ms | "
+                  f"rollup {rollup_ms:6.1f} ms | agree={agree}")
+
+    if engine.dialect.name == "postgresql":
+        pipeline_stats.register_rollup_listeners()
+        check_listeners(session)
+    else:
+        print("Skipping the rollup listener check (needs a Postgres --database-url)")
+
+
+if __name__ == "__main__":
+    main()
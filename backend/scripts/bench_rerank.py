@@ -0,0 +1,71 @@
+"""
+Measure CPU cross-encoder re-ranking latency at 20/50/100 candidates.
+
+Loads RERANK_MODEL once (as the app does per process) and times
+CrossEncoderReranker.rerank over synthetic ~1000-character chunks, the size
+DocumentProcessor produces with the default CHUNK_SIZE.
+
+Usage (from backend/):
+    python scripts/bench_rerank.py [--candidates 20 50 100] [--repeats 10] [--threads 4]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.reranker import CrossEncoderReranker  # noqa: E402
+
+WORDS = (
+    "trust trustee successor beneficiary grantor distribution income principal article section "
+    "amendment revocable irrevocable manager member operating agreement capital account tax "
+    "fiscal year notice termination governing law assets liabilities indemnification"
+).split()
+
+
+def make_chunk(rng: random.Random, i: int):
+    text = " ".join(rng.choice(WORDS) for _ in range(150))[:1000]
+    return {"id": str(i), "score": 0.0, "metadata": {"chunk_text": text}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    start = time.perf_counter()
+    reranker = CrossEncoderReranker(
+        settings.RERANK_MODEL,
+        batch_size=settings.RERANK_BATCH_SIZE,
+        max_length=settings.RERANK_MAX_LENGTH
+    )
+    print(f"model={settings.RERANK_MODEL} load={time.perf_counter() - start:.2f}s batch_size={settings.RERANK_BATCH_SIZE}")
+
+    rng = random.Random(0)
+    query = "Who is the successor trustee and when do distributions begin?"
+    reranker.rerank(query, [make_chunk(rng, i) for i in range(4)], 4)  # warm up
+    for n in args.candidates:
+        chunks = [make_chunk(rng, i) for i in range(n)]
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            reranker.rerank(query, chunks, settings.RERANK_TOP_N)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"  {n:>4} candidates: p50={statistics.median(timings) * 1000:7.1f}ms p95={p95 * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
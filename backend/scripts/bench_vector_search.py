@@ -0,0 +1,75 @@
+"""
+Benchmark the Postgres-fallback similarity search.
+
+Compares the previous pure-Python cosine loop with the vectorized NumPy
+engine in app.services.similarity at 1k/10k/100k chunks.
+
+Usage (from backend/):
+    python scripts/bench_vector_search.py [--dimension 1536] [--top-k 5]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.similarity import normalize_rows, to_matrix, top_k_cosine  # noqa: E402
+
+# The pure-Python loop is too slow to be worth running beyond this size
+LEGACY_MAX_ROWS = 10_000
+
+
+def legacy_search(query, embeddings, top_k):
+    def cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        na = math.sqrt(sum(x * x for x in a))
+        nb = math.sqrt(sum(y * y for y in b))
+        return dot / (na * nb + 1e-9)
+
+    scored = [(i, cosine(query, emb)) for i, emb in enumerate(embeddings)]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:top_k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(args.dimension).tolist()
+
+    print(f"{'chunks':>8} {'legacy (s)':>12} {'pack (s)':>10} {'score (s)':>10}")
+    for n in args.sizes:
+        raw = rng.standard_normal((n, args.dimension), dtype=np.float32)
+        embeddings = raw.tolist()
+
+        legacy = "skipped"
+        if n <= LEGACY_MAX_ROWS:
+            start = time.perf_counter()
+            expected = legacy_search(query, embeddings, args.top_k)
+            legacy = f"{time.perf_counter() - start:.3f}"
+
+        start = time.perf_counter()
+        matrix = normalize_rows(to_matrix(embeddings, args.dimension))
+        pack = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = top_k_cosine(query, matrix, args.top_k)
+        score = time.perf_counter() - start
+
+        if n <= LEGACY_MAX_ROWS:
+            assert [i for i, _ in results] == [i for i, _ in expected], "result order differs from legacy loop"
+
+        print(f"{n:>8} {legacy:>12} {pack:>10.3f} {score:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
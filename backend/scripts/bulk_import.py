@@ -0,0 +1,224 @@
+"""
+Bulk-index a directory tree of documents (e.g. the repo's documents/ template library).
+
+Files are extracted and chunked in a process pool, new chunk texts are embedded
+in large batches (multi-process for EMBEDDING_PROVIDER=local), and documents are
+written to the configured vector backend by a bounded pool of writer threads.
+
+Re-running is safe and cheap:
+- document IDs are derived from the file's path relative to the root, and chunk
+  IDs from chunk content hashes, so unchanged chunks are never re-embedded or
+  duplicated (see VectorDBService.upsert_document_chunks);
+- files whose sha256 matches the --state file from a previous run are skipped
+  without being read by the extraction pool.
+
+Usage (from backend/):
+    python scripts/bulk_import.py ../documents --entity-id template_library --user-id 1
+        [--workers 4] [--write-concurrency 4] [--embed-batch 2000] [--state .bulk_import_state.json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.document_processor import DocumentProcessor  # noqa: E402
+from app.services.embedding_cache import get_embedding_cache  # noqa: E402
+from app.services.vector_db import get_vector_db  # noqa: E402
+
+EXTENSIONS = ("pdf", "docx", "txt")
+
+
+def _init_worker() -> None:
+    # Parallelism is across files; keep each PDF's page extraction inside this worker.
+    settings.PDF_PARALLEL_MIN_PAGES = 10 ** 9
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_file(path: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Extract and chunk one file in a pool worker; returns (chunks, error)."""
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+        processor = DocumentProcessor()
+        pages = processor.iter_pages(content, path.rsplit(".", 1)[-1].lower())
+        chunks = list(processor.iter_chunks(pages, {"file_name": os.path.basename(path)}))
+        for chunk in chunks:
+            chunk["total_chunks"] = len(chunks)
+        return chunks, None
+    except Exception as e:
+        return [], str(e)
+
+
+def discover(root: str, extensions: List[str]) -> List[str]:
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.startswith("~$"):  # Word lock files
+                continue
+            if name.rsplit(".", 1)[-1].lower() in extensions:
+                paths.append(os.path.join(dirpath, name))
+    return sorted(paths)
+
+
+def load_state(path: Optional[str]) -> Dict[str, str]:
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(path: Optional[str], state: Dict[str, str]) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def extract_all(pool: ProcessPoolExecutor, docs: List[Dict[str, Any]], window: int) -> Iterator[Dict[str, Any]]:
+    """Yield docs with 'chunks'/'error' filled in, keeping at most `window` files in flight."""
+    pending = []
+    for doc in docs:
+        pending.append((doc, pool.submit(extract_file, doc["abs_path"])))
+        if len(pending) >= window:
+            doc, future = pending.pop(0)
+            doc["chunks"], doc["error"] = future.result()
+            yield doc
+    for doc, future in pending:
+        doc["chunks"], doc["error"] = future.result()
+        yield doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="directory to import")
+    parser.add_argument("--entity-id", default="template_library")
+    parser.add_argument("--user-id", required=True,
+                        help="owning user's id; chat only searches the signed-in user's documents")
+    parser.add_argument("--document-type", default=None, help="default: the file's top-level folder under root")
+    parser.add_argument("--id-prefix", default="library/", help="document_id = prefix + path relative to root")
+    parser.add_argument("--extensions", default=",".join(EXTENSIONS))
+    parser.add_argument("--workers", type=int, default=settings.PDF_EXTRACTION_WORKERS, help="extraction processes")
+    parser.add_argument("--write-concurrency", type=int, default=4, help="documents written to the backend at once")
+    parser.add_argument("--embed-batch", type=int, default=2000, help="new chunks embedded per batch")
+    local = (settings.EMBEDDING_PROVIDER or "openai").lower() == "local"
+    parser.add_argument("--embed-processes", type=int, default=settings.LOCAL_EMBEDDING_PROCESSES if local else 1,
+                        help="encoding processes for EMBEDDING_PROVIDER=local (ignored by remote providers)")
+    parser.add_argument("--state", default=".bulk_import_state.json", help="resume file ('' to disable)")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    extensions = [e.strip().lower().lstrip(".") for e in args.extensions.split(",") if e.strip()]
+    state = load_state(args.state)
+    vector_db = get_vector_db()
+    cache = get_embedding_cache()
+
+    docs, skipped = [], 0
+    for path in discover(root, extensions):
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        file_hash = _file_sha256(path)
+        if state.get(rel) == file_hash:
+            skipped += 1
+            continue
+        top = rel.split("/", 1)[0] if "/" in rel else "library"
+        docs.append({
+            "abs_path": path,
+            "rel_path": rel,
+            "file_hash": file_hash,
+            "metadata": {
+                "document_id": f"{args.id_prefix}{rel}",
+                "entity_id": args.entity_id,
+                "document_type": args.document_type or top,
+                "user_id": args.user_id,
+                "file_name": os.path.basename(path),
+            },
+        })
+    print(f"{len(docs)} files to import, {skipped} unchanged since the last run ({root})")
+    if not docs:
+        return
+
+    totals = {"files": 0, "chunks": 0, "embedded": 0, "empty": 0, "failed": 0}
+    started = time.perf_counter()
+
+    def write(doc: Dict[str, Any]) -> bool:
+        return vector_db.upsert_document_chunks(doc["chunks"], doc["metadata"])
+
+    def flush(group: List[Dict[str, Any]], writers: ThreadPoolExecutor) -> None:
+        texts = []
+        for doc in group:
+            texts.extend(vector_db.missing_chunk_texts(doc["metadata"]["document_id"], doc["chunks"]))
+        if texts:
+            # A group's embeddings are generated up front and must still be cached when each
+            # document is written, so the LRU has to hold the whole group
+            cache.max_entries = max(cache.max_entries, len(set(texts)))
+            vector_db.generate_embeddings(texts, processes=args.embed_processes)
+        for doc, ok in zip(group, writers.map(write, group)):
+            if ok:
+                state[doc["rel_path"]] = doc["file_hash"]
+                totals["files"] += 1
+                totals["chunks"] += len(doc["chunks"])
+            else:
+                totals["failed"] += 1
+                print(f"  FAILED {doc['rel_path']}: could not write to the {vector_db.backend} backend")
+        totals["embedded"] += len(set(texts))
+        save_state(args.state, state)
+        elapsed = time.perf_counter() - started
+        print(
+            f"[{totals['files'] + totals['empty'] + totals['failed']}/{len(docs)}] {totals['chunks']} chunks, "
+            f"{totals['embedded']} embedded | {totals['files'] / elapsed:.2f} files/s, "
+            f"{totals['chunks'] / elapsed:.1f} chunks/s, {totals['embedded'] / elapsed:.1f} embeddings/s"
+        )
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), initializer=_init_worker) as pool, \
+            ThreadPoolExecutor(max_workers=max(1, args.write_concurrency)) as writers:
+        group: List[Dict[str, Any]] = []
+        group_chunks = 0
+        for doc in extract_all(pool, docs, window=max(1, args.workers) * 2):
+            if doc["error"]:
+                totals["failed"] += 1
+                print(f"  FAILED {doc['rel_path']}: {doc['error']}")
+                continue
+            if not doc["chunks"]:
+                # e.g. form-only DOCX templates; remembered so later runs skip them too
+                totals["empty"] += 1
+                state[doc["rel_path"]] = doc["file_hash"]
+                print(f"  EMPTY {doc['rel_path']}: no text extracted")
+                continue
+            # Flush before a document would push the group past --embed-batch (a single larger
+            # document still forms its own group)
+            if group and group_chunks + len(doc["chunks"]) > args.embed_batch:
+                flush(group, writers)
+                group, group_chunks = [], 0
+            group.append(doc)
+            group_chunks += len(doc["chunks"])
+        if group:
+            flush(group, writers)
+    save_state(args.state, state)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Imported {totals['files']} files ({totals['chunks']} chunks, {totals['embedded']} newly embedded) "
+        f"in {elapsed:.1f}s; {totals['empty']} empty, {totals['failed']} failed"
+    )
+    if totals["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Concurrent load test for the chat/search endpoints against one running worker.
+
+Start a single worker first, e.g.:
+    uvicorn app.main:app --workers 1 --port 8000
+
+Then (from backend/):
+    python scripts/load_test_chat.py --session <session cookie> --concurrency 20 --requests 200
+
+While a blocking call holds the event loop, every other request on the worker
+queues behind it; with the offloaded endpoints throughput should scale with
+--concurrency up to BLOCKING_POOL_SIZE.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def one_request(args) -> float:
+    if args.endpoint == "search":
+        qs = urllib.parse.urlencode({"query": args.query, "top_k": 5})
+        req = urllib.request.Request(f"{args.base_url}/api/chat/search?{qs}")
+    else:
+        body = json.dumps({"query": args.query}).encode("utf-8")
+        req = urllib.request.Request(
+            f"{args.base_url}/api/chat/chat",
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+    req.add_header("Cookie", f"session={args.session}")
+    start = time.perf_counter()
+    with urllib.request.urlopen(req, timeout=args.timeout) as resp:
+        resp.read()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--session", required=True, help="value of the HttpOnly session cookie")
+    parser.add_argument("--endpoint", choices=["search", "chat"], default="search")
+    parser.add_argument("--query", default="Who is the successor trustee?")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(one_request, args) for _ in range(args.requests)]
+        for f in futures:
+            try:
+                latencies.append(f.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"endpoint={args.endpoint} concurrency={args.concurrency} requests={args.requests} errors={errors}")
+    print(f"throughput: {len(latencies) / elapsed:.2f} req/s over {elapsed:.1f}s")
+    if latencies:
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"latency p50={statistics.median(latencies):.3f}s p99={p99:.3f}s max={latencies[-1]:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
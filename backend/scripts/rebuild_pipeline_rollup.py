@@ -0,0 +1,34 @@
+"""
+Recompute the matter_stage_daily rollup behind /api/pipeline/stats from matters.
+
+Run it once after turning PIPELINE_STATS_ROLLUP on (the rollup is only maintained
+while the setting is on), and after bulk SQL edits to matters that bypass the ORM.
+Matter writes that land while it runs can be lost from the rollup, so run it in a
+quiet period or run it again afterwards.
+
+Usage (from backend/):
+    python scripts/rebuild_pipeline_rollup.py
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.services.pipeline_stats import rebuild_rollup  # noqa: E402
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    db = SessionLocal()
+    try:
+        rows = rebuild_rollup(db)
+    finally:
+        db.close()
+    print(f"matter_stage_daily rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Move Pinecone vectors stored under the old positional chunk IDs to content-addressed IDs.
+
+Before content-addressed IDs, chunk vectors were stored as md5(document_id, chunk
+index, first 50 characters). Those IDs cannot be listed by document, so
+re-indexing such a document would write a second copy next to the old one and
+delete_document could not find them on serverless indexes. This copies every
+legacy vector (values and metadata, no re-embedding) to
+"<md5(document_id)>#<sha256(text)[:32]>#<n>" and deletes the old ID.
+
+Stored metadata keeps at most 1000 characters of chunk text, so a longer chunk
+gets an ID that the next re-index will not match; that re-index then embeds the
+chunk again and deletes the re-keyed copy, which is still correct.
+
+Usage (from backend/):
+    python scripts/rekey_pinecone_chunks.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.vector_db import get_vector_db  # noqa: E402
+
+FETCH_BATCH = 100
+
+
+def is_legacy_id(vector_id: str) -> bool:
+    return "#" not in vector_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be re-keyed")
+    args = parser.parse_args()
+
+    vector_db = get_vector_db()
+    if not vector_db.use_pinecone:
+        sys.exit("The configured VECTOR_BACKEND is not Pinecone; nothing to re-key")
+    index = vector_db.index
+
+    legacy_ids: List[str] = []
+    for page in index.list():
+        legacy_ids.extend(i for i in page if is_legacy_id(i))
+    print(f"{len(legacy_ids)} vectors under legacy IDs")
+
+    # document_id -> [(chunk_index, legacy id, vector)]
+    documents: Dict[str, list] = defaultdict(list)
+    for i in range(0, len(legacy_ids), FETCH_BATCH):
+        fetched = index.fetch(ids=legacy_ids[i:i + FETCH_BATCH])
+        for vector_id, vector in fetched.vectors.items():
+            md = dict(vector.metadata or {})
+            documents[md.get('document_id', '')].append((int(md.get('chunk_index', 0)), vector_id, vector.values, md))
+
+    moved = 0
+    for document_id, entries in documents.items():
+        entries.sort(key=lambda e: e[0])
+        chunks = [{'text': md.get('chunk_text', '')} for _, _, _, md in entries]
+        new_ids = vector_db.generate_chunk_ids(document_id, chunks)
+        if args.dry_run:
+            print(f"  {document_id or '(no document_id)'}: {len(entries)} vectors")
+            continue
+        vectors = [
+            {
+                'id': chunk_id,
+                'values': values,
+                'metadata': {**md, 'content_hash': content_hash},
+            }
+            for (chunk_id, content_hash), (_, _, values, md) in zip(new_ids, entries)
+        ]
+        for i in range(0, len(vectors), 100):
+            index.upsert(vectors=vectors[i:i + 100])
+        old_ids = [vector_id for _, vector_id, _, _ in entries]
+        for i in range(0, len(old_ids), 1000):
+            index.delete(ids=old_ids[i:i + 1000])
+        moved += len(entries)
+
+    if not args.dry_run:
+        print(f"Re-keyed {moved} vectors across {len(documents)} documents")
+
+
+if __name__ == "__main__":
+    main()
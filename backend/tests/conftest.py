@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Unit tests never touch the configured database; integration tests take their own URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,61 @@
+"""
+A client disconnect cancels /chat/stream while next() runs on the blocking pool;
+the event generator (and the OpenAI stream inside it) must still be closed.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.api import chat  # noqa: E402
+
+
+class SlowService:
+    def __init__(self):
+        self.release = threading.Event()
+        self.closed = threading.Event()
+
+    def stream_chat_with_documents(self, **kwargs):
+        def events():
+            try:
+                yield {'type': 'sources', 'sources': []}
+                self.release.wait(5)  # upstream still generating when the client goes away
+                yield {'type': 'token', 'content': 'late'}
+            finally:
+                self.closed.set()
+        return events()
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+class AdminUser:
+    id = 1
+    role = "Admin"
+    entities = []
+
+
+def test_cancelled_stream_closes_generator_after_pending_next(monkeypatch):
+    service = SlowService()
+    monkeypatch.setattr(chat, "get_rag_chat_service", lambda: service)
+
+    async def run():
+        response = await chat.stream_chat_with_documents(chat.ChatRequest(query="q"), ConnectedRequest(), AdminUser())
+        body = response.body_iterator
+        assert (await body.__anext__()).startswith("event: sources")
+        pending = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+
+    asyncio.run(run())
+    # Closing waits for the in-flight next() instead of failing with "generator already executing"
+    assert not service.closed.is_set()
+    service.release.set()
+    assert service.closed.wait(5)
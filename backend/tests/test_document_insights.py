@@ -0,0 +1,83 @@
+"""
+A first insight generation that failed must be reported, not re-queued on every
+poll; it is retried only after INSIGHTS_ERROR_RETRY_SECONDS.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.api import chat  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.services import insights  # noqa: E402
+from app.services.insights import InsightService  # noqa: E402
+
+
+class StubInsightService:
+    should_retry_failed = InsightService.should_retry_failed
+
+    def __init__(self, row):
+        self.row = row
+        self.scheduled = []
+
+    def get(self, db, entity_id, document_type=None):
+        return self.row
+
+    def is_refreshing(self, entity_id, document_type=None):
+        return False
+
+    def schedule_refresh(self, entity_id, document_type=None):
+        self.scheduled.append((entity_id, document_type))
+        return True
+
+
+def _failed_row(age_seconds):
+    return SimpleNamespace(
+        entity_id="e1", document_type="", insights=None, documents_analyzed=None,
+        status="error", stale=True, error="LLM unavailable", generated_at=None,
+        updated_at=datetime.utcnow() - timedelta(seconds=age_seconds),
+    )
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    monkeypatch.setattr(settings, "INSIGHTS_ERROR_RETRY_SECONDS", 300)
+    monkeypatch.setattr(chat, "_require_entity_access", lambda *args: None)
+
+    def serve(row):
+        service = StubInsightService(row)
+        monkeypatch.setattr(chat, "get_insight_service", lambda: service)
+        monkeypatch.setattr(insights, "get_insight_service", lambda: service)
+        response = SimpleNamespace(status_code=200)
+        body = asyncio.run(chat.get_document_insights("e1", response, None, current_user=None, db=None))
+        return response.status_code, body, service.scheduled
+    return serve
+
+
+def test_recent_failure_is_returned_without_rescheduling(serve):
+    status_code, body, scheduled = serve(_failed_row(age_seconds=10))
+
+    assert status_code == 200
+    assert body['status'] == "error"
+    assert body['error'] == "LLM unavailable"
+    assert scheduled == []
+
+
+def test_failure_is_retried_after_backoff(serve):
+    status_code, body, scheduled = serve(_failed_row(age_seconds=600))
+
+    assert status_code == 200
+    assert body['status'] == "error"
+    assert scheduled == [("e1", None)]
+
+
+def test_missing_row_is_queued(serve):
+    status_code, body, scheduled = serve(None)
+
+    assert status_code == 202
+    assert body['status'] == "pending"
+    assert scheduled == [("e1", None)]
@@ -0,0 +1,127 @@
+"""
+VectorDBService.generate_embeddings must batch provider calls and keep output order.
+
+The OpenAI client is replaced by a stub that records each embeddings.create call,
+so no network access or API key is needed.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import embeddings, vector_db
+from app.services.embedding_cache import EmbeddingCache
+from app.services.vector_db import VectorDBService
+
+DIMENSION = 4
+
+
+def _vector(text: str):
+    # Deterministic per text, so order mistakes show up as wrong vectors
+    n = float(int(text.split("-")[-1]))
+    return [n, n + 0.5, -n, 1.0]
+
+
+class StubEmbeddingsClient:
+    """Stands in for OpenAI(); answers embeddings.create out of index order like the API may."""
+
+    def __init__(self):
+        self.calls = []
+        self.embeddings = self
+
+    def create(self, model, input):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=_vector(t)) for i, t in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "PINECONE_DIMENSION", DIMENSION)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 10)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_MAX_TOKENS", 100)
+    # One token per word keeps the token budget arithmetic obvious
+    monkeypatch.setattr(embeddings, "count_tokens", lambda text, model=None: len(text.split()))
+    monkeypatch.setattr(vector_db, "get_embedding_cache", lambda: EmbeddingCache(max_entries=1000))
+
+    provider = embeddings.OpenAIEmbeddingProvider.__new__(embeddings.OpenAIEmbeddingProvider)
+    provider.client = StubEmbeddingsClient()
+    provider.model = provider.name = "text-embedding-3-small"
+    provider.dimension = DIMENSION
+    provider.batch_size = settings.EMBEDDING_BATCH_SIZE
+    provider.max_batch_tokens = settings.EMBEDDING_BATCH_MAX_TOKENS
+
+    svc = VectorDBService.__new__(VectorDBService)
+    svc.embedder = provider
+    return svc
+
+
+def test_one_call_per_batch_size(service):
+    texts = [f"text-{i}" for i in range(25)]
+
+    result = service.generate_embeddings(texts)
+
+    calls = service.embedder.client.calls
+    assert [len(c) for c in calls] == [10, 10, 5]
+    assert result == [_vector(t) for t in texts]
+
+
+def test_batches_split_on_token_budget(service):
+    # 30 words each: three texts fit the 100-token budget, a fourth does not
+    texts = [" ".join(["word"] * 29 + [f"text-{i}"]) for i in range(7)]
+
+    result = service.generate_embeddings(texts)
+
+    calls = service.embedder.client.calls
+    assert [len(c) for c in calls] == [3, 3, 1]
+    assert all(sum(len(t.split()) for t in call) <= 100 for call in calls)
+    assert result == [_vector(t) for t in texts]
+
+
+def test_order_preserved_with_duplicates_and_cache_hits(service, monkeypatch):
+    cache = EmbeddingCache(max_entries=1000)
+    monkeypatch.setattr(vector_db, "get_embedding_cache", lambda: cache)
+    cache.put_many(service.embedder.name, {"text-3": _vector("text-3")})
+    texts = ["text-5", "text-3", "text-1", "text-5", "text-2", "text-3"]
+    progress = []
+
+    result = service.generate_embeddings(texts, progress_callback=lambda done, total: progress.append((done, total)))
+
+    # Cached and repeated texts are not sent again
+    assert service.embedder.client.calls == [["text-5", "text-1", "text-2"]]
+    assert result == [_vector(t) for t in texts]
+    assert progress == [(6, 6)]
+
+
+def test_multi_process_request_still_batches_remote_provider(service):
+    texts = [f"text-{i}" for i in range(25)]
+
+    result = service.generate_embeddings(texts, processes=4)
+
+    assert [len(c) for c in service.embedder.client.calls] == [10, 10, 5]
+    assert result == [_vector(t) for t in texts]
+
+
+def test_multi_process_provider_gets_one_call(service):
+    calls = []
+
+    class LocalStub(embeddings.EmbeddingProvider):
+        name = "local:stub"
+        batch_size = 10
+        multi_process = True
+
+        def embed(self, texts):
+            raise AssertionError("embed_multi_process expected")
+
+        def embed_multi_process(self, texts, processes):
+            calls.append((len(texts), processes))
+            return [_vector(t) for t in texts]
+
+    service.embedder = LocalStub()
+    texts = [f"text-{i}" for i in range(25)]
+
+    result = service.generate_embeddings(texts, processes=4)
+
+    assert calls == [(25, 4)]
+    assert result == [_vector(t) for t in texts]
@@ -0,0 +1,57 @@
+"""
+Hybrid search must use the lexical index on the Postgres backends whatever
+LEXICAL_INDEX_ENABLED says; the flag only controls Pinecone's Postgres mirror.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services.vector_db import VectorDBService
+
+
+def _service(use_pinecone: bool) -> VectorDBService:
+    svc = VectorDBService.__new__(VectorDBService)
+    svc.use_pinecone = use_pinecone
+    svc.backend = "pinecone" if use_pinecone else "pgvector"
+    svc.calls = []
+    svc._search_vector = lambda query, top_k, f, m: svc.calls.append("vector") or [{'id': 'v', 'score': 1.0}]
+    svc._search_lexical = (
+        lambda query, top_k, f: svc.calls.append("lexical") or [{'id': 'l', 'score': 1.0}]
+        if svc.lexical_search_available() else []
+    )
+    return svc
+
+
+@pytest.fixture(autouse=True)
+def defaults(monkeypatch):
+    monkeypatch.setattr(settings, "RETRIEVAL_SEARCH_MODE", "vector")
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_ENABLED", None)
+
+
+def test_postgres_backends_always_support_lexical(monkeypatch):
+    svc = _service(use_pinecone=False)
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_ENABLED", False)
+
+    results = svc.search_similar_chunks("trust deed", mode="hybrid")
+
+    assert svc.lexical_search_available()
+    assert svc.calls == ["lexical", "vector"]
+    assert {r['id'] for r in results} == {"v", "l"}
+
+
+def test_pinecone_without_mirror_falls_back_to_vector():
+    svc = _service(use_pinecone=True)
+
+    results = svc.search_similar_chunks("trust deed", mode="hybrid")
+
+    assert not svc.lexical_search_available()
+    assert svc.calls == ["vector"]
+    assert [r['id'] for r in results] == ["v"]
+
+
+def test_pinecone_mirror_follows_search_mode(monkeypatch):
+    svc = _service(use_pinecone=True)
+    monkeypatch.setattr(settings, "RETRIEVAL_SEARCH_MODE", "hybrid")
+    assert svc.lexical_search_available()
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_ENABLED", False)
+    assert not svc.lexical_search_available()
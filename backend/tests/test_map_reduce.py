@@ -0,0 +1,123 @@
+"""
+RAGChatService.analyze_document map-reduce path: split, map, reduce and the
+single-pass passthrough for short documents.
+
+The chat client is a stub that answers with the "Article N" markers found in
+its prompt, so the final answer shows which parts of the document reached it
+and in what order. Tokens are counted as words.
+"""
+
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import rag_chat
+from app.services.rag_chat import RAGChatService
+
+MARKER = re.compile(r"Article (\d+)")
+
+
+def _document(articles: int) -> str:
+    return "".join(
+        f"Article {n}. The Manager shall deliver to each Member a statement of that Member's capital account. "
+        for n in range(1, articles + 1)
+    )
+
+
+def _articles(text: str):
+    return [int(n) for n in MARKER.findall(text)]
+
+
+class StubChatClient:
+    """Mimics client.chat.completions.create, echoing the article numbers in the prompt."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature, max_tokens):
+        prompt = messages[-1]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.latency)
+            content = " ".join(f"Article {n}" for n in sorted(set(_articles(prompt))))
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=SimpleNamespace(prompt_tokens=len(prompt.split()), completion_tokens=len(content.split())),
+            )
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(rag_chat, "get_vector_db", lambda: None)
+    monkeypatch.setattr(rag_chat, "count_tokens", lambda text, model=None: len(text.split()))
+    monkeypatch.setattr(settings, "ANALYSIS_SINGLE_PASS_MAX_TOKENS", 1000)
+    monkeypatch.setattr(settings, "ANALYSIS_MAP_CHUNK_TOKENS", 200)
+    monkeypatch.setattr(settings, "ANALYSIS_MAP_CHUNK_OVERLAP_TOKENS", 0)
+    monkeypatch.setattr(settings, "ANALYSIS_MAP_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "ANALYSIS_REDUCE_MAX_TOKENS", 1000)
+    return RAGChatService(openai_client=StubChatClient())
+
+
+def test_short_document_is_analyzed_in_one_call(service):
+    document = _document(10)
+
+    result = service.analyze_document(document, "summary", mode="auto")
+
+    assert result["status"] == "success"
+    assert result["mode"] == "single"
+    assert result["stats"]["parts"] == 1
+    assert not result["stats"]["truncated"]
+    assert len(service.openai_client.prompts) == 1
+    assert document in service.openai_client.prompts[0]
+    assert _articles(result["analysis"]) == list(range(1, 11))
+
+
+def test_long_document_is_split_into_ordered_parts(service):
+    result = service.analyze_document(_document(100), "summary", mode="auto")
+
+    assert result["mode"] == "map_reduce"
+    parts = result["stats"]["parts"]
+    assert parts > 1
+    map_prompts = [p for p in service.openai_client.prompts if "Document part:" in p]
+    assert len(map_prompts) == parts
+    # Every article lands in some part, and parts follow document order
+    seen = [n for p in sorted(map_prompts, key=lambda p: _articles(p)[0]) for n in _articles(p)]
+    assert seen == list(range(1, 101))
+    assert all(len(p.split("Document part:\n", 1)[1].split()) <= 200 for p in map_prompts)
+
+
+def test_map_respects_concurrency_limit(service):
+    service.openai_client.latency = 0.02
+
+    result = service.analyze_document(_document(100), "summary", mode="map_reduce")
+
+    stages = result["stats"]["stages"]
+    assert stages["map"]["calls"] == result["stats"]["parts"]
+    assert stages["map"]["concurrency"] == 3
+    assert 1 < service.openai_client.peak <= 3
+
+
+def test_reduce_keeps_every_part_in_order(service, monkeypatch):
+    # A small reduce budget forces intermediate reduce rounds before the final call
+    monkeypatch.setattr(settings, "ANALYSIS_REDUCE_MAX_TOKENS", 30)
+
+    result = service.analyze_document(_document(100), "summary", mode="map_reduce")
+
+    assert result["status"] == "success"
+    assert result["stats"]["stages"]["reduce"]["calls"] > 1
+    assert _articles(result["analysis"]) == list(range(1, 101))
@@ -0,0 +1,102 @@
+"""
+Re-indexing a Pinecone document stored under the old positional chunk IDs must
+replace that copy instead of writing a second one next to it.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import vector_db
+from app.services.embedding_cache import EmbeddingCache
+from app.services.vector_db import VectorDBService
+
+DIMENSION = 4
+
+
+class FakeIndex:
+    """In-memory stand-in for a Pinecone index (list by prefix, fetch, upsert, delete)."""
+
+    def __init__(self):
+        self.vectors = {}
+
+    def list(self, prefix=""):
+        yield [i for i in self.vectors if i.startswith(prefix)]
+
+    def fetch(self, ids):
+        return SimpleNamespace(vectors={
+            i: SimpleNamespace(id=i, values=self.vectors[i]['values'], metadata=self.vectors[i]['metadata'])
+            for i in ids if i in self.vectors
+        })
+
+    def upsert(self, vectors):
+        for v in vectors:
+            self.vectors[v['id']] = {'values': v['values'], 'metadata': v['metadata']}
+
+    def update(self, id, set_metadata):
+        self.vectors[id]['metadata'].update(set_metadata)
+
+    def delete(self, ids=None, filter=None):
+        if filter is not None:
+            raise RuntimeError("Serverless indexes do not support deleting by metadata")
+        for i in ids:
+            self.vectors.pop(i, None)
+
+
+class StubEmbedder:
+    name = "stub"
+    batch_size = 100
+    max_batch_tokens = None
+    multi_process = False
+
+    def embed(self, texts):
+        return [[1.0, 0.0, 0.0, float(len(t))] for t in texts]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "PINECONE_DIMENSION", DIMENSION)
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_ENABLED", False)
+    monkeypatch.setattr(vector_db, "get_embedding_cache", lambda: EmbeddingCache(max_entries=1000))
+    monkeypatch.setattr(vector_db, "bump_index_version", lambda *args: None)
+    svc = VectorDBService.__new__(VectorDBService)
+    svc.use_pinecone = True
+    svc.backend = "pinecone"
+    svc.embedder = StubEmbedder()
+    svc.index = FakeIndex()
+    return svc
+
+
+def _chunks(*texts):
+    return [{'text': t, 'page': 1} for t in texts]
+
+
+def _store_legacy(svc, document_id, chunks):
+    for legacy_id, (i, chunk) in zip(svc.legacy_chunk_ids(document_id, chunks), enumerate(chunks)):
+        svc.index.vectors[legacy_id] = {
+            'values': [0.0] * DIMENSION,
+            'metadata': {'document_id': document_id, 'chunk_index': i, 'chunk_text': chunk['text']},
+        }
+
+
+def test_first_reindex_replaces_legacy_vectors(service):
+    chunks = _chunks("first clause", "second clause", "third clause")
+    _store_legacy(service, "doc-1", chunks)
+    _store_legacy(service, "doc-2", _chunks("other document"))
+
+    assert service.upsert_document_chunks(chunks, {'document_id': "doc-1"})
+
+    prefix = service.chunk_id_prefix("doc-1")
+    doc1 = [i for i, v in service.index.vectors.items() if v['metadata']['document_id'] == "doc-1"]
+    assert len(doc1) == 3
+    assert all(i.startswith(prefix) for i in doc1)
+    # Other documents' legacy vectors are untouched
+    assert len(service.index.vectors) == 4
+
+
+def test_delete_document_reports_unreachable_legacy_vectors(service):
+    _store_legacy(service, "doc-1", _chunks("first clause"))
+
+    assert service.delete_document("doc-1") is False
+    assert len(service.index.vectors) == 1
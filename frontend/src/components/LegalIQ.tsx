@@ -38,10 +38,22 @@ const LegalIQ: React.FC = () => {
         if (!selectedEntityId) return;
         setInsightsLoading(true);
         try {
-            const res = await apiClient.get(`/chat/document-insights/${selectedEntityId}` , {
-                params: { document_type: selectedDoc?.document_type }
-            });
-            setInsights(res.data?.insights || '');
+            // First request for an entity queues generation (202, status "pending"); poll until it is stored
+            for (let attempt = 0; attempt < 40; attempt++) {
+                const res = await apiClient.get(`/chat/document-insights/${selectedEntityId}` , {
+                    params: { document_type: selectedDoc?.document_type }
+                });
+                if (res.data?.status === 'error' && !res.data?.generated_at) {
+                    // First generation failed; the server retries it later, so stop polling
+                    setInsights(`Insights could not be generated: ${res.data?.error || 'unknown error'}`);
+                    break;
+                }
+                if (res.data?.status !== 'pending') {
+                    setInsights(res.data?.insights || '');
+                    break;
+                }
+                await new Promise(resolve => setTimeout(resolve, 3000));
+            }
         } catch (e) {
             console.error(e);
             setInsights('');
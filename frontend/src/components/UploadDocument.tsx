@@ -18,6 +18,29 @@ const UploadDocument: React.FC<UploadDocumentProps> = ({ entityId, onUpload }) =
         }
     };
 
+    // Indexing runs in a background job; poll it until it finishes
+    const waitForIndexing = async (jobId?: string) => {
+        if (!jobId) return;
+        for (let attempt = 0; attempt < 200; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, 3000));
+            const res = await apiClient.get(`/chat/ingestion-jobs/${jobId}`);
+            const job = res.data;
+            if (job?.status === 'succeeded') {
+                setMessage('Document uploaded and indexed successfully!');
+                return;
+            }
+            if (job?.status === 'failed') {
+                setMessage(`Document uploaded, but indexing failed: ${job.error || 'unknown error'}`);
+                return;
+            }
+            const progress = job?.stage === 'embedding' && job?.chunks_total
+                ? ` (${job.chunks_done}/${job.chunks_total} chunks)`
+                : '';
+            setMessage(`Document uploaded; indexing ${job?.status === 'running' ? job.stage : 'queued'}${progress}...`);
+        }
+        setMessage('Document uploaded; indexing is still in progress.');
+    };
+
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!file) {
@@ -43,17 +66,18 @@ const UploadDocument: React.FC<UploadDocumentProps> = ({ entityId, onUpload }) =
             indexForm.append('file', file);
             indexForm.append('entity_id', String(entityId));
             indexForm.append('document_type', documentType);
-            await apiClient.post(`/chat/upload-and-index`, indexForm, {
+            const res = await apiClient.post(`/chat/upload-and-index`, indexForm, {
                 headers: {
                     'Content-Type': 'multipart/form-data',
                 },
             });
 
-            setMessage('Document uploaded and indexed successfully!');
+            setMessage('Document uploaded and queued for indexing...');
             setName('');
             setDocumentType('');
             setFile(null);
             onUpload();
+            await waitForIndexing(res.data?.job_id);
         } catch (error) {
             setMessage('Error uploading document.');
             console.error(error);
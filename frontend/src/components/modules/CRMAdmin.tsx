@@ -81,12 +81,12 @@ const CRMAdmin: React.FC = () => {
       // Try to update backend if we have the matter
       // Note: In production, we'd track matter IDs with bookings
       // For now, we'll query by contact email to find the matter
-      const contactsRes = await apiClient.get('/contacts/');
-      const contact = contactsRes.data.find((c: any) => c.email === booking.email);
+      const contactsRes = await apiClient.get('/contacts/', { params: { email: booking.email, limit: 1, fields: 'id' } });
+      const contact = contactsRes.data[0];
       
       if (contact) {
-        const mattersRes = await apiClient.get('/matters/');
-        const matter = mattersRes.data.find((m: any) => m.contact_id === contact.id);
+        const mattersRes = await apiClient.get('/matters/', { params: { contact_id: contact.id, limit: 1, fields: 'id' } });
+        const matter = mattersRes.data[0];
         
         if (matter) {
           await apiClient.patch(`/matters/${matter.id}`, { stage: newStage });